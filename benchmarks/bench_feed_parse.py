@@ -0,0 +1,95 @@
+"""Benchmark feed parsing: feedparser vs the streaming fast path.
+
+Usage:
+    python benchmarks/bench_feed_parse.py [N_ITEMS] [FEED_FILE ...]
+
+Without FEED_FILE arguments, synthetic RSS 2.0 and Atom feeds of N_ITEMS
+entries (default 5000, with HTML descriptions) are generated; pass saved
+feed documents to measure those instead. For each feed, "feedparser" is the
+old path, "fast" parses every entry and "fast_limit" stops after
+MAX_FEED_ENTRIES as FeedCache does. Prints one JSON object per (feed, method)
+with the best of 3 runs and the peak traced allocation.
+"""
+import json
+import sys
+import time
+import tracemalloc
+from email.utils import formatdate
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.collectors.feed_cache import MAX_FEED_ENTRIES
+from src.collectors.feed_parser import _iter_feedparser, parse_entries
+
+DESCRIPTION = "<p>Statement on <b>policy</b> {i}. " + "Further details of the statement follow here. " * 6 + "</p>"
+
+
+def make_rss(n: int) -> bytes:
+    items = "".join(
+        f"<item><title>Minister comments on topic {i}</title><link>https://news.example/{i}</link>"
+        f"<guid>https://news.example/{i}</guid><pubDate>{formatdate(1700000000 - i * 60, usegmt=True)}</pubDate>"
+        f"<description><![CDATA[{DESCRIPTION.format(i=i)}]]></description></item>"
+        for i in range(n)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>News</title>{items}</channel></rss>'.encode()
+
+
+def make_atom(n: int) -> bytes:
+    entries = "".join(
+        f"<entry><title>Minister comments on topic {i}</title><link href=\"https://news.example/{i}\"/>"
+        f"<id>urn:x:{i}</id><updated>2023-11-14T{i % 24:02d}:00:00Z</updated>"
+        f"<summary>Plain summary {i}. " + "More words in the summary. " * 6 + "</summary></entry>"
+        for i in range(n)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>News</title>{entries}</feed>"
+    ).encode()
+
+
+METHODS = {
+    "feedparser": lambda data: list(_iter_feedparser(data, "https://news.example/feed", "")),
+    "fast": lambda data: parse_entries(data, base_url="https://news.example/feed"),
+    "fast_limit": lambda data: parse_entries(data, base_url="https://news.example/feed", limit=MAX_FEED_ENTRIES),
+}
+
+
+def bench(name: str, data: bytes, method: str, repeat: int = 3) -> dict:
+    fn = METHODS[method]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = fn(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "feed": name,
+        "method": method,
+        "bytes": len(data),
+        "entries": len(entries),
+        "seconds": round(best, 4),
+        "peak_alloc_mb": round(peak / 1e6, 2),
+    }
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    files = sys.argv[2:]
+    feeds = [(f, Path(f).read_bytes()) for f in files] or [(f"rss-{n}", make_rss(n)), (f"atom-{n}", make_atom(n))]
+    for name, data in feeds:
+        results = [bench(name, data, m) for m in METHODS]
+        base = results[0]["seconds"]
+        for r in results:
+            r["speedup"] = round(base / r["seconds"], 1) if r["seconds"] else None
+            print(json.dumps(r))
+
+
+if __name__ == "__main__":
+    main()
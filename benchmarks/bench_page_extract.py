@@ -0,0 +1,88 @@
+"""Benchmark page text extraction: full BeautifulSoup parse vs streaming.
+
+Usage:
+    python benchmarks/bench_page_extract.py [page.html ...]
+
+Without arguments, synthetic pages of increasing size (script-heavy, like
+real X/news pages) are written to a temporary directory and used as fixtures.
+Prints one JSON object per fixture and method with wall time and peak
+traced memory.
+"""
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.collectors.x_url_summarizer import CHUNK_SIZE, MAX_PAGE_CHARS, _extract_text_soup
+from src.utils.text_cleaner import extract_text_streaming
+
+SIZES_MB = (1, 5, 20)
+
+
+def make_fixture(path: Path, size_mb: int) -> Path:
+    block = (
+        "<div class='post'><script>window.__state = {\"k\": \"" + "x" * 2000 + "\"};</script>"
+        "<style>.a{color:red}</style><p>安倍晋三 and Yuriko Koike discussed policy at length.</p>"
+        "<span>Reply</span><span>Share</span></div>\n"
+    )
+    target = size_mb * 1024 * 1024
+    with path.open("w", encoding="utf-8") as f:
+        f.write("<html><head><title>Fixture</title></head><body>")
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block.encode("utf-8"))
+        f.write("</body></html>")
+    return path
+
+
+def _soup(path: Path) -> str:
+    return _extract_text_soup(path.read_text(encoding="utf-8"), MAX_PAGE_CHARS)
+
+
+def _streaming(path: Path) -> str:
+    def chunks():
+        with path.open("r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    return extract_text_streaming(chunks(), MAX_PAGE_CHARS)
+
+
+def measure(fn, path: Path) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = fn(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 4), "peak_mb": round(peak / 1e6, 2), "chars": len(text)}
+
+
+def main(argv) -> None:
+    paths = [Path(a) for a in argv]
+    tmp = None
+    if not paths:
+        tmp = tempfile.TemporaryDirectory()
+        paths = [make_fixture(Path(tmp.name) / f"page_{mb}mb.html", mb) for mb in SIZES_MB]
+    for path in paths:
+        size = path.stat().st_size
+        for name, fn in (("soup", _soup), ("streaming", _streaming)):
+            row = {"fixture": path.name, "bytes": size, "method": name}
+            row.update(measure(fn, path))
+            print(json.dumps(row))
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
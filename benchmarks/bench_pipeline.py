@@ -0,0 +1,292 @@
+"""End-to-end pipeline benchmark with a synthetic roster and local stub servers.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--persons 10,100,1000] [--workers 8]
+        [--stages wikipedia,rss,x_url,collect,render,main,main_warm]
+        [--llm-latency-ms 20] [--output report.json] [--compare baseline.json]
+
+For each roster size a persons.csv is generated and every RSS feed,
+Wikipedia API response and linked HTML page is served by
+benchmarks/stub_server.py; the OpenAI call is replaced by a fake with a fixed
+latency. Each stage runs in its own forked process and work directory (so
+peak RSS is per stage): the collectors in isolation, the collect and render
+stages, a cold ``main.main`` run and a warm rerun of it.
+
+Prints one JSON object per (roster size, stage) with throughput, p50/p95
+latency of the stage's unit of work and peak RSS. ``--output`` saves the
+whole report; ``--compare`` prints the change against a saved report and
+exits non-zero when a stage got slower than ``--fail-over`` (default 20%).
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# effectively unlimited LLM budgets; must be set before the scheduler exists
+os.environ.setdefault("LLM_RPM", "1000000")
+os.environ.setdefault("LLM_TPM", "1000000000")
+
+from stub_server import StubServer, make_roster, write_roster_csv  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ("wikipedia", "rss", "x_url", "collect", "render", "main", "main_warm")
+PERSONS_PER_FEED = 50
+
+
+class Samples:
+    """Thread-safe latency samples of a wrapped function."""
+
+    def __init__(self):
+        self.values = []
+        self._lock = threading.Lock()
+
+    def wrap(self, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.values.append(elapsed)
+
+        return timed
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _fake_openai(latency: float):
+    def call(system, user, model="fake", max_tokens=512):
+        time.sleep(latency)
+        return f"Summary of {len(user)} characters of page text."
+
+    return call
+
+
+def _configure(base_url: str, llm_latency: float) -> None:
+    """Point collectors at the stub server and lift production rate limits."""
+    from src import main
+    from src.collectors import http_client, wikipedia_collector, x_url_summarizer
+
+    wikipedia_collector.WIKI_API_BASE = base_url + "/{lang}/api.php"
+    x_url_summarizer._call_openai_chat = _fake_openai(llm_latency)
+    original_bootstrap = main._bootstrap
+
+    def bootstrap(max_requests=main.DEFAULT_MAX_REQUESTS):
+        original_bootstrap(max_requests)
+        http_client.configure(
+            max_in_flight=max_requests, per_host_concurrency=max_requests, per_host_rps=None,
+            pool_maxsize=max(max_requests, 16),
+        )
+
+    main._bootstrap = bootstrap
+
+
+def _prepare(workdir: Path, roster) -> None:
+    (workdir / "data").mkdir(parents=True, exist_ok=True)
+    (workdir / "src" / "db").mkdir(parents=True, exist_ok=True)
+    shutil.copy(PROJECT_ROOT / "src" / "db" / "schema.sql", workdir / "src" / "db" / "schema.sql")
+    write_roster_csv(workdir / "data" / "persons.csv", roster)
+
+
+def run_stage(stage: str, roster, workers: int) -> dict:
+    """Run one stage in the current directory; returns items and latency samples."""
+    from src import main
+    from src.collectors import wikipedia_collector
+    from src.collectors.feed_cache import FeedCache
+    from src.collectors.x_url_summarizer import summarize_urls
+
+    samples = Samples()
+    if stage not in ("main", "main_warm"):
+        main._bootstrap(max_requests=max(8, workers))
+    persons = main.read_persons()
+
+    if stage == "wikipedia":
+        wikipedia_collector._query = samples.wrap(wikipedia_collector._query)
+        wikipedia_collector.collect_wikipedia_batch(p["name"] for p in persons)
+        return {"items": len(persons), "samples": samples.values}
+    if stage == "rss":
+        feeds = sorted({u for p in persons for u in p["rss"]})
+        cache = FeedCache()
+        main._run_pool(samples.wrap(lambda p: cache.get_entries(p["name"])), [{"name": u} for u in feeds], workers)
+        return {"items": len(feeds), "samples": samples.values}
+    if stage == "x_url":
+        main._run_pool(samples.wrap(lambda p: summarize_urls(p["x_urls"])), persons, workers)
+        return {"items": len(persons), "samples": samples.values}
+    if stage == "collect":
+        main.collect_person = samples.wrap(main.collect_person)
+        main.collect_persons(persons, workers=workers)
+        return {"items": len(persons), "samples": samples.values}
+    if stage == "render":
+        main.publish_article = samples.wrap(main.publish_article)
+        main.render_persons(persons)
+        return {"items": len(persons), "samples": samples.values}
+    if stage in ("main", "main_warm"):
+        main.process_person = samples.wrap(main.process_person)
+        main.main(workers=workers, max_requests=max(8, workers), stage="all")
+        return {"items": len(persons), "samples": samples.values}
+    raise ValueError(f"unknown stage {stage}")
+
+
+def _child(stage, workdir, roster, workers, queue) -> None:
+    os.chdir(workdir)
+    logging.disable(logging.WARNING)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = run_stage(stage, roster, workers)
+            result["seconds"] = time.perf_counter() - start
+        result["peak_rss_mb"] = peak_rss_mb()
+        queue.put(result)
+    except BaseException as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+        raise
+
+
+def measure(stage: str, workdir: Path, roster, workers: int, server: StubServer) -> dict:
+    requests_before = server.state.requests
+    if "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_child, args=(stage, str(workdir), roster, workers, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        isolated = True
+    else:
+        import queue as queue_mod
+
+        q = queue_mod.Queue()
+        cwd = os.getcwd()
+        try:
+            _child(stage, str(workdir), roster, workers, q)
+        finally:
+            os.chdir(cwd)
+        result = q.get()
+        isolated = False
+    if "error" in result:
+        raise RuntimeError(f"stage {stage} failed: {result['error']}")
+    samples = result.pop("samples")
+    seconds = result["seconds"]
+    return {
+        "bench": "pipeline",
+        "stage": stage,
+        "persons": len(roster),
+        "workers": workers,
+        "items": result["items"],
+        "seconds": round(seconds, 4),
+        "throughput_per_s": round(result["items"] / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3) if samples else None,
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3) if samples else None,
+        "peak_rss_mb": result["peak_rss_mb"],
+        "http_requests": server.state.requests - requests_before,
+        "isolated": isolated,
+    }
+
+
+def run(sizes, stages, workers: int, llm_latency: float):
+    records = []
+    for n in sizes:
+        feeds = max(1, n // PERSONS_PER_FEED)
+        with StubServer(n, feeds) as server, tempfile.TemporaryDirectory(prefix="press-bench-") as tmp:
+            _configure(server.base_url, llm_latency)
+            roster = make_roster(n, server.base_url, feeds)
+            for stage in stages:
+                # render and main_warm continue from the previous stage's data
+                reuse = {"render": "collect", "main_warm": "main"}.get(stage)
+                workdir = Path(tmp) / (reuse if reuse and reuse in stages else stage)
+                if not workdir.exists():
+                    _prepare(workdir, roster)
+                record = measure(stage, workdir, roster, workers, server)
+                print(json.dumps(record), flush=True)
+                records.append(record)
+    return records
+
+
+def compare(records, baseline_path: str, fail_over: float) -> int:
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    old = {(r["stage"], r["persons"]): r for r in baseline.get("records", baseline)}
+    regressions = 0
+    for r in records:
+        b = old.get((r["stage"], r["persons"]))
+        if not b or not b.get("seconds"):
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        slower = ratio > 1 + fail_over
+        regressions += slower
+        print(json.dumps({
+            "compare": r["stage"], "persons": r["persons"], "seconds": r["seconds"], "baseline_seconds": b["seconds"],
+            "ratio": round(ratio, 3), "p95_ms": r["p95_ms"], "baseline_p95_ms": b.get("p95_ms"), "regression": slower,
+        }))
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--persons", default="10,100", help="comma-separated roster sizes")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="write the full report (JSON) here")
+    parser.add_argument("--compare", help="baseline report to compare against")
+    parser.add_argument("--fail-over", type=float, default=0.2, help="allowed slowdown before --compare fails")
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.persons.split(",") if x]
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    records = run(sizes, stages, args.workers, args.llm_latency_ms / 1000.0)
+    if args.output:
+        report = {"commit": git_commit(), "python": platform.python_version(), "cpus": os.cpu_count(), "records": records}
+        Path(args.output).write_text(json.dumps(report, indent=1), encoding="utf-8")
+    if args.compare:
+        return compare(records, args.compare, args.fail_over)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Benchmark per-article render cost before and after ArticleRenderer.
+
+Usage:
+    python benchmarks/bench_render.py [N_ARTICLES] [PROCESSES]
+
+"before" rebuilds the Jinja template and a Markdown instance per article,
+as the generator did originally; "after" reuses one ArticleRenderer, and
+"batch" calls render_many (with a process pool when PROCESSES > 1).
+Prints one JSON object per method.
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from jinja2 import Template
+from markdown import markdown
+
+from src.generators.article_generator import DEFAULT_TEMPLATE, ArticleRenderer, _wrap_html
+
+
+def make_items(n: int) -> list:
+    return [
+        {
+            "name": f"Person {i}",
+            "summary": "A politician. " * 20,
+            "activities": [
+                {"title": f"Speech {j}", "published": "2024-01-01", "content": "Talked about policy. " * 10}
+                for j in range(20)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def before(items: list) -> None:
+    for it in items:
+        md = Template(DEFAULT_TEMPLATE).render(name=it["name"], summary=it["summary"], activities=it["activities"])
+        _wrap_html(markdown(md))
+
+
+def after(items: list) -> None:
+    renderer = ArticleRenderer()
+    for it in items:
+        renderer.render(it["name"], it["summary"], it["activities"])
+
+
+def report(method: str, n: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"method": method, "articles": n, "seconds": round(elapsed, 4), "ms_per_article": round(elapsed * 1000 / n, 3)}))
+
+
+def main(argv) -> None:
+    n = int(argv[0]) if argv else 1000
+    processes = int(argv[1]) if len(argv) > 1 else (os.cpu_count() or 1)
+    items = make_items(n)
+    report("before", n, lambda: before(items))
+    report("after", n, lambda: after(items))
+    report(f"batch_p{processes}", n, lambda: ArticleRenderer().render_many(items, processes=processes))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
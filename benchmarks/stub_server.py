@@ -0,0 +1,160 @@
+"""Local stub HTTP server for benchmarks: synthetic RSS feeds, a MediaWiki
+query API and HTML pages, all derived from a synthetic roster.
+
+Routes:
+    /feed/<k>.xml      RSS feed k (ETag / If-None-Match supported)
+    /<lang>/api.php    MediaWiki query API (prop=info and prop=extracts)
+    /page/<i>.html     an HTML page of roughly PAGE_KB kilobytes
+"""
+import json
+import sys
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+ITEMS_PER_FEED = 20
+PAGE_KB = 40
+
+
+def person_name(i: int) -> str:
+    return f"Person{i:05d} Example"
+
+
+def make_roster(n: int, base_url: str, feeds: int, x_urls_per_person: int = 1) -> List[dict]:
+    """Roster rows in data/persons.csv shape (lists joined with ';' on write)."""
+    rows = []
+    for i in range(n):
+        rows.append({
+            "name": person_name(i),
+            "rss": [f"{base_url}/feed/{i % feeds}.xml"],
+            "x_urls": [f"{base_url}/page/{i * x_urls_per_person + j}.html" for j in range(x_urls_per_person)],
+            "aliases": [],
+        })
+    return rows
+
+
+def write_roster_csv(path, rows: List[dict]) -> None:
+    import csv
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["name", "rss", "x_urls", "aliases"])
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: ";".join(r[k]) if isinstance(r[k], list) else r[k] for k in w.fieldnames})
+
+
+class StubState:
+    def __init__(self, persons: int, feeds: int):
+        self.persons = persons
+        self.feeds = feeds
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def feed(self, k: int) -> bytes:
+        members = list(range(k, self.persons, self.feeds)) or [0]
+        items = []
+        for j in range(ITEMS_PER_FEED):
+            who = person_name(members[j % len(members)])
+            items.append(
+                f"<item><title>{who} comments on topic {j}</title>"
+                f"<link>https://news.example/{k}/{j}</link>"
+                f"<pubDate>{formatdate(1700000000 + k * 1000 + j * 60, usegmt=True)}</pubDate>"
+                f"<description>{who} said something about policy {j}. " + "Details follow. " * 20 + "</description></item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f"<title>Feed {k}</title>" + "".join(items) + "</channel></rss>"
+        ).encode("utf-8")
+
+    def page(self, i: int) -> bytes:
+        para = f"<p>Paragraph about page {i}. " + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8 + "</p>"
+        body = para * max(1, PAGE_KB * 1024 // len(para))
+        return f"<html><head><title>Page {i}</title><script>var x = 1;</script></head><body>{body}</body></html>".encode("utf-8")
+
+    def wiki(self, lang: str, query: dict) -> bytes:
+        pages = []
+        for title in query.get("titles", [""])[0].split("|"):
+            try:
+                i = int(title[6:11])
+            except ValueError:
+                i = -1
+            # ja only has even-numbered persons, so en gets the rest
+            if i < 0 or (lang == "ja" and i % 2):
+                pages.append({"title": title, "missing": True})
+                continue
+            page = {"title": title, "lastrevid": 1000 + i}
+            if query.get("prop") == ["extracts"]:
+                page["extract"] = f"{title} is a synthetic politician ({lang}). " * 5
+            pages.append(page)
+        return json.dumps({"batchcomplete": True, "query": {"pages": pages}}).encode("utf-8")
+
+
+def _handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+            parts = urlsplit(self.path)
+            path = parts.path.strip("/").split("/")
+            ctype, etag = "text/html; charset=utf-8", None
+            if path[0] == "feed":
+                k = int(path[1].split(".")[0])
+                etag = f'"feed-{k}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body, ctype = state.feed(k), "application/rss+xml"
+            elif path[0] == "page":
+                body = state.page(int(path[1].split(".")[0]))
+            elif len(path) == 2 and path[1] == "api.php":
+                body, ctype = state.wiki(path[0], parse_qs(parts.query)), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients (forked benchmark stages) exit with keep-alive connections open
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Serve the synthetic data on 127.0.0.1 from a background thread."""
+
+    def __init__(self, persons: int, feeds: int):
+        self.state = StubState(persons, feeds)
+        self.httpd = _Server(("127.0.0.1", 0), _handler(self.state))
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,113 @@
+"""Per-run feed cache with conditional GET.
+
+Each distinct feed URL is fetched and parsed at most once per run and the
+parsed entries are shared with every person that lists the feed. ETag and
+Last-Modified validators are persisted in the ``feeds`` table so later runs
+send conditional requests; on 304 the entries stored from the last full
+response are reused without parsing.
+
+Only the first MAX_FEED_ENTRIES entries of a feed are parsed; the parser
+stops reading the document there. Entry titles and summaries are normalized
+once per feed (see text_cleaner.IngestNormalizer) before they are matched,
+stored or shared.
+"""
+import logging
+import threading
+import weakref
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from src.collectors.rss_collector import fetch_feed
+from src.db import repository as repo
+from src.utils import metrics
+from src.utils.text_cleaner import get_default_normalizer
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_FEED_ENTRIES = 200
+
+
+class FeedCache:
+    def __init__(self, conditional: bool = True, max_entries: Optional[int] = MAX_FEED_ENTRIES, normalizer=None):
+        self.conditional = conditional
+        self.max_entries = max_entries
+        self.normalizer = normalizer or get_default_normalizer()
+        self._results: Dict[str, Union[List[Dict], Exception]] = {}
+        self._url_locks: Dict[str, threading.Lock] = {}
+        # matcher -> url -> matched entries; results depend on the matcher, and
+        # a per-person matcher's results go away with it
+        self._matches = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = {"fetched": 0, "not_modified": 0, "shared": 0}
+
+    def get_entries(self, url: str) -> List[Dict]:
+        """Return parsed entries for `url`, fetching it only on first use.
+
+        A fetch error is remembered and re-raised for every caller so a broken
+        feed is not retried once per person.
+        """
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            if url in self._results:
+                with self._lock:
+                    self.stats["shared"] += 1
+                metrics.inc("feed_requests_total", result="shared")
+                result = self._results[url]
+            else:
+                try:
+                    result = self._load(url)
+                except Exception as e:
+                    result = e
+                self._results[url] = result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get_matched_entries(self, url: str, matcher) -> List[Tuple[Dict, Set[str]]]:
+        """Return ``(entry, mentioned_names)`` pairs for `url`.
+
+        Each entry is scanned by a given matcher (normally the run-wide
+        NameMatcher) once, no matter how many persons list the feed.
+        """
+        entries = self.get_entries(url)
+        with self._lock:
+            by_url = self._matches.setdefault(matcher, {})
+            matched = by_url.get(url)
+        if matched is None:
+            matched = [(e, matcher.match_entry(e)) for e in entries]
+            with self._lock:
+                matched = by_url.setdefault(url, matched)
+        return matched
+
+    def _load(self, url: str) -> List[Dict]:
+        state = None
+        if self.conditional:
+            try:
+                state = repo.get_feed_state(url)
+            except Exception:
+                LOGGER.debug("feed state unavailable for %s", url, exc_info=True)
+        res = fetch_feed(
+            url,
+            etag=state["etag"] if state else None,
+            last_modified=state["last_modified"] if state else None,
+            limit=self.max_entries,
+        )
+        if res["entries"] is None and state is not None:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            metrics.inc("feed_requests_total", result="not_modified")
+            repo.touch_feed(url)
+            # stored entries are already marked normalized and pass through;
+            # ones stored before normalization existed are cleaned here
+            return self.normalizer.normalize_entries(state["entries"])
+        entries = self.normalizer.normalize_entries(res["entries"] or [])
+        if res["status"] != 200:
+            # keep the stored validators and entries for the next run
+            metrics.inc("feed_requests_total", result="error")
+            return entries
+        with self._lock:
+            self.stats["fetched"] += 1
+        metrics.inc("feed_requests_total", result="fetched")
+        if self.conditional and (res["etag"] or res["last_modified"]):
+            repo.save_feed_state(url, res["etag"], res["last_modified"], entries)
+        return entries
@@ -0,0 +1,146 @@
+"""Shared HTTP client used by all collectors.
+
+A single pooled ``requests.Session`` gives connection reuse and keep-alive
+across collectors. Every request goes through a global in-flight cap plus a
+per-host limiter (concurrency and requests-per-second), and uses the same
+timeout and retry policy. ``fetch_many`` fetches a batch of URLs on a thread
+pool while still honouring those limits.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils import metrics
+
+LOGGER = logging.getLogger(__name__)
+
+USER_AGENT = "press-project-bot/1.0"
+DEFAULT_TIMEOUT = 10
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _HostLimiter:
+    """Concurrency slots plus a simple requests-per-second pacer for one host."""
+
+    def __init__(self, concurrency: int, rps: Optional[float]):
+        self.slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._interval = 1.0 / rps if rps else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait_turn(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class HttpClient:
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        per_host_concurrency: int = 4,
+        per_host_rps: Optional[float] = 5.0,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_maxsize: int = 16,
+    ):
+        self.timeout = timeout
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rps = per_host_rps
+        self._in_flight = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._limiters: Dict[str, _HostLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _limiter(self, url: str) -> _HostLimiter:
+        host = urlsplit(url).netloc.lower()
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = _HostLimiter(self.per_host_concurrency, self.per_host_rps)
+                self._limiters[host] = limiter
+            return limiter
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """GET `url` within the global and per-host limits. Raises on network errors."""
+        limiter = self._limiter(url)
+        with self._in_flight, limiter.slots:
+            limiter.wait_turn()
+            if not metrics.enabled():
+                return self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+            host = urlsplit(url).netloc.lower()
+            with metrics.timer("http_request_seconds", host=host):
+                resp = self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+            metrics.inc("http_requests_total", host=host, status=resp.status_code)
+            if not kwargs.get("stream"):
+                # streamed bodies are counted by the caller as they are read
+                metrics.inc("http_bytes_total", len(resp.content), host=host)
+            return resp
+
+    def fetch_many(self, urls: Iterable[str], workers: int = 8, **kwargs) -> Dict[str, Optional[requests.Response]]:
+        """Fetch several URLs concurrently. Failed fetches map to None."""
+        unique = list(dict.fromkeys(urls))
+
+        def _one(u: str) -> Optional[requests.Response]:
+            try:
+                return self.get(u, **kwargs)
+            except Exception as e:
+                LOGGER.warning("Fetch failed for %s: %s", u, e)
+                return None
+
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique)))) as pool:
+            return dict(zip(unique, pool.map(_one, unique)))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide client, creating it with defaults on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def configure(**kwargs) -> HttpClient:
+    """Replace the process-wide client with one built from `kwargs`."""
+    global _client
+    with _client_lock:
+        old, _client = _client, HttpClient(**kwargs)
+    if old is not None:
+        old.close()
+    return _client
@@ -0,0 +1,91 @@
+"""Content-addressed cache for LLM summaries.
+
+Entries are keyed by (url, hash of the cleaned page text, prompt, model), so a
+stored summary is reused only while the page content is unchanged. Entries
+expire after ``ttl_seconds`` and the table is bounded to ``max_entries`` by
+evicting the least recently used rows. Storage errors are treated as misses so
+the cache can never break summarization.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.db import repository as repo
+from src.utils import metrics
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def make_cache_key(url: str, page_text: str, prompt: str, model: str) -> str:
+    text_hash = hashlib.sha256(page_text.encode("utf-8")).hexdigest()
+    return hashlib.sha256("\x1f".join([url, text_hash, prompt, model]).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool) -> None:
+        metrics.inc("llm_cache_total", result="hit" if hit else "miss")
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = int(self._clock())
+        try:
+            with repo.session() as db:
+                row = db.get_llm_cache(key)
+                if row and self.ttl_seconds is not None and now - row["created_at"] > self.ttl_seconds:
+                    db.delete_llm_cache(key)
+                    row = None
+                if row:
+                    db.touch_llm_cache(key, now)
+        except Exception:
+            LOGGER.debug("llm cache lookup failed", exc_info=True)
+            row = None
+        self._count(row is not None)
+        return row["response"] if row else None
+
+    def put(self, key: str, url: Optional[str], model: str, response: str) -> None:
+        now = int(self._clock())
+        expire_before = now - self.ttl_seconds if self.ttl_seconds is not None else None
+        try:
+            with repo.session() as db:
+                db.put_llm_cache(key, url, model, response, now)
+                db.evict_llm_cache(self.max_entries, expire_before=expire_before)
+        except Exception:
+            LOGGER.debug("llm cache store failed", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> LLMCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
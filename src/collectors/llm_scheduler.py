@@ -0,0 +1,198 @@
+"""Concurrent, rate-limit-aware scheduler for LLM requests.
+
+Jobs are queued and dispatched to a small worker pool while staying inside a
+requests-per-minute and a tokens-per-minute budget. A failed job is put back
+on the queue with jittered exponential backoff instead of sleeping, so one
+slow or failing URL never blocks the others.
+
+Budgets default to the LLM_RPM / LLM_TPM environment variables.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+
+from src.utils import metrics
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RPM = 60
+DEFAULT_TPM = 90000
+
+
+def _char_tokens(c: str) -> float:
+    # ~4 characters per token for Latin text; CJK and other non-ASCII
+    # characters are roughly one token each
+    return 0.25 if c < "\x80" else 1.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate that does not need a tokenizer."""
+    if not text:
+        return 0
+    non_ascii = sum(1 for c in text if c >= "\x80")
+    return int((len(text) - non_ascii) / 4 + non_ascii) + 1
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Return the longest prefix of `text` whose estimate fits in `budget` tokens."""
+    if estimate_tokens(text) <= budget:
+        return text
+    used = 0.0
+    for i, c in enumerate(text):
+        used += _char_tokens(c)
+        if used > budget - 1:
+            return text[:i]
+    return text
+
+
+class _Budget:
+    """Per-minute budget refilled continuously (a token bucket)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def wait_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if it is available now)."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class _Job:
+    __slots__ = ("call", "system", "user", "model", "max_tokens", "retries", "attempt", "tokens", "future")
+
+    def __init__(self, call, system, user, model, max_tokens, retries):
+        self.call = call
+        self.system = system
+        self.user = user
+        self.model = model
+        self.max_tokens = max_tokens
+        self.retries = max(1, retries)
+        self.attempt = 0
+        self.tokens = estimate_tokens(system) + estimate_tokens(user) + max_tokens
+        self.future: Future = Future()
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        call: Optional[Callable[..., Optional[str]]] = None,
+        max_workers: int = 4,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        self.call = call
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests = _Budget(rpm or float(os.getenv("LLM_RPM", DEFAULT_RPM)))
+        self._tokens = _Budget(tpm or float(os.getenv("LLM_TPM", DEFAULT_TPM)))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._queue: List = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(
+        self,
+        system: str,
+        user: str,
+        model: str,
+        max_tokens: int = 512,
+        retries: int = 3,
+        call: Optional[Callable[..., Optional[str]]] = None,
+    ) -> Future:
+        """Queue one chat request. The future resolves to the text or None."""
+        fn = call or self.call
+        if fn is None:
+            raise ValueError("no LLM call configured")
+        job = _Job(fn, system, user, model, max_tokens, retries)
+        self._push(job, time.monotonic())
+        return job.future
+
+    def _push(self, job: _Job, ready_at: float) -> None:
+        with self._cond:
+            if self._closed:
+                job.future.set_result(None)
+                return
+            heapq.heappush(self._queue, (ready_at, next(self._seq), job))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-dispatch", daemon=True)
+                self._dispatcher.start()
+            self._cond.notify()
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while not self._closed:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                ready_at, _, job = self._queue[0]
+                if ready_at > now:
+                    self._cond.wait(ready_at - now)
+                    continue
+                wait = max(self._requests.wait_for(1, now), self._tokens.wait_for(job.tokens, now))
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._queue)
+                self._requests.take(1)
+                self._tokens.take(job.tokens)
+                self._pool.submit(self._run, job)
+
+    def _run(self, job: _Job) -> None:
+        job.attempt += 1
+        try:
+            with metrics.timer("llm_call_seconds", model=job.model):
+                result = job.call(job.system, job.user, model=job.model, max_tokens=job.max_tokens)
+        except Exception:
+            LOGGER.exception("LLM call raised (attempt %d)", job.attempt)
+            result = None
+        metrics.inc("llm_calls_total", result="ok" if result else "failed")
+        if result or job.attempt >= job.retries:
+            job.future.set_result(result or None)
+            return
+        delay = min(self.max_delay, self.base_delay * 2 ** (job.attempt - 1))
+        delay *= 0.5 + random.random()
+        LOGGER.warning("LLM attempt %d failed, retrying in %.1fs", job.attempt, delay)
+        self._push(job, time.monotonic() + delay)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            pending = [job for _, _, job in self._queue]
+            self._queue.clear()
+            self._cond.notify_all()
+        for job in pending:
+            job.future.set_result(None)
+        self._pool.shutdown(wait=True)
+
+
+_default_scheduler: Optional[LLMScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> LLMScheduler:
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMScheduler(max_workers=int(os.getenv("LLM_WORKERS", "4")))
+        return _default_scheduler
@@ -1,17 +1,66 @@
-"""Simple RSS/Atom feed parser using feedparser."""
-import feedparser
-from typing import List, Dict
+"""Fetch RSS/Atom feeds; parsing is done by src/collectors/feed_parser.py."""
+import logging
+from pathlib import Path
+from typing import List, Dict, Optional, Any
+
+from src.collectors.feed_parser import parse_entries
+from src.collectors.http_client import get_client
+
+LOGGER = logging.getLogger(__name__)
+
+
+def fetch_feed(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    limit: Optional[int] = None,
+    since: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Conditionally fetch and parse a feed.
+
+    Returns a dict with ``status``, ``etag``, ``last_modified`` and ``entries``.
+    ``entries`` is None when the server answered 304 Not Modified, in which
+    case the body is not parsed at all, and empty (with no validators) for
+    any other non-200 status. `limit` and `since` (epoch seconds)
+    let the parser stop early; see feed_parser.iter_entries.
+    """
+    if not url.startswith(("http://", "https://")):
+        # a local file or the feed document itself
+        try:
+            data = Path(url).read_bytes()
+        except (OSError, ValueError):  # ValueError: embedded NUL
+            data = url.encode("utf-8")
+        entries = parse_entries(data, limit=limit, since=since)
+        return {"status": 200, "etag": None, "last_modified": None, "entries": entries}
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    resp = get_client().get(url, headers=headers)
+    result = {
+        "status": resp.status_code,
+        "etag": resp.headers.get("ETag") or etag,
+        "last_modified": resp.headers.get("Last-Modified") or last_modified,
+        "entries": None,
+    }
+    if resp.status_code == 304:
+        return result
+    if resp.status_code != 200:
+        LOGGER.warning("Failed to fetch feed %s: status=%s", url, resp.status_code)
+        # an error response does not describe the feed: drop the validators
+        return {"status": resp.status_code, "etag": None, "last_modified": None, "entries": []}
+    result["entries"] = parse_entries(
+        resp.content, base_url=url, content_type=resp.headers.get("Content-Type", ""), limit=limit, since=since
+    )
+    return result
 
 
 def parse_rss_feed(url: str) -> List[Dict]:
-    """Fetch RSS/Atom feed and return list of entries as dicts."""
-    feed = feedparser.parse(url)
-    entries = []
-    for e in getattr(feed, "entries", []):
-        entries.append({
-            "title": e.get("title"),
-            "link": e.get("link"),
-            "published": e.get("published"),
-            "summary": e.get("summary", ""),
-        })
-    return entries
+    """Fetch RSS/Atom feed and return list of entries as dicts.
+
+    HTTP(S) feeds are downloaded through the shared client so they get
+    connection reuse and per-host limits.
+    """
+    return fetch_feed(url)["entries"] or []
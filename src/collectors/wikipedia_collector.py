@@ -1,19 +1,205 @@
-"""Fetch short summary from Wikipedia REST API."""
-import requests
-from typing import Optional
+"""Fetch short summaries from Wikipedia in batches.
 
-WIKI_API_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/{}"
+Titles are resolved with the MediaWiki query API, up to 50 per request
+(normalization and redirects included), which also returns each page's
+latest revision id. Intro extracts are then fetched, 20 per request, only for
+pages whose revision changed since they were cached. Japanese is tried first,
+then English for titles ja does not have.
+
+Results are cached on disk (data/wikipedia_cache.json) per language and title
+with the revision id and fetch time; entries younger than the TTL are used
+without any request. Failed requests are logged and fall back to the cached
+(possibly stale) summary.
+
+WIKI_API_BASE overrides the API URL (``{lang}`` is replaced), e.g. to point
+tests at a local stub server.
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from src.collectors.http_client import get_client
+from src.utils import metrics
+from src.utils.fileio import write_atomic
+
+LOGGER = logging.getLogger(__name__)
+
+WIKI_API_BASE = os.getenv("WIKI_API_BASE", "https://{lang}.wikipedia.org/w/api.php")
+DEFAULT_LANGS = ("ja", "en")
+DEFAULT_CACHE_PATH = Path("data") / "wikipedia_cache.json"
+DEFAULT_TTL = 24 * 3600
+# MediaWiki limits: 50 titles per query, 20 intro extracts per request.
+TITLES_PER_REQUEST = 50
+EXTRACTS_PER_REQUEST = 20
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class WikipediaCache:
+    """On-disk summary cache: "lang:title" -> {title, revid, summary, fetched_at}."""
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (ValueError, OSError):
+                LOGGER.warning("Ignoring unreadable Wikipedia cache %s", self.path)
+
+    def get(self, lang: str, title: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.get(f"{lang}:{title}")
+
+    def fresh(self, lang: str, title: str) -> bool:
+        entry = self.get(lang, title)
+        return entry is not None and self.clock() - entry.get("fetched_at", 0) < self.ttl
+
+    def put(self, lang: str, title: str, entry: Dict) -> None:
+        entry = dict(entry, fetched_at=self.clock())
+        with self._lock:
+            self._entries[f"{lang}:{title}"] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries, ensure_ascii=False, sort_keys=True)
+            self._dirty = False
+        write_atomic(self.path, data)
+
+
+def _query(lang: str, params: Dict[str, str], api_base: Optional[str] = None) -> Dict:
+    url = (api_base or WIKI_API_BASE).format(lang=lang)
+    params = dict(params, action="query", format="json", formatversion="2")
+    metrics.inc("wikipedia_requests_total", lang=lang, prop=params.get("prop"))
+    resp = get_client().get(url, params=params)
+    resp.raise_for_status()
+    return resp.json().get("query") or {}
+
+
+def _resolve(query: Dict, title: str) -> str:
+    for key in ("normalized", "redirects"):
+        for m in query.get(key) or []:
+            if m.get("from") == title:
+                title = m.get("to", title)
+    return title
+
+
+def _fetch_lang(lang: str, titles: List[str], cache: WikipediaCache, api_base: Optional[str]) -> None:
+    """Refresh cache entries for `titles` in one language edition."""
+    stale: Dict[str, Dict] = {}  # page title -> info for pages needing an extract
+    requested: Dict[str, List[str]] = {}
+    for chunk in _chunks(titles, TITLES_PER_REQUEST):
+        try:
+            query = _query(lang, {"prop": "info", "redirects": "1", "titles": "|".join(chunk)}, api_base)
+        except Exception as e:
+            LOGGER.warning("Wikipedia (%s) info query failed for %d titles: %s", lang, len(chunk), e)
+            continue
+        pages = {p.get("title"): p for p in query.get("pages") or []}
+        for title in chunk:
+            page = pages.get(_resolve(query, title))
+            if page is None or page.get("missing") or page.get("invalid"):
+                cache.put(lang, title, {"title": None, "revid": None, "summary": None})
+                continue
+            revid = page.get("lastrevid")
+            cached = cache.get(lang, title)
+            if cached and cached.get("revid") == revid and cached.get("title") == page["title"]:
+                # unchanged page: keep the summary, just restart the TTL
+                cache.put(lang, title, cached)
+                continue
+            stale[page["title"]] = {"revid": revid}
+            requested.setdefault(page["title"], []).append(title)
+
+    for chunk in _chunks(list(stale), EXTRACTS_PER_REQUEST):
+        params = {
+            "prop": "extracts", "exintro": "1", "explaintext": "1",
+            "exlimit": str(len(chunk)), "titles": "|".join(chunk),
+        }
+        try:
+            query = _query(lang, params, api_base)
+        except Exception as e:
+            LOGGER.warning("Wikipedia (%s) extract query failed for %d pages: %s", lang, len(chunk), e)
+            continue
+        extracts = {p.get("title"): p.get("extract") for p in query.get("pages") or []}
+        for page_title in chunk:
+            summary = (extracts.get(page_title) or "").strip() or None
+            for title in requested[page_title]:
+                cache.put(lang, title, {"title": page_title, "revid": stale[page_title]["revid"], "summary": summary})
+
+
+def collect_wikipedia_batch(
+    titles: Iterable[str],
+    langs: Iterable[str] = DEFAULT_LANGS,
+    cache: Optional[WikipediaCache] = None,
+    api_base: Optional[str] = None,
+) -> Dict[str, Optional[str]]:
+    """Return title -> summary (None if no edition has the page).
+
+    Each language is only asked about titles not found in the previous ones,
+    and only about titles whose cache entry has expired.
+    """
+    cache = cache or WikipediaCache()
+    titles = list(dict.fromkeys(t.strip() for t in titles if t and t.strip()))
+    results: Dict[str, Optional[str]] = {}
+    remaining = titles
+    for lang in langs:
+        due = [t for t in remaining if not cache.fresh(lang, t)]
+        metrics.inc("wikipedia_cache_total", len(remaining) - len(due), result="fresh")
+        metrics.inc("wikipedia_cache_total", len(due), result="due")
+        if due:
+            _fetch_lang(lang, due, cache, api_base)
+        missing = []
+        for title in remaining:
+            entry = cache.get(lang, title)
+            if entry and entry.get("summary"):
+                results[title] = entry["summary"]
+            else:
+                missing.append(title)
+        remaining = missing
+    cache.save()
+    for title in remaining:
+        results[title] = None
+    return results
+
+
+class WikipediaSummaries:
+    """Run-wide summaries for a roster, fetched in batches on first use."""
+
+    def __init__(self, titles: Iterable[str], cache: Optional[WikipediaCache] = None, api_base: Optional[str] = None):
+        self._titles = list(titles)
+        self._cache = cache
+        self._api_base = api_base
+        self._lock = threading.Lock()
+        self._summaries: Optional[Dict[str, Optional[str]]] = None
+
+    def get(self, title: str) -> Optional[str]:
+        with self._lock:
+            if self._cache is None:
+                self._cache = WikipediaCache()
+            if self._summaries is None:
+                self._summaries = collect_wikipedia_batch(self._titles, cache=self._cache, api_base=self._api_base)
+            if title not in self._summaries:
+                self._summaries.update(collect_wikipedia_batch([title], cache=self._cache, api_base=self._api_base))
+            return self._summaries.get(title)
 
 
 def collect_wikipedia(name: str) -> Optional[str]:
-    """Fetch a short summary from Wikipedia REST API (title-cased)."""
-    title = name.replace(" ", "_")
-    url = WIKI_API_URL.format(title)
+    """Fetch a short summary for one title (ja, then en)."""
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            return data.get("extract")
+        return collect_wikipedia_batch([name]).get(name.strip())
     except Exception:
+        LOGGER.exception("Wikipedia lookup failed for %s", name)
         return None
-    return None
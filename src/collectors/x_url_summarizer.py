@@ -1,21 +1,33 @@
 """Summarize a given X/Twitter URL's page using OpenAI's Chat API.
 
-This module does NOT use the Twitter API. It downloads the page HTML, extracts
-text using BeautifulSoup, and then calls OpenAI to produce a short factual
-summary. It includes retries, logging, and a fallback that returns an
-abbreviated cleaned text when the LLM call fails.
+This module does NOT use the Twitter API. It streams the page HTML (up to a
+byte cap), extracts visible text incrementally and stops once it has enough,
+falling back to a full BeautifulSoup parse if streaming extraction fails. It
+then calls OpenAI to produce a short factual summary. LLM calls go through
+the shared rate-limited scheduler (retries with backoff happen there), and a
+fallback returns an abbreviated cleaned text when the LLM call fails.
+Successful summaries are cached by (url, page text hash, prompt, model) so
+unchanged pages skip the API.
 
 Environment variables:
 - OPENAI_API_KEY: required for OpenAI calls
 """
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+import codecs
 import os
-import time
 import logging
+import re
 
-import requests
 from bs4 import BeautifulSoup
 
+from src.collectors.http_client import get_client
+from src.collectors.llm_cache import LLMCache, get_default_cache, make_cache_key
+from src.collectors.llm_scheduler import LLMScheduler, get_default_scheduler, truncate_to_tokens
+from src.utils import metrics
+from src.utils.text_cleaner import extract_text_streaming, join_text_lines
+
 try:
     import openai
 except Exception:
@@ -23,6 +35,15 @@ except Exception:
 
 LOGGER = logging.getLogger(__name__)
 OPENAI_API_KEY_ENV = "OPENAI_API_KEY"
+DEFAULT_MODEL = "gpt-3.5-turbo"
+# Page text budget for the user message, measured in estimated tokens.
+MAX_INPUT_TOKENS = 5000
+# Cleaned page text kept per URL, and the most we download to get it.
+MAX_PAGE_CHARS = 30000
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_-]+)""", re.I)
 
 
 DEFAULT_PROMPT = (
@@ -34,27 +55,85 @@ DEFAULT_PROMPT = (
 )
 
 
-def _fetch_page_text(url: str, timeout: int = 10) -> Optional[str]:
+def _extract_text_soup(html_text: str, max_chars: int = MAX_PAGE_CHARS) -> str:
+    """Full-document extraction with BeautifulSoup (the original behaviour)."""
+    soup = BeautifulSoup(html_text, "html.parser")
+    # remove scripts and styles
+    for s in soup(["script", "style", "noscript"]):
+        s.extract()
+    text = soup.get_text(separator="\n")
+    # collapse whitespace and trim
+    return join_text_lines(text, max_chars)
+
+
+def _response_encoding(resp, first_chunk: bytes) -> str:
+    # requests assumes ISO-8859-1 for text/* without a charset; prefer the
+    # page's own <meta charset> in that case, then UTF-8
+    if "charset" in (resp.headers.get("Content-Type") or "").lower() and resp.encoding:
+        return resp.encoding
+    m = _META_CHARSET_RE.search(first_chunk)
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def _iter_decoded(resp, raw_chunks: Iterator[bytes], max_bytes: int, seen: list) -> Iterator[str]:
+    """Decode response chunks, stopping after `max_bytes`. Raw bytes go to `seen`."""
+    decoder = None
+    total = 0
+    for chunk in raw_chunks:
+        if not chunk:
+            continue
+        chunk = chunk[: max_bytes - total]
+        total += len(chunk)
+        seen.append(chunk)
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(_response_encoding(resp, chunk))(errors="replace")
+        yield decoder.decode(chunk)
+        if total >= max_bytes:
+            break
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
+
+
+def _fetch_page_text(url: str, timeout: int = 10, max_bytes: int = MAX_PAGE_BYTES, streaming: bool = True) -> Optional[str]:
+    try:
+        resp = get_client().get(url, timeout=timeout, stream=True)
+    except Exception as e:
+        LOGGER.exception("Error fetching page %s: %s", url, e)
+        return None
+    seen: list = []
     try:
-        resp = requests.get(url, timeout=timeout, headers={"User-Agent": "press-project-bot/1.0"})
         if resp.status_code != 200:
             LOGGER.warning("Failed to fetch %s: status=%s", url, resp.status_code)
             return None
-        soup = BeautifulSoup(resp.text, "html.parser")
-        # remove scripts and styles
-        for s in soup(["script", "style", "noscript"]):
-            s.extract()
-        text = soup.get_text(separator="\n")
-        # collapse whitespace and trim
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-        joined = "\n\n".join(lines)
-        return joined[:30000]
+        if streaming:
+            try:
+                return extract_text_streaming(
+                    _iter_decoded(resp, resp.iter_content(CHUNK_SIZE), max_bytes, seen), MAX_PAGE_CHARS
+                )
+            except Exception:
+                LOGGER.warning("Streaming extraction failed for %s; falling back to BeautifulSoup", url, exc_info=True)
+        # fallback: read the remainder (still capped) and parse the whole document
+        try:
+            for _ in _iter_decoded(resp, resp.iter_content(CHUNK_SIZE), max_bytes - sum(map(len, seen)), seen):
+                pass
+        except Exception:
+            LOGGER.debug("could not read the rest of %s", url, exc_info=True)
+        raw = b"".join(seen)
+        return _extract_text_soup(raw.decode(_response_encoding(resp, raw[:4096]), errors="replace"))
     except Exception as e:
         LOGGER.exception("Error fetching page %s: %s", url, e)
         return None
+    finally:
+        metrics.inc("http_bytes_total", sum(map(len, seen)), host=urlsplit(url).netloc.lower())
+        resp.close()
 
 
-def _call_openai_chat(system: str, user: str, model: str = "gpt-3.5-turbo", max_tokens: int = 512) -> Optional[str]:
+def _call_openai_chat(system: str, user: str, model: str = DEFAULT_MODEL, max_tokens: int = 512) -> Optional[str]:
     if openai is None:
         LOGGER.warning("openai package not installed; skipping LLM call")
         return None
@@ -79,34 +158,11 @@ def _call_openai_chat(system: str, user: str, model: str = "gpt-3.5-turbo", max_
         return None
 
 
-def summarize_url_with_gpt(url: str, prompt_template: Optional[str] = None, retries: int = 3) -> Optional[str]:
-    """Summarize the page at `url` using OpenAI with retries and fallback.
-
-    Returns a short summary string, or None if nothing could be produced.
-    """
-    prompt = prompt_template or DEFAULT_PROMPT
-    page_text = _fetch_page_text(url)
-    if not page_text:
-        LOGGER.info("No page text available for %s", url)
-        return None
-
-    # Prepare user content (truncate to keep within token limits)
-    user_content = f"URL: {url}\n\nContent:\n{page_text[:20000]}"
-
-    attempt = 0
-    summary = None
-    while attempt < retries:
-        attempt += 1
-        LOGGER.info("LLM attempt %d for %s", attempt, url)
-        summary = _call_openai_chat(prompt, user_content)
-        if summary:
-            summary = f"Source: {url}\n\n{summary}"
-            break
-        backoff = 2 ** attempt
-        LOGGER.warning("LLM attempt %d failed, backing off %ds", attempt, backoff)
-        time.sleep(backoff)
-
-    if not summary:
+def _finish(url: str, prompt: str, page_text: str, raw: Optional[str]) -> str:
+    """Format an LLM result (or the fallback excerpt) and log it to llm_logs."""
+    if raw:
+        summary = f"Source: {url}\n\n{raw}"
+    else:
         # Fallback: return a short excerpt of the cleaned page text
         LOGGER.warning("All LLM attempts failed for %s; returning fallback excerpt", url)
         excerpt = "\n\n".join(page_text.splitlines()[:10])
@@ -122,6 +178,91 @@ def summarize_url_with_gpt(url: str, prompt_template: Optional[str] = None, retr
             LOGGER.exception("Failed to insert llm_log for %s", url)
     except Exception:
         LOGGER.debug("repository not available to log llm response")
-
     return summary
 
+
+def summarize_urls(
+    urls: Iterable[str],
+    prompt_template: Optional[str] = None,
+    retries: int = 3,
+    model: str = DEFAULT_MODEL,
+    cache: Optional[LLMCache] = None,
+    client: Optional[Callable[..., Optional[str]]] = None,
+    use_cache: bool = True,
+    scheduler: Optional[LLMScheduler] = None,
+    fetch_workers: int = 8,
+) -> Dict[str, Optional[str]]:
+    """Summarize many URLs at once.
+
+    Pages are fetched concurrently, cache hits are answered directly and the
+    misses are queued on the LLM scheduler, which runs them concurrently within
+    its rate budgets and retries failures with backoff. Returns url -> summary
+    (None when the page could not be fetched).
+    """
+    prompt = prompt_template or DEFAULT_PROMPT
+    call_llm = client or _call_openai_chat
+    scheduler = scheduler or get_default_scheduler()
+    if use_cache:
+        cache = cache or get_default_cache()
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(fetch_workers, len(urls)))) as pool:
+        texts = dict(zip(urls, pool.map(_fetch_page_text, urls)))
+
+    results: Dict[str, Optional[str]] = {}
+    pending = {}
+    for url in urls:
+        page_text = texts[url]
+        if not page_text:
+            LOGGER.info("No page text available for %s", url)
+            results[url] = None
+            continue
+        cache_key = make_cache_key(url, page_text, prompt, model) if use_cache else None
+        if use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                LOGGER.info("LLM cache hit for %s", url)
+                results[url] = cached
+                continue
+        # Prepare user content (truncate to a token budget rather than characters)
+        user_content = f"URL: {url}\n\nContent:\n{truncate_to_tokens(page_text, MAX_INPUT_TOKENS)}"
+        future = scheduler.submit(prompt, user_content, model=model, retries=retries, call=call_llm)
+        pending[url] = (future, cache_key)
+
+    for url, (future, cache_key) in pending.items():
+        raw = future.result()
+        summary = _finish(url, prompt, texts[url], raw)
+        if raw and use_cache:
+            cache.put(cache_key, url, model, summary)
+        results[url] = summary
+    return {url: results.get(url) for url in urls}
+
+
+def summarize_url_with_gpt(
+    url: str,
+    prompt_template: Optional[str] = None,
+    retries: int = 3,
+    model: str = DEFAULT_MODEL,
+    cache: Optional[LLMCache] = None,
+    client: Optional[Callable[..., Optional[str]]] = None,
+    use_cache: bool = True,
+    scheduler: Optional[LLMScheduler] = None,
+) -> Optional[str]:
+    """Summarize the page at `url` using OpenAI with retries and fallback.
+
+    `client` replaces the OpenAI call (same signature as `_call_openai_chat`),
+    e.g. a local stand-in in tests. Returns a short summary string, or None if
+    nothing could be produced.
+    """
+    return summarize_urls(
+        [url],
+        prompt_template=prompt_template,
+        retries=retries,
+        model=model,
+        cache=cache,
+        client=client,
+        use_cache=use_cache,
+        scheduler=scheduler,
+    )[url]
@@ -0,0 +1,196 @@
+"""Long-running refresh daemon.
+
+Instead of refreshing every source of every person at one cadence, the daemon
+keeps a priority queue of work items (person x source type) ordered by due
+time. Each source type has its own refresh interval, adapted per item: an
+item whose refresh found something new is polled sooner next time, one that
+found nothing is polled later, within per-type bounds. Only persons whose
+data changed are re-rendered.
+
+Intervals and due times are kept in the ``refresh_state`` table so a restart
+continues the learned schedule instead of refetching everything at once.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+from src.db import repository as repo
+
+LOGGER = logging.getLogger(__name__)
+
+# source type -> (initial, minimum, maximum) refresh interval in seconds.
+# Wikipedia summaries rarely change; news feeds may update every few minutes.
+DEFAULT_INTERVALS = {
+    "wikipedia": (24 * 3600, 6 * 3600, 7 * 24 * 3600),
+    "rss": (15 * 60, 2 * 60, 6 * 3600),
+    "x_url": (6 * 3600, 3600, 2 * 24 * 3600),
+}
+# Interval multipliers after a refresh that did / did not find changes.
+SPEEDUP = 0.5
+SLOWDOWN = 1.5
+# Longest single sleep, so stop() and clock changes are noticed promptly.
+MAX_SLEEP = 60.0
+
+Key = Tuple[str, str]
+
+
+def sources_for(person: dict) -> List[str]:
+    """Source types configured for a roster entry."""
+    sources = ["wikipedia"]
+    if person.get("rss"):
+        sources.append("rss")
+    if person.get("x_urls"):
+        sources.append("x_url")
+    return sources
+
+
+class RefreshDaemon:
+    """Schedules refreshes; fetching and rendering are supplied by the caller.
+
+    `refresh` receives a batch of (person dict, source type) items that are due
+    and returns {(name, source type): changed}; a missing or None value means
+    the refresh failed and is retried after the current interval. `render`
+    receives the names of persons whose data changed.
+
+    `persons` must be re-iterable (a list, or main.Roster to stream the roster
+    file). Only names and source types are kept; each batch looks up its due
+    persons with one pass over `persons` (see ``find``).
+    """
+
+    def __init__(
+        self,
+        persons: Iterable[dict],
+        refresh: Callable[[List[Tuple[dict, str]]], Dict[Key, Optional[bool]]],
+        render: Callable[[List[str]], None],
+        intervals: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        jitter: float = 0.1,
+        persist: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.roster = persons
+        self.refresh = refresh
+        self.render = render
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.jitter = jitter
+        self.persist = persist
+        self.clock = clock
+        self.stats = {"cycles": 0, "refreshed": 0, "changed": 0, "failed": 0, "rendered": 0}
+        self._state: Dict[Key, Dict[str, float]] = {}
+        self._queue: List = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+
+        saved = repo.load_refresh_state() if persist else {}
+        now = clock()
+        for person in persons:
+            name = person.get("name")
+            if not name:
+                continue
+            for source in sources_for(person):
+                initial, low, high = self.intervals[source]
+                state = saved.get((name, source))
+                if state:
+                    interval = min(high, max(low, state["interval"]))
+                    due = min(state["next_due"], now + interval)
+                    last_changed = state.get("last_changed")
+                else:
+                    interval, due, last_changed = initial, now, None
+                self._state[(name, source)] = {"interval": interval, "next_due": due, "last_changed": last_changed}
+                heapq.heappush(self._queue, (due, next(self._seq), (name, source)))
+
+    def find(self, names: Iterable[str]) -> Dict[str, dict]:
+        """Roster entries for `names`, from one pass over the roster."""
+        wanted = set(names)
+        return {p["name"]: p for p in self.roster if p.get("name") in wanted}
+
+    def next_due(self) -> Optional[float]:
+        return self._queue[0][0] if self._queue else None
+
+    def interval(self, name: str, source: str) -> float:
+        return self._state[(name, source)]["interval"]
+
+    def _pop_due(self, now: float) -> List[Key]:
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[2])
+        return due
+
+    def _reschedule(self, key: Key, changed: Optional[bool], now: float) -> None:
+        state = self._state[key]
+        _, low, high = self.intervals[key[1]]
+        if changed:
+            state["interval"] = max(low, state["interval"] * SPEEDUP)
+            state["last_changed"] = now
+        elif changed is not None:
+            state["interval"] = min(high, state["interval"] * SLOWDOWN)
+        delay = state["interval"]
+        if self.jitter:
+            # spread items that share an interval so they do not stay in lockstep
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        state["next_due"] = now + delay
+        heapq.heappush(self._queue, (state["next_due"], next(self._seq), key))
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """Refresh every item due at `now`, re-render changed persons.
+
+        Returns the number of items refreshed.
+        """
+        now = self.clock() if now is None else now
+        due = self._pop_due(now)
+        if not due:
+            return 0
+        found = None
+        try:
+            found = self.find(name for name, _ in due)
+            results = self.refresh([(found[name], source) for name, source in due if name in found]) or {}
+        except Exception:
+            LOGGER.exception("Refresh batch failed")
+            results = {}
+        dirty = set()
+        for key in due:
+            if found is not None and key[0] not in found:
+                # dropped from the roster since startup: stop scheduling it
+                del self._state[key]
+                continue
+            changed = results.get(key)
+            self._reschedule(key, changed, now)
+            if changed is None:
+                self.stats["failed"] += 1
+            elif changed:
+                self.stats["changed"] += 1
+                dirty.add(key[0])
+        self.stats["cycles"] += 1
+        self.stats["refreshed"] += len(due)
+        if dirty:
+            try:
+                self.render(sorted(dirty))
+                self.stats["rendered"] += len(dirty)
+            except Exception:
+                LOGGER.exception("Re-render failed for %d persons", len(dirty))
+        if self.persist:
+            with repo.session() as db:
+                db.save_refresh_state(
+                    dict(self._state[key], person=key[0], source_type=key[1]) for key in due if key in self._state
+                )
+        return len(due)
+
+    def run(self, max_cycles: Optional[int] = None) -> None:
+        """Loop until stop() (or `max_cycles` batches have run)."""
+        while not self._stop.is_set():
+            if max_cycles is not None and self.stats["cycles"] >= max_cycles:
+                break
+            due = self.next_due()
+            if due is None:
+                break
+            wait = due - self.clock()
+            if wait > 0:
+                self._stop.wait(min(wait, MAX_SLEEP))
+                continue
+            self.run_once()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,55 @@
+"""Bigram indexes for search terms too short for the trigram tokenizer.
+
+FTS5's trigram tokenizer cannot match terms of one or two characters, and
+two-character terms are the most common Japanese queries (国会, 防衛, 首相).
+Activities, persons and the latest article per person are therefore also
+indexed as their overlapping two-character windows, in contentless FTS5
+tables (``<table>_bigrams``, rowid = the indexed row's id). Each window is
+encoded as an ASCII token ("56fdx4f1a") so the unicode61 tokenizer keeps it
+whole; a two-character term is then a single token lookup.
+
+Contentless tables do not store the text, so removing a row needs the text
+it was indexed with (see ``remove``). The tables are maintained by
+``repository.Session``.
+"""
+import sqlite3
+from typing import Optional
+
+TABLES = ("activities_bigrams", "persons_bigrams", "articles_bigrams")
+
+
+def _token(pair: str) -> str:
+    return f"{ord(pair[0]):x}x{ord(pair[1]):x}"
+
+
+def bigram_text(*texts: Optional[str]) -> str:
+    """Distinct two-character windows of `texts` (lower-cased, not across
+    whitespace) as space-separated tokens, in first-seen order."""
+    tokens = {}
+    for text in texts:
+        for run in (text or "").lower().split():
+            for i in range(len(run) - 1):
+                tokens.setdefault(_token(run[i : i + 2]), None)
+    return " ".join(tokens)
+
+
+def term_token(term: str) -> str:
+    """Token matching a two-character search term."""
+    return _token(term.lower())
+
+
+def create(conn: sqlite3.Connection) -> None:
+    for table in TABLES:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+            "grams, content='', detail='none', tokenize='unicode61')"
+        )
+
+
+def add(conn: sqlite3.Connection, table: str, rowid: int, *texts: Optional[str]) -> None:
+    conn.execute(f"INSERT INTO {table} (rowid, grams) VALUES (?, ?)", (rowid, bigram_text(*texts)))
+
+
+def remove(conn: sqlite3.Connection, table: str, rowid: int, *texts: Optional[str]) -> None:
+    """Remove a row; `texts` must be the ones it was added with."""
+    conn.execute(f"INSERT INTO {table} ({table}, rowid, grams) VALUES ('delete', ?, ?)", (rowid, bigram_text(*texts)))
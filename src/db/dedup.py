@@ -0,0 +1,148 @@
+"""Near-duplicate clustering of activities (MinHash with banded LSH).
+
+The same story often reaches a person through several feeds (wire copy,
+re-posts, title tweaks), each stored as its own activity because the links
+differ. Every activity gets a MinHash signature of the character trigrams of
+its normalized title and the start of its content, computed by one-permutation
+hashing: each trigram is hashed once and kept as the minimum of one of
+``NUM_HASHES`` bins, with empty bins filled from the next non-empty one, so
+the cost is linear in the text. The signature is cut into ``BANDS`` bands of
+``ROWS`` values; each band's hash is a row in ``activity_bands``. Candidates
+are activities sharing a band key (a primary-key lookup, so the cost does not
+grow with the table), verified by the fraction of equal signature values
+(an estimate of Jaccard similarity) against ``THRESHOLD``.
+
+``activities.cluster_id`` is the id of the activity whose cluster a row joined
+(NULL: the row starts its own cluster); ``minhash`` is the signature, an empty
+blob for texts too short to compare, and NULL for rows not yet fingerprinted.
+"""
+import hashlib
+import operator
+import sqlite3
+import struct
+from typing import Dict, List, Optional
+
+from src.utils import metrics
+from src.utils.name_matcher import normalize_text
+
+NUM_HASHES = 32
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+THRESHOLD = 0.6
+SHINGLE = 3
+MAX_CONTENT_CHARS = 1000
+MIN_SHINGLES = 16
+# per band, newest first; bounds the work for hot buckets (boilerplate shared
+# by many items) while recent duplicates stay reachable
+MAX_CANDIDATES = 100
+BATCH = 500
+
+_MASK32 = 0xFFFFFFFF
+_GOLDEN = 0x9E3779B1
+_SIG = struct.Struct(f"<{NUM_HASHES}I")
+
+
+def shingles(title: Optional[str], content: Optional[str]) -> set:
+    """Character trigrams of the normalized title and start of the content."""
+    text = normalize_text(f"{title or ''} {(content or '')[:MAX_CONTENT_CHARS]}")
+    return {text[i : i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+
+def signature(title: Optional[str], content: Optional[str]) -> Optional[List[int]]:
+    """MinHash signature (NUM_HASHES 32-bit values), or None for short texts."""
+    features = shingles(title, content)
+    if len(features) < MIN_SHINGLES:
+        return None
+    bins: List[Optional[int]] = [None] * NUM_HASHES
+    for f in features:
+        h = int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little")
+        b, v = h % NUM_HASHES, h >> 32
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    sig = list(bins)
+    for j, v in enumerate(bins):
+        if v is not None:
+            continue
+        # densify: borrow the next non-empty bin, offset by the distance
+        for t in range(1, NUM_HASHES):
+            borrowed = bins[(j + t) % NUM_HASHES]
+            if borrowed is not None:
+                sig[j] = (borrowed + t * _GOLDEN) & _MASK32
+                break
+    return sig
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(operator.eq, a, b)) / NUM_HASHES
+
+
+def band_keys(sig: List[int]) -> List[int]:
+    """One signed 64-bit key per band (the band number is part of the hash)."""
+    packed = _SIG.pack(*sig)
+    keys = []
+    for i in range(BANDS):
+        raw = bytes([i]) + packed[i * ROWS * 4 : (i + 1) * ROWS * 4]
+        keys.append(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+
+def _candidates(conn: sqlite3.Connection, activity_id: int, keys: List[int]) -> Dict[int, tuple]:
+    ids = set()
+    for key in keys:
+        ids.update(
+            r[0]
+            for r in conn.execute(
+                "SELECT activity_id FROM activity_bands WHERE band = ? ORDER BY activity_id DESC LIMIT ?",
+                (key, MAX_CANDIDATES),
+            )
+        )
+    ids.discard(activity_id)
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
+    rows = conn.execute(f"SELECT id, minhash, cluster_id FROM activities WHERE id IN ({marks})", list(ids))
+    return {r[0]: (_SIG.unpack(r[1]), r[2]) for r in rows if r[1]}
+
+
+def assign(conn: sqlite3.Connection, activity_id: int, title: Optional[str], content: Optional[str]) -> Optional[int]:
+    """Fingerprint one activity and attach it to the most similar cluster.
+
+    Returns the cluster id it joined, or None when it starts its own.
+    """
+    sig = signature(title, content)
+    if sig is None:
+        conn.execute("UPDATE activities SET minhash = ? WHERE id = ?", (b"", activity_id))
+        metrics.inc("dedup_total", result="short")
+        return None
+    keys = band_keys(sig)
+    best, best_score = None, 0.0
+    # oldest first, so ties go to the earlier activity
+    for cid, (other, cluster) in sorted(_candidates(conn, activity_id, keys).items()):
+        score = similarity(sig, other)
+        if score >= THRESHOLD and score > best_score:
+            best, best_score = cluster or cid, score
+    # minhash/cluster_id are not search-indexed columns, so this does not touch FTS
+    conn.execute("UPDATE activities SET minhash = ?, cluster_id = ? WHERE id = ?", (_SIG.pack(*sig), best, activity_id))
+    conn.executemany(
+        "INSERT OR IGNORE INTO activity_bands (band, activity_id) VALUES (?, ?)", [(k, activity_id) for k in keys]
+    )
+    metrics.inc("dedup_total", result="duplicate" if best else "unique")
+    return best
+
+
+def cluster_pending(conn: sqlite3.Connection, after_id: int = 0, batch: int = BATCH) -> int:
+    """Fingerprint and cluster activities with id > `after_id` that have no
+    signature yet, oldest first. Returns the number processed."""
+    n = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, title, content FROM activities WHERE minhash IS NULL AND id > ? ORDER BY id LIMIT ?",
+            (after_id, batch),
+        ).fetchall()
+        if not rows:
+            return n
+        for activity_id, title, content in rows:
+            assign(conn, activity_id, title, content)
+        after_id = rows[-1][0]
+        n += len(rows)
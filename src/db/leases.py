@@ -0,0 +1,96 @@
+"""Per-person leases so several collectors can share one roster.
+
+A worker claims a person before processing it and releases the lease when it
+is done. A lease held by another worker is skipped; one that has expired
+(its worker crashed or hung) can be claimed again. While work runs under
+``hold``, a background thread renews its leases every third of the TTL, so
+work that outlives the TTL keeps its lease; only a dead worker's lease expires.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Set
+
+from src.db import repository as repo
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30 * 60
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Leases:
+    def __init__(self, owner: Optional[str] = None, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self.clock = clock
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        self._renewer: Optional[threading.Thread] = None
+
+    def claim(self, person: str) -> bool:
+        """Take (or extend) the lease on `person`. False if another worker holds it."""
+        now = self.clock()
+        with repo.session() as db:
+            cur = db.conn.execute(
+                "INSERT INTO leases (person, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(person) DO UPDATE SET owner=excluded.owner, expires_at=excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (person, self.owner, now + self.ttl, now),
+            )
+            return cur.rowcount == 1
+
+    def release(self, person: str) -> None:
+        with repo.session() as db:
+            db.conn.execute("DELETE FROM leases WHERE person = ? AND owner = ?", (person, self.owner))
+
+    @contextmanager
+    def hold(self, person: str) -> Iterator[bool]:
+        """Claim `person` for the block, renewing the lease until it exits.
+
+        Yields False (holding nothing) if another worker has the person.
+        """
+        if not self.claim(person):
+            yield False
+            return
+        with self._lock:
+            self._active.add(person)
+            if self._renewer is None:
+                self._renewer = threading.Thread(target=self._renew, name="lease-renewer", daemon=True)
+                self._renewer.start()
+        try:
+            yield True
+        finally:
+            # under the lock, so a renewal cannot re-create the released lease
+            with self._lock:
+                self._active.discard(person)
+                self.release(person)
+
+    def _renew(self) -> None:
+        while True:
+            time.sleep(self.ttl / 3)
+            with self._lock:
+                for person in self._active:
+                    try:
+                        if not self.claim(person):
+                            LOGGER.warning("Lease on %s was taken over by another worker", person)
+                    except Exception:
+                        LOGGER.exception("Renewing the lease on %s failed", person)
+
+    def held(self) -> List[str]:
+        """Names currently leased by this worker."""
+        conn = repo.get_conn()
+        try:
+            rows = conn.execute(
+                "SELECT person FROM leases WHERE owner = ? AND expires_at > ? ORDER BY person", (self.owner, self.clock())
+            ).fetchall()
+        finally:
+            conn.close()
+        return [r[0] for r in rows]
@@ -0,0 +1,338 @@
+"""Versioned schema migrations for the SQLite database.
+
+The applied version is stored in ``PRAGMA user_version``. Migration 1 is the
+base schema (``schema.sql``) plus the columns added to it over time, and is
+safe on databases created before migrations existed. Every later change is a
+numbered function here; ``migrate`` applies the missing ones in order, each in
+its own transaction together with the version bump.
+"""
+import hashlib
+import logging
+import sqlite3
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional, Tuple
+
+from src.db import bigrams
+
+LOGGER = logging.getLogger(__name__)
+
+# Columns added to schema.sql after the first release. CREATE TABLE IF NOT
+# EXISTS does not touch existing tables, so migration 1 adds these to older
+# databases before running the schema (which may index them).
+_BASE_ADDED_COLUMNS = (
+    ("activities", "content_hash", "TEXT"),
+    ("articles", "content_hash", "TEXT"),
+)
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    existing = _columns(conn, table)
+    if existing and column not in existing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def parse_published(value: Optional[str]) -> Optional[int]:
+    """Parse a feed date string (RFC 822 or ISO 8601) to UTC epoch seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    dt = None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _m1_base_schema(conn: sqlite3.Connection, schema_sql: str) -> None:
+    for table, column, decl in _BASE_ADDED_COLUMNS:
+        _add_column(conn, table, column, decl)
+    conn.executescript(schema_sql)
+    _backfill_activity_hashes(conn)
+
+
+def _backfill_activity_hashes(conn: sqlite3.Connection) -> None:
+    """Give activities stored before content_hash existed the hash a new
+    insert of the same item would get, so the next run does not store them
+    again. The item link is the source URL; X summaries are keyed by URL plus
+    a summary hash (see main._fetch_x_activities). Later copies of an item
+    (older versions stored one per run) keep a NULL hash."""
+    # repository imports this module
+    from src.db.repository import activity_hash
+
+    rows = conn.execute(
+        "SELECT a.id, a.person_id, a.title, a.content, a.published_at, s.url, s.type FROM activities a"
+        " LEFT JOIN sources s ON s.id = a.source_id WHERE a.content_hash IS NULL ORDER BY a.id"
+    ).fetchall()
+    seen = {
+        tuple(r) for r in conn.execute("SELECT person_id, content_hash FROM activities WHERE content_hash IS NOT NULL")
+    }
+    updates = []
+    for aid, person_id, title, content, published, url, type_ in rows:
+        link = url
+        if url and type_ == "x_url":
+            link = f"{url}#{hashlib.sha256((content or '').encode('utf-8')).hexdigest()[:16]}"
+        key = (person_id, activity_hash(title, link, published, content))
+        if key not in seen:
+            seen.add(key)
+            updates.append((key[1], aid))
+    conn.executemany("UPDATE activities SET content_hash = ? WHERE id = ?", updates)
+    LOGGER.info("Backfilled content_hash for %d of %d activities", len(updates), len(rows))
+
+
+def _m2_published_ts(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Normalized epoch publish time on activities, backfilled from published_at."""
+    _add_column(conn, "activities", "published_ts", "INTEGER")
+    rows = conn.execute(
+        "SELECT id, published_at, CAST(strftime('%s', created_at) AS INTEGER) FROM activities WHERE published_ts IS NULL"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE activities SET published_ts = ? WHERE id = ?",
+        [(parse_published(published) or created, aid) for aid, published, created in rows],
+    )
+    LOGGER.info("Backfilled published_ts for %d activities", len(rows))
+
+
+def _m3_indexes(conn: sqlite3.Connection, schema_sql: str) -> None:
+    conn.execute("DROP INDEX IF EXISTS idx_activities_person_recent")
+    for stmt in (
+        "CREATE INDEX IF NOT EXISTS idx_activities_person_published ON activities(person_id, published_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_snapshots_person_date ON snapshots(person_id, snapshot_date)",
+        "CREATE INDEX IF NOT EXISTS idx_articles_person ON articles(person_id)",
+        "CREATE INDEX IF NOT EXISTS idx_llm_logs_person ON llm_logs(person_id)",
+        "CREATE INDEX IF NOT EXISTS idx_llm_logs_source_url ON llm_logs(source, url)",
+    ):
+        conn.execute(stmt)
+
+
+def _m4_snapshot_sets(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Hash-set snapshots: per-snapshot added/removed activity hashes.
+
+    person_activity_sets holds each person's current set; snapshot_items only
+    records the changes (change = +1 added, -1 removed).
+    """
+    _add_column(conn, "snapshots", "added", "INTEGER")
+    _add_column(conn, "snapshots", "removed", "INTEGER")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS snapshot_items ("
+        " snapshot_id INTEGER NOT NULL,"
+        " content_hash TEXT NOT NULL,"
+        " change INTEGER NOT NULL,"
+        " PRIMARY KEY (snapshot_id, content_hash),"
+        " FOREIGN KEY(snapshot_id) REFERENCES snapshots(id) ON DELETE CASCADE"
+        ") WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS person_activity_sets ("
+        " person_id INTEGER NOT NULL,"
+        " content_hash TEXT NOT NULL,"
+        " PRIMARY KEY (person_id, content_hash),"
+        " FOREIGN KEY(person_id) REFERENCES persons(id) ON DELETE CASCADE"
+        ") WITHOUT ROWID"
+    )
+
+
+def _fts_tokenizer(conn: sqlite3.Connection) -> str:
+    # trigram (SQLite >= 3.34) matches substrings, which works for Japanese
+    # text without word boundaries; older builds fall back to unicode61
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp._fts_probe")
+        return "trigram"
+    except sqlite3.OperationalError:
+        LOGGER.warning("FTS5 trigram tokenizer not available; using unicode61")
+        return "unicode61"
+
+
+def _m5_fts(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """FTS5 search indexes.
+
+    activities_fts and persons_fts are external-content tables kept in sync by
+    triggers. articles_fts is contentless (the text stays in articles only),
+    holds the latest article per person (rowid = article id) and is
+    maintained by Session.insert_article.
+    """
+    tok = _fts_tokenizer(conn)
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS activities_fts USING fts5("
+        f"title, content, content='activities', content_rowid='id', tokenize='{tok}')"
+    )
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS persons_fts USING fts5("
+        f"name, wikipedia_summary, content='persons', content_rowid='id', tokenize='{tok}')"
+    )
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, body, content='', tokenize='{tok}')")
+    for stmt in (
+        "CREATE TRIGGER IF NOT EXISTS activities_fts_ai AFTER INSERT ON activities BEGIN"
+        " INSERT INTO activities_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS activities_fts_ad AFTER DELETE ON activities BEGIN"
+        " INSERT INTO activities_fts(activities_fts, rowid, title, content)"
+        " VALUES ('delete', old.id, old.title, old.content); END",
+        "CREATE TRIGGER IF NOT EXISTS activities_fts_au AFTER UPDATE OF title, content ON activities BEGIN"
+        " INSERT INTO activities_fts(activities_fts, rowid, title, content)"
+        " VALUES ('delete', old.id, old.title, old.content);"
+        " INSERT INTO activities_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS persons_fts_ai AFTER INSERT ON persons BEGIN"
+        " INSERT INTO persons_fts(rowid, name, wikipedia_summary) VALUES (new.id, new.name, new.wikipedia_summary); END",
+        "CREATE TRIGGER IF NOT EXISTS persons_fts_ad AFTER DELETE ON persons BEGIN"
+        " INSERT INTO persons_fts(persons_fts, rowid, name, wikipedia_summary)"
+        " VALUES ('delete', old.id, old.name, old.wikipedia_summary); END",
+        # collect rewrites persons on every run; only reindex real changes
+        "CREATE TRIGGER IF NOT EXISTS persons_fts_au AFTER UPDATE OF name, wikipedia_summary ON persons"
+        " WHEN old.name IS NOT new.name OR old.wikipedia_summary IS NOT new.wikipedia_summary BEGIN"
+        " INSERT INTO persons_fts(persons_fts, rowid, name, wikipedia_summary)"
+        " VALUES ('delete', old.id, old.name, old.wikipedia_summary);"
+        " INSERT INTO persons_fts(rowid, name, wikipedia_summary) VALUES (new.id, new.name, new.wikipedia_summary); END",
+    ):
+        conn.execute(stmt)
+    conn.execute("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO persons_fts(persons_fts) VALUES ('rebuild')")
+    conn.execute(
+        "INSERT INTO articles_fts(rowid, title, body)"
+        " SELECT id, title, markdown FROM articles"
+        " WHERE id IN (SELECT MAX(id) FROM articles GROUP BY person_id)"
+    )
+
+
+def _m6_compact_storage(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Deduplicated prompts (llm_prompts) referenced from llm_logs, and
+    llm_logs.article_id so article logs point at the article instead of
+    repeating its markdown. Existing rows are converted by ``repository.compact``.
+    """
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS llm_prompts ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " hash TEXT NOT NULL UNIQUE,"
+        " prompt BLOB NOT NULL"
+        ")"
+    )
+    _add_column(conn, "llm_logs", "prompt_id", "INTEGER REFERENCES llm_prompts(id)")
+    _add_column(conn, "llm_logs", "article_id", "INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_logs_article ON llm_logs(article_id)")
+
+
+def _m7_refresh_state(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Daemon schedule: adaptive refresh interval and next due time (epoch
+    seconds) per person and source type, so restarts keep what was learned."""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS refresh_state ("
+        " person TEXT NOT NULL,"
+        " source_type TEXT NOT NULL,"
+        " interval REAL NOT NULL,"
+        " next_due REAL NOT NULL,"
+        " last_changed REAL,"
+        " PRIMARY KEY (person, source_type)"
+        ") WITHOUT ROWID"
+    )
+
+
+def _m8_leases(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Per-person work leases for collectors sharing one roster (src/db/leases.py)."""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS leases ("
+        " person TEXT PRIMARY KEY,"
+        " owner TEXT NOT NULL,"
+        " expires_at REAL NOT NULL"
+        ")"
+    )
+
+
+def _m9_near_duplicates(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Near-duplicate clusters (src/db/dedup.py): MinHash signature and
+    cluster id per activity, and the band index used to find candidates.
+    Existing rows are fingerprinted by ``repository.compact``."""
+    _add_column(conn, "activities", "minhash", "BLOB")
+    _add_column(conn, "activities", "cluster_id", "INTEGER")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS activity_bands ("
+        " band INTEGER NOT NULL,"
+        " activity_id INTEGER NOT NULL,"
+        " PRIMARY KEY (band, activity_id)"
+        ") WITHOUT ROWID"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_activities_person_cluster ON activities(person_id, cluster_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_activities_unhashed ON activities(id) WHERE minhash IS NULL")
+
+
+def _unpack(value) -> Optional[str]:
+    # repository.unpack_text; repository imports this module
+    return zlib.decompress(value).decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _m10_search_bigrams(conn: sqlite3.Connection, schema_sql: str) -> None:
+    """Bigram indexes for short search terms (src/db/bigrams.py)."""
+    bigrams.create(conn)
+    latest = conn.execute(
+        "SELECT id, title, markdown FROM articles WHERE id IN (SELECT MAX(id) FROM articles GROUP BY person_id)"
+    ).fetchall()
+    for article_id, title, markdown in latest:
+        bigrams.add(conn, "articles_bigrams", article_id, title, _unpack(markdown))
+    for person_id, name, summary in conn.execute("SELECT id, name, wikipedia_summary FROM persons").fetchall():
+        bigrams.add(conn, "persons_bigrams", person_id, name, summary)
+    n, last_id = 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, title, content FROM activities WHERE id > ? ORDER BY id LIMIT 1000", (last_id,)
+        ).fetchall()
+        if not rows:
+            break
+        for activity_id, title, content in rows:
+            bigrams.add(conn, "activities_bigrams", activity_id, title, content)
+        last_id, n = rows[-1][0], n + len(rows)
+    LOGGER.info("Indexed bigrams for %d activities", n)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection, str], None]]] = [
+    (1, "base schema", _m1_base_schema),
+    (2, "activities.published_ts", _m2_published_ts),
+    (3, "indexes", _m3_indexes),
+    (4, "snapshot hash sets", _m4_snapshot_sets),
+    (5, "full-text search", _m5_fts),
+    (6, "compressed storage and prompt dedup", _m6_compact_storage),
+    (7, "daemon refresh state", _m7_refresh_state),
+    (8, "person leases", _m8_leases),
+    (9, "near-duplicate clusters", _m9_near_duplicates),
+    (10, "search bigrams", _m10_search_bigrams),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, schema_sql: str) -> List[int]:
+    """Apply pending migrations in order. Returns the versions applied."""
+    applied = []
+    version = current_version(conn)
+    for number, name, fn in MIGRATIONS:
+        if number <= version:
+            continue
+        LOGGER.info("Applying migration %d: %s", number, name)
+        try:
+            conn.execute("BEGIN")
+            fn(conn, schema_sql)
+            if not conn.in_transaction:
+                # executescript commits; keep the version bump transactional
+                conn.execute("BEGIN")
+            conn.execute(f"PRAGMA user_version = {int(number)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(number)
+    return applied
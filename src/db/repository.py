@@ -1,98 +1,646 @@
 """Simple SQLite repository for Press Project.
 
-This module provides minimal helpers: init_db, upsert_person, insert_source, insert_activity.
+This module provides minimal helpers: init_db, upsert_person, insert_source,
+insert_activity and insert_article; snapshots are recorded by snapshot_store.
+Writes are serialized with a module-level lock so the helpers are safe to
+call from worker threads.
+
+For bulk ingest use ``session()``: a unit of work that reuses one connection
+and commits everything (including ``executemany`` batches) in a single
+transaction. The module-level helpers are thin wrappers that open a one-shot
+session, so their signatures and behaviour are unchanged.
 """
 import sqlite3
 import json
-from typing import Optional, Dict, Any
+import hashlib
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterable, Iterator
 from pathlib import Path
 
+from src.db import bigrams, dedup, migrations
+from src.utils import metrics
+
 DB_PATH = Path("data") / "database.sqlite3"
 
+# Per-connection tuning. WAL lets readers proceed while a writer commits and
+# synchronous=NORMAL only fsyncs at checkpoints, which is safe with WAL.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+)
+
+# SQLite allows a single writer at a time; serialize writes from worker threads
+# so concurrent pipeline runs wait on this lock instead of failing with
+# "database is locked".
+_WRITE_LOCK = threading.RLock()
+
+# Large text columns (articles.markdown/html, llm_logs.response, prompts) are
+# stored zlib-compressed as BLOBs; short values stay TEXT. The storage class
+# tells them apart, so rows written before compression still read back.
+COMPRESS_MIN_BYTES = 256
+DEFAULT_KEEP_ARTICLES = 5
+
+
+def pack_text(text: Optional[str]):
+    if text is None:
+        return None
+    raw = text.encode("utf-8")
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return text
+    packed = zlib.compress(raw, 6)
+    return packed if len(packed) < len(raw) else text
+
+
+def unpack_text(value) -> Optional[str]:
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
 
 def get_conn():
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
 def init_db(schema_path: str = "src/db/schema.sql") -> None:
-    """Initialize the SQLite DB using the schema file."""
+    """Initialize or upgrade the SQLite DB (schema file + pending migrations)."""
     schema_file = Path(schema_path)
     if not schema_file.exists():
         raise FileNotFoundError(f"Schema file not found: {schema_path}")
-    conn = get_conn()
     with schema_file.open("r", encoding="utf-8") as f:
         sql = f.read()
-    conn.executescript(sql)
-    conn.commit()
-    conn.close()
+    with _WRITE_LOCK:
+        conn = get_conn()
+        # journal_mode is persistent, so it only needs to be set once per file
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            migrations.migrate(conn, sql)
+        finally:
+            conn.close()
 
 
-def upsert_person(name: str, wikipedia_summary: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM persons WHERE name = ?", (name,))
-    row = cur.fetchone()
-    if row:
-        person_id = row["id"]
-        cur.execute(
-            "UPDATE persons SET wikipedia_summary=?, metadata=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-            (wikipedia_summary, json.dumps(metadata or {}), person_id),
+def activity_hash(title: Optional[str], link: Optional[str] = None, published: Optional[str] = None, content: Optional[str] = None) -> str:
+    """Stable identity for an activity: link + title + published date.
+
+    Content is only mixed in when there is no link, since feeds often tweak
+    summaries of the same item between fetches.
+    """
+    parts = [link or "", title or "", published or ""]
+    if not link:
+        parts.append(content or "")
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+_INSERT_ACTIVITY_SQL = (
+    "INSERT INTO activities (person_id, title, content, source_id, published_at, published_ts, content_hash) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(person_id, content_hash) DO NOTHING"
+)
+
+
+def _sort_ts(published_ts: Optional[int], published_at: Optional[str]) -> int:
+    """published_ts to store: the feed's parsed time, else parse the raw string,
+    else the collection time (so undated items still sort as recent)."""
+    if published_ts is not None:
+        return int(published_ts)
+    return migrations.parse_published(published_at) or int(time.time())
+
+
+class Session:
+    """Write helpers bound to one connection and one open transaction."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._source_ids: Dict[str, int] = {}
+        self._prompt_ids: Dict[str, int] = {}
+
+    def upsert_person(self, name: str, wikipedia_summary: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> int:
+        cur = self.conn.cursor()
+        cur.execute("SELECT id, wikipedia_summary, metadata FROM persons WHERE name = ?", (name,))
+        row = cur.fetchone()
+        meta = json.dumps(metadata or {})
+        if row:
+            person_id = row["id"]
+            if (row["wikipedia_summary"], row["metadata"]) != (wikipedia_summary, meta):
+                cur.execute(
+                    "UPDATE persons SET wikipedia_summary=?, metadata=?, updated_at=CURRENT_TIMESTAMP WHERE id=?",
+                    (wikipedia_summary, meta, person_id),
+                )
+                if row["wikipedia_summary"] != wikipedia_summary:
+                    bigrams.remove(self.conn, "persons_bigrams", person_id, name, row["wikipedia_summary"])
+                    bigrams.add(self.conn, "persons_bigrams", person_id, name, wikipedia_summary)
+        else:
+            cur.execute(
+                "INSERT INTO persons (name, wikipedia_summary, metadata) VALUES (?, ?, ?)",
+                (name, wikipedia_summary, meta),
+            )
+            person_id = cur.lastrowid
+            bigrams.add(self.conn, "persons_bigrams", person_id, name, wikipedia_summary)
+        return person_id
+
+    def insert_source(self, url: str, type_: Optional[str] = None) -> int:
+        if url in self._source_ids:
+            return self._source_ids[url]
+        cur = self.conn.cursor()
+        cur.execute("INSERT OR IGNORE INTO sources (url, type) VALUES (?, ?)", (url, type_))
+        cur.execute("SELECT id FROM sources WHERE url = ?", (url,))
+        row = cur.fetchone()
+        source_id = row["id"] if row else -1
+        self._source_ids[url] = source_id
+        return source_id
+
+    def insert_activity(self, person_id: int, title: str, content: str, source_id: Optional[int] = None, published_at: Optional[str] = None, link: Optional[str] = None, published_ts: Optional[int] = None) -> int:
+        """Insert an activity unless the same one is already stored; returns its id."""
+        h = activity_hash(title, link=link, published=published_at, content=content)
+        cur = self.conn.execute(
+            _INSERT_ACTIVITY_SQL,
+            (person_id, title, content, source_id, published_at, _sort_ts(published_ts, published_at), h),
         )
-    else:
-        cur.execute(
-            "INSERT INTO persons (name, wikipedia_summary, metadata) VALUES (?, ?, ?)",
-            (name, wikipedia_summary, json.dumps(metadata or {})),
+        if cur.rowcount:
+            bigrams.add(self.conn, "activities_bigrams", cur.lastrowid, title, content)
+            dedup.assign(self.conn, cur.lastrowid, title, content)
+            return cur.lastrowid
+        row = self.conn.execute(
+            "SELECT id FROM activities WHERE person_id = ? AND content_hash = ?", (person_id, h)
+        ).fetchone()
+        return row["id"] if row else -1
+
+    def insert_activities(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Batch-insert activity dicts, skipping ones already stored.
+
+        Keys: person_id, title, content, source_id, published_at and optional
+        link / published_ts. Returns the number of new rows.
+        """
+        params = [
+            (
+                r["person_id"], r.get("title"), r.get("content"), r.get("source_id"), r.get("published_at"),
+                _sort_ts(r.get("published_ts"), r.get("published_at")),
+                activity_hash(r.get("title"), link=r.get("link"), published=r.get("published_at"), content=r.get("content")),
+            )
+            for r in rows
+        ]
+        if not params:
+            return 0
+        if not self.conn.in_transaction:
+            # take SQLite's write lock before reading MAX(id): no other
+            # connection, in this process or another, can insert until commit
+            self.conn.execute("BEGIN IMMEDIATE")
+        last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM activities").fetchone()[0]
+        # rowcount sums changes() per row, which excludes trigger writes
+        # (search index) and skipped duplicates
+        added = self.conn.executemany(_INSERT_ACTIVITY_SQL, params).rowcount
+        if added:
+            # the write transaction is still open, so every row past last_id is from this batch
+            for row in self.conn.execute("SELECT id, title, content FROM activities WHERE id > ?", (last_id,)).fetchall():
+                bigrams.add(self.conn, "activities_bigrams", *row)
+            dedup.cluster_pending(self.conn, after_id=last_id)
+        metrics.inc("db_rows_written_total", added, table="activities")
+        return added
+
+    def get_person(self, name: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT id, name, wikipedia_summary FROM persons WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def get_person_id(self, name: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM persons WHERE name = ?", (name,)).fetchone()
+        return row["id"] if row else None
+
+    def get_source_marks(self, person_id: int) -> Dict[str, int]:
+        cur = self.conn.execute("SELECT source_url, high_water FROM source_marks WHERE person_id = ?", (person_id,))
+        return {r["source_url"]: r["high_water"] for r in cur}
+
+    def update_source_marks(self, person_id: int, marks: Dict[str, int]) -> None:
+        """Raise per-source high-water marks (never lowers an existing mark)."""
+        self.conn.executemany(
+            "INSERT INTO source_marks (person_id, source_url, high_water) VALUES (?, ?, ?) "
+            "ON CONFLICT(person_id, source_url) DO UPDATE SET "
+            "high_water=max(high_water, excluded.high_water), updated_at=CURRENT_TIMESTAMP",
+            [(person_id, url, ts) for url, ts in marks.items()],
+        )
+
+    def list_recent_activities(self, person_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest activities first, one per near-duplicate cluster: the person's
+        earliest activity in the cluster stands for the rest."""
+        cur = self.conn.execute(
+            "SELECT title, content, published_at, content_hash FROM activities a WHERE person_id = ? "
+            "AND NOT (cluster_id IS NOT NULL AND ("
+            " EXISTS (SELECT 1 FROM activities c WHERE c.id = a.cluster_id AND c.person_id = a.person_id)"
+            " OR EXISTS (SELECT 1 FROM activities c WHERE c.person_id = a.person_id"
+            " AND c.cluster_id = a.cluster_id AND c.id < a.id))) "
+            "ORDER BY published_ts DESC, id DESC LIMIT ?",
+            (person_id, limit),
         )
-        person_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return person_id
+        return [
+            {
+                "title": r["title"] or "",
+                "content": r["content"] or "",
+                "published": r["published_at"] or "",
+                # rows stored before content hashes existed get a derived one
+                "content_hash": r["content_hash"] or activity_hash(r["title"], published=r["published_at"], content=r["content"]),
+            }
+            for r in cur
+        ]
+
+    def insert_article(self, person_id: int, title: str, markdown: str, html: str, content_hash: Optional[str] = None) -> int:
+        # the search indexes keep only the latest article per person; they are
+        # contentless, so the previous one is removed with its own text
+        previous = self.conn.execute(
+            "SELECT id, title, markdown FROM articles WHERE person_id = ? ORDER BY id DESC LIMIT 1", (person_id,)
+        ).fetchone()
+        if previous:
+            old_markdown = unpack_text(previous["markdown"])
+            self.conn.execute(
+                "INSERT INTO articles_fts (articles_fts, rowid, title, body) VALUES ('delete', ?, ?, ?)",
+                (previous["id"], previous["title"], old_markdown),
+            )
+            bigrams.remove(self.conn, "articles_bigrams", previous["id"], previous["title"], old_markdown)
+        cur = self.conn.execute(
+            "INSERT INTO articles (person_id, title, markdown, html, content_hash) VALUES (?, ?, ?, ?, ?)",
+            (person_id, title, pack_text(markdown), pack_text(html), content_hash),
+        )
+        self.conn.execute(
+            "INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)", (cur.lastrowid, title, markdown)
+        )
+        bigrams.add(self.conn, "articles_bigrams", cur.lastrowid, title, markdown)
+        metrics.inc("db_rows_written_total", table="articles")
+        return cur.lastrowid
+
+    def get_latest_article_hash(self, person_id: int) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT content_hash FROM articles WHERE person_id = ? ORDER BY id DESC LIMIT 1", (person_id,)
+        ).fetchone()
+        return row["content_hash"] if row else None
+
+    def get_latest_article(self, person_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT id, person_id, title, markdown, html, content_hash, generated_at FROM articles "
+            "WHERE person_id = ? ORDER BY id DESC LIMIT 1",
+            (person_id,),
+        ).fetchone()
+        if not row:
+            return None
+        article = dict(row)
+        article["markdown"] = unpack_text(article["markdown"])
+        article["html"] = unpack_text(article["html"])
+        return article
+
+    def list_index_entries(self) -> List[Dict[str, Any]]:
+        """Persons that have an article, with the date of their latest one."""
+        rows = self.conn.execute(
+            "SELECT p.id AS person_id, p.name, a.generated_at "
+            "FROM persons p JOIN articles a ON a.id = (SELECT MAX(id) FROM articles WHERE person_id = p.id) "
+            "ORDER BY p.name"
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_prompt_id(self, prompt: Optional[str]) -> Optional[int]:
+        """Id of `prompt` in llm_prompts, inserting it on first use."""
+        if prompt is None:
+            return None
+        h = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        if h in self._prompt_ids:
+            return self._prompt_ids[h]
+        self.conn.execute("INSERT OR IGNORE INTO llm_prompts (hash, prompt) VALUES (?, ?)", (h, pack_text(prompt)))
+        prompt_id = self.conn.execute("SELECT id FROM llm_prompts WHERE hash = ?", (h,)).fetchone()[0]
+        self._prompt_ids[h] = prompt_id
+        return prompt_id
+
+    def insert_llm_log(
+        self,
+        person_id: Optional[int],
+        source: str,
+        url: Optional[str],
+        prompt: Optional[str],
+        response: Optional[str],
+        article_id: Optional[int] = None,
+    ) -> int:
+        """Log an LLM call. With `article_id` the response is the stored article
+        and is not written again."""
+        cur = self.conn.execute(
+            "INSERT INTO llm_logs (source, person_id, url, prompt_id, response, article_id) VALUES (?, ?, ?, ?, ?, ?)",
+            (source, person_id, url, self.get_prompt_id(prompt), None if article_id else pack_text(response), article_id),
+        )
+        metrics.inc("db_rows_written_total", table="llm_logs")
+        return cur.lastrowid
+
+    def list_llm_logs(self, person_id: Optional[int] = None, source: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Recent LLM logs with prompt and response decompressed."""
+        where, params = [], []
+        if person_id is not None:
+            where.append("l.person_id = ?")
+            params.append(person_id)
+        if source is not None:
+            where.append("l.source = ?")
+            params.append(source)
+        rows = self.conn.execute(
+            "SELECT l.id, l.source, l.person_id, l.url, COALESCE(p.prompt, l.prompt) AS prompt,"
+            " COALESCE(l.response, a.markdown) AS response, l.article_id, l.created_at"
+            " FROM llm_logs l LEFT JOIN llm_prompts p ON p.id = l.prompt_id LEFT JOIN articles a ON a.id = l.article_id"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY l.id DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        logs = []
+        for r in rows:
+            log = dict(r)
+            log["prompt"] = unpack_text(log["prompt"])
+            log["response"] = unpack_text(log["response"])
+            logs.append(log)
+        return logs
+
+    def prune_articles(self, keep: int = DEFAULT_KEEP_ARTICLES) -> int:
+        """Delete all but the newest `keep` article versions per person."""
+        keep = max(1, keep)
+        ids = [
+            r[0]
+            for r in self.conn.execute(
+                "SELECT id FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY person_id ORDER BY id DESC) AS n"
+                " FROM articles) WHERE n > ?",
+                (keep,),
+            )
+        ]
+        self.conn.executemany("UPDATE llm_logs SET article_id = NULL WHERE article_id = ?", [(i,) for i in ids])
+        self.conn.executemany("DELETE FROM articles WHERE id = ?", [(i,) for i in ids])
+        return len(ids)
+
+    def recompress(self) -> int:
+        """Compress large values still stored as plain TEXT (rows written before
+        compression, or inline prompts). Returns the number of rows rewritten."""
+        n = 0
+        for table, columns in (("articles", ("markdown", "html")), ("llm_logs", ("response",))):
+            for col in columns:
+                rows = self.conn.execute(
+                    f"SELECT id, {col} FROM {table} WHERE typeof({col}) = 'text' AND length({col}) >= ?",
+                    (COMPRESS_MIN_BYTES,),
+                ).fetchall()
+                updates = [(packed, rid) for rid, text in rows for packed in [pack_text(text)] if isinstance(packed, bytes)]
+                self.conn.executemany(f"UPDATE {table} SET {col} = ? WHERE id = ?", updates)
+                n += len(updates)
+        rows = self.conn.execute("SELECT id, prompt FROM llm_logs WHERE prompt IS NOT NULL").fetchall()
+        self.conn.executemany(
+            "UPDATE llm_logs SET prompt_id = ?, prompt = NULL WHERE id = ?",
+            [(self.get_prompt_id(prompt), rid) for rid, prompt in rows],
+        )
+        self.conn.execute(
+            "DELETE FROM llm_prompts WHERE id NOT IN (SELECT prompt_id FROM llm_logs WHERE prompt_id IS NOT NULL)"
+        )
+        return n + len(rows)
+
+    def cluster_activities(self) -> int:
+        """Fingerprint and cluster activities stored before near-duplicate
+        detection existed. Returns the number of rows processed."""
+        return dedup.cluster_pending(self.conn)
+
+    def get_llm_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT response, created_at FROM llm_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        return {"response": row["response"], "created_at": row["created_at"]} if row else None
+
+    def touch_llm_cache(self, cache_key: str, now: int) -> None:
+        self.conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE cache_key = ?", (now, cache_key))
+
+    def put_llm_cache(self, cache_key: str, url: Optional[str], model: str, response: str, now: int) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (cache_key, url, model, response, created_at, last_used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key, url, model, response, now, now),
+        )
+
+    def delete_llm_cache(self, cache_key: str) -> None:
+        self.conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (cache_key,))
+
+    def evict_llm_cache(self, max_entries: int, expire_before: Optional[int] = None) -> int:
+        """Drop expired entries, then the least recently used beyond `max_entries`."""
+        before = self.conn.total_changes
+        if expire_before is not None:
+            self.conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (expire_before,))
+        self.conn.execute(
+            "DELETE FROM llm_cache WHERE cache_key IN "
+            "(SELECT cache_key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (max_entries,),
+        )
+        return self.conn.total_changes - before
+
+    def load_refresh_state(self) -> Dict[tuple, Dict[str, Any]]:
+        rows = self.conn.execute("SELECT person, source_type, interval, next_due, last_changed FROM refresh_state")
+        return {(r["person"], r["source_type"]): dict(r) for r in rows}
+
+    def save_refresh_state(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self.conn.executemany(
+            "INSERT INTO refresh_state (person, source_type, interval, next_due, last_changed) "
+            "VALUES (:person, :source_type, :interval, :next_due, :last_changed) "
+            "ON CONFLICT(person, source_type) DO UPDATE SET interval=excluded.interval, "
+            "next_due=excluded.next_due, last_changed=excluded.last_changed",
+            list(rows),
+        )
+
+    def get_feed_state(self, url: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT etag, last_modified, entries FROM feeds WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        return {
+            "etag": row["etag"],
+            "last_modified": row["last_modified"],
+            "entries": json.loads(row["entries"]) if row["entries"] else [],
+        }
+
+    def save_feed_state(self, url: str, etag: Optional[str], last_modified: Optional[str], entries: List[Dict[str, Any]]) -> None:
+        self.conn.execute(
+            "INSERT INTO feeds (url, etag, last_modified, entries, fetched_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(url) DO UPDATE SET etag=excluded.etag, last_modified=excluded.last_modified, "
+            "entries=excluded.entries, fetched_at=excluded.fetched_at",
+            (url, etag, last_modified, json.dumps(entries, ensure_ascii=False)),
+        )
+
+    def touch_feed(self, url: str) -> None:
+        self.conn.execute("UPDATE feeds SET fetched_at=CURRENT_TIMESTAMP WHERE url = ?", (url,))
+
+
+# every Session method is timed (db_call_seconds{op=...}) while metrics are on
+metrics.instrument(Session, metric="db_call_seconds")
+
+
+@contextmanager
+def session() -> Iterator[Session]:
+    """Open a unit of work: one connection, one transaction, committed on exit.
+
+    The transaction is rolled back if the block raises. Do not perform network
+    I/O inside the block; the write lock is held until it exits.
+    """
+    with metrics.timer("db_lock_wait_seconds"):
+        _WRITE_LOCK.acquire()
+    try:
+        conn = get_conn()
+        try:
+            with metrics.timer("db_transaction_seconds"):
+                yield Session(conn)
+                conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    finally:
+        _WRITE_LOCK.release()
+
+
+def upsert_person(name: str, wikipedia_summary: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> int:
+    with session() as s:
+        return s.upsert_person(name, wikipedia_summary=wikipedia_summary, metadata=metadata)
 
 
 def insert_source(url: str, type_: Optional[str] = None) -> int:
+    with session() as s:
+        return s.insert_source(url, type_=type_)
+
+
+def insert_activity(person_id: int, title: str, content: str, source_id: Optional[int] = None, published_at: Optional[str] = None, link: Optional[str] = None, published_ts: Optional[int] = None) -> int:
+    with session() as s:
+        return s.insert_activity(person_id, title, content, source_id=source_id, published_at=published_at, link=link, published_ts=published_ts)
+
+
+def get_person_id(name: str) -> Optional[int]:
     conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("INSERT OR IGNORE INTO sources (url, type) VALUES (?, ?)", (url, type_))
-    conn.commit()
-    cur.execute("SELECT id FROM sources WHERE url = ?", (url,))
-    row = cur.fetchone()
-    conn.close()
-    return row["id"] if row else -1
+    try:
+        return Session(conn).get_person_id(name)
+    finally:
+        conn.close()
 
 
-def insert_activity(person_id: int, title: str, content: str, source_id: Optional[int] = None, published_at: Optional[str] = None) -> int:
+def get_source_marks(person_id: int) -> Dict[str, int]:
     conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO activities (person_id, title, content, source_id, published_at) VALUES (?, ?, ?, ?, ?)",
-        (person_id, title, content, source_id, published_at),
-    )
-    activity_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return activity_id
-
-
-def insert_llm_log(person_id: Optional[int], source: str, url: Optional[str], prompt: Optional[str], response: Optional[str]) -> int:
-    """Insert an LLM log row. Returns inserted id or -1 on failure."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO llm_logs (source, person_id, url, prompt, response) VALUES (?, ?, ?, ?, ?)",
-            (source, person_id, url, prompt, response),
-        )
-        lid = cur.lastrowid
-        conn.commit()
+        return Session(conn).get_source_marks(person_id)
+    finally:
         conn.close()
-        return lid
+
+
+def list_recent_activities(person_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+    """Return the person's most recent stored activities, newest first."""
+    conn = get_conn()
+    try:
+        return Session(conn).list_recent_activities(person_id, limit=limit)
+    finally:
+        conn.close()
+
+
+def load_article_inputs(names: Iterable[str], limit: int = 50) -> List[Dict[str, Any]]:
+    """Load what an article needs (id, summary, recent activities) for each known name.
+
+    Uses one connection for the whole batch; names never collected are skipped.
+    """
+    conn = get_conn()
+    try:
+        s = Session(conn)
+        items = []
+        for name in names:
+            person = s.get_person(name)
+            if person is None:
+                continue
+            items.append({
+                "person_id": person["id"],
+                "name": person["name"],
+                "summary": person["wikipedia_summary"] or "",
+                "activities": s.list_recent_activities(person["id"], limit=limit),
+            })
+        return items
+    finally:
+        conn.close()
+
+
+def insert_article(person_id: int, title: str, markdown: str, html: str) -> int:
+    with session() as s:
+        return s.insert_article(person_id, title, markdown, html)
+
+
+def get_feed_state(url: str) -> Optional[Dict[str, Any]]:
+    """Return stored validators and cached entries for a feed URL, or None."""
+    conn = get_conn()
+    try:
+        return Session(conn).get_feed_state(url)
+    finally:
+        conn.close()
+
+
+def save_feed_state(url: str, etag: Optional[str], last_modified: Optional[str], entries: List[Dict[str, Any]]) -> None:
+    with session() as s:
+        s.save_feed_state(url, etag, last_modified, entries)
+
+
+def touch_feed(url: str) -> None:
+    """Record that a feed was revalidated (304) without changing its entries."""
+    with session() as s:
+        s.touch_feed(url)
+
+
+def insert_llm_log(person_id: Optional[int], source: str, url: Optional[str], prompt: Optional[str], response: Optional[str], article_id: Optional[int] = None) -> int:
+    """Insert an LLM log row. Returns inserted id or -1 on failure."""
+    try:
+        with session() as s:
+            return s.insert_llm_log(person_id, source, url, prompt, response, article_id=article_id)
     except Exception:
         # Do not let logging break main flows
-        try:
-            conn.close()
-        except Exception:
-            pass
         return -1
+
+
+def get_latest_article(person_id: int) -> Optional[Dict[str, Any]]:
+    conn = get_conn()
+    try:
+        return Session(conn).get_latest_article(person_id)
+    finally:
+        conn.close()
+
+
+def list_index_entries() -> List[Dict[str, Any]]:
+    conn = get_conn()
+    try:
+        return Session(conn).list_index_entries()
+    finally:
+        conn.close()
+
+
+def list_llm_logs(person_id: Optional[int] = None, source: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    conn = get_conn()
+    try:
+        return Session(conn).list_llm_logs(person_id=person_id, source=source, limit=limit)
+    finally:
+        conn.close()
+
+
+def compact(keep_articles: int = DEFAULT_KEEP_ARTICLES, vacuum: bool = True) -> Dict[str, int]:
+    """Retention and compaction: keep the newest `keep_articles` versions per
+    person, compress legacy plain-text rows, cluster activities not yet
+    fingerprinted, then VACUUM to return the space."""
+    with session() as s:
+        stats = {
+            "articles_deleted": s.prune_articles(keep_articles),
+            "rows_compressed": s.recompress(),
+            "activities_clustered": s.cluster_activities(),
+        }
+    if vacuum:
+        with _WRITE_LOCK:
+            conn = get_conn()
+            try:
+                before = conn.execute("PRAGMA page_count").fetchone()[0]
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.execute("VACUUM")
+                stats["pages_freed"] = before - conn.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                conn.close()
+    return stats
+
+
+def load_refresh_state() -> Dict[tuple, Dict[str, Any]]:
+    conn = get_conn()
+    try:
+        return Session(conn).load_refresh_state()
+    finally:
+        conn.close()
@@ -1,4 +1,6 @@
 -- SQLite schema for Press Project
+-- This is the base schema (migration 1). Later changes (new columns, indexes)
+-- are numbered migrations in src/db/migrations.py, applied by repository.init_db.
 
 PRAGMA foreign_keys = ON;
 
@@ -18,6 +20,16 @@ CREATE TABLE IF NOT EXISTS sources (
     fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Feed-level HTTP cache: validators for conditional GET plus the entries parsed
+-- from the last 200 response, reused when the server answers 304.
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    entries TEXT,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE IF NOT EXISTS activities (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     person_id INTEGER NOT NULL,
@@ -25,17 +37,32 @@ CREATE TABLE IF NOT EXISTS activities (
     content TEXT,
     source_id INTEGER,
     published_at DATETIME,
+    content_hash TEXT, -- stable hash of link + title + published (see repository.activity_hash)
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY(person_id) REFERENCES persons(id) ON DELETE CASCADE,
     FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE SET NULL
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_activities_person_hash ON activities(person_id, content_hash);
+
+-- Per person and source (feed URL) high-water mark: newest entry timestamp
+-- (epoch seconds) already processed, so later runs skip older entries.
+CREATE TABLE IF NOT EXISTS source_marks (
+    person_id INTEGER NOT NULL,
+    source_url TEXT NOT NULL,
+    high_water INTEGER NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (person_id, source_url),
+    FOREIGN KEY(person_id) REFERENCES persons(id) ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS articles (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     person_id INTEGER,
     title TEXT,
     markdown TEXT,
     html TEXT,
+    content_hash TEXT, -- sha256 of markdown; unchanged articles are not stored again
     generated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY(person_id) REFERENCES persons(id) ON DELETE SET NULL
 );
@@ -60,3 +87,16 @@ CREATE TABLE IF NOT EXISTS llm_logs (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY(person_id) REFERENCES persons(id) ON DELETE SET NULL
 );
+
+-- Content-addressed cache of LLM summaries. cache_key hashes the URL, the
+-- cleaned page text, the prompt and the model; times are epoch seconds.
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT,
+    model TEXT,
+    response TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    last_used_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at);
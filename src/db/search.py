@@ -0,0 +1,180 @@
+"""Full-text search over activities, articles and Wikipedia summaries.
+
+Backed by the FTS5 tables created in migration 5 (trigram tokenizer where
+available, so Japanese text matches without word segmentation). Each
+whitespace-separated term must match. Two-character terms, which the
+trigram index cannot match, are looked up in the bigram indexes
+(src/db/bigrams.py); single characters are rejected rather than scanned for.
+articles_fts is contentless (migration 5), so article snippets are cut
+from the stored article here.
+"""
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.db import bigrams
+from src.db import repository as repo
+from src.db.migrations import parse_published
+
+KINDS = ("activity", "article", "person")
+DateLike = Union[int, float, str, date, datetime, None]
+
+# kind -> (fts table, bigram table, snippet column index in the fts table,
+# stored text column); articles get their snippet from the stored text
+_TABLES = {
+    "activity": ("activities_fts", "activities_bigrams", 1, "a.content"),
+    "article": ("articles_fts", "articles_bigrams", None, "a.markdown"),
+    "person": ("persons_fts", "persons_bigrams", 1, "p.wikipedia_summary"),
+}
+
+# {table} is the fts or the bigram table; both are keyed by the row id
+_SELECT = {
+    "activity": (
+        "SELECT 'activity' AS kind, a.id, a.person_id, p.name AS person, a.title, {snippet} AS snippet,"
+        " a.published_ts, {score} AS score"
+        " FROM {table} f JOIN activities a ON a.id = f.rowid JOIN persons p ON p.id = a.person_id"
+    ),
+    "article": (
+        "SELECT 'article' AS kind, a.id, a.person_id, p.name AS person, a.title, {snippet} AS snippet,"
+        " CAST(strftime('%s', a.generated_at) AS INTEGER) AS published_ts, {score} AS score"
+        " FROM {table} f JOIN articles a ON a.id = f.rowid JOIN persons p ON p.id = a.person_id"
+    ),
+    "person": (
+        "SELECT 'person' AS kind, p.id, p.id AS person_id, p.name AS person, p.name AS title, {snippet} AS snippet,"
+        " NULL AS published_ts, {score} AS score"
+        " FROM {table} f JOIN persons p ON p.id = f.rowid"
+    ),
+}
+
+SNIPPET_CHARS = 120
+
+# column holding the person id / timestamp for filters, per kind
+_PERSON_COL = {"activity": "a.person_id", "article": "a.person_id", "person": "p.id"}
+_TS_COL = {"activity": "a.published_ts", "article": "CAST(strftime('%s', a.generated_at) AS INTEGER)"}
+
+
+def _to_epoch(value: DateLike) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int((value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp())
+    if isinstance(value, date):
+        return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp())
+    ts = parse_published(str(value))
+    if ts is None:
+        raise ValueError(f"unrecognized date: {value!r}")
+    return ts
+
+
+def _split_terms(query: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return (trigram MATCH expression, bigram MATCH expression), either None.
+
+    Raises ValueError for single-character terms, which no index can answer.
+    """
+    phrases, pairs = [], []
+    for term in query.split():
+        if len(term) == 1:
+            raise ValueError(f"search terms need at least two characters: {term!r}")
+        if len(term) == 2:
+            pairs.append(bigrams.term_token(term))
+        else:
+            phrases.append('"' + term.replace('"', '""') + '"')
+    return (" AND ".join(phrases) or None), (" AND ".join(pairs) or None)
+
+
+def _text_snippet(text: Any, terms: List[str]) -> str:
+    """Window of stored `text` around the first term found, marked with [ ]."""
+    text = " ".join((repo.unpack_text(text) or "").split())
+    lower = text.lower()
+    hits = [(i, t) for t in terms for i in [lower.find(t.lower())] if i >= 0]
+    if not hits:
+        return text[:SNIPPET_CHARS]
+    pos, term = min(hits)
+    start = max(0, pos - SNIPPET_CHARS // 3)
+    window = text[start : start + SNIPPET_CHARS]
+    cut = pos - start
+    window = window[:cut] + "[" + window[cut : cut + len(term)] + "]" + window[cut + len(term) :]
+    return ("…" if start else "") + window + ("…" if start + SNIPPET_CHARS < len(text) else "")
+
+
+def _kind_query(kind: str, match: Optional[str], pairs: Optional[str], person_id, since, until, limit) -> Tuple[str, list]:
+    fts, bigram, snippet_col, text_col = _TABLES[kind]
+    # the trigram index drives the query when there is a long term
+    table = fts if match else bigram
+    if snippet_col is None:
+        snippet = text_col
+    elif match:
+        snippet = f"snippet({fts}, {snippet_col}, '[', ']', '…', 12)"
+    else:
+        snippet = f"substr({text_col}, 1, {SNIPPET_CHARS})"
+    sql = _SELECT[kind].format(table=table, snippet=snippet, score=f"bm25({table})")
+    where, params = [], []
+    if match:
+        where.append(f"{fts} MATCH ?")
+        params.append(match)
+        if pairs:
+            where.append(f"f.rowid IN (SELECT rowid FROM {bigram} WHERE {bigram} MATCH ?)")
+            params.append(pairs)
+    else:
+        where.append(f"{bigram} MATCH ?")
+        params.append(pairs)
+    if person_id is not None:
+        where.append(f"{_PERSON_COL[kind]} = ?")
+        params.append(person_id)
+    if since is not None:
+        where.append(f"{_TS_COL[kind]} >= ?")
+        params.append(since)
+    if until is not None:
+        where.append(f"{_TS_COL[kind]} < ?")
+        params.append(until)
+    sql += " WHERE " + " AND ".join(where) + " ORDER BY score LIMIT ?"
+    params.append(limit)
+    return sql, params
+
+
+def search(
+    query: str,
+    person: Optional[str] = None,
+    since: DateLike = None,
+    until: DateLike = None,
+    kinds: Iterable[str] = KINDS,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Search collected text.
+
+    `person` restricts results to one person (by name). `since` / `until`
+    bound the publish time (articles: generation time) as epoch seconds,
+    dates or date strings; `until` is exclusive. Person summaries have no
+    date, so they are left out when a date range is given. Results are
+    ordered by bm25 rank (lower is better) and carry kind, id, person_id,
+    person, title, snippet, published_ts and score. Terms must be at least
+    two characters long (ValueError otherwise).
+    """
+    match, pairs = _split_terms(query or "")
+    if not match and not pairs:
+        return []
+    since_ts, until_ts = _to_epoch(since), _to_epoch(until)
+    kinds = [k for k in kinds if k in _TABLES]
+    if since_ts is not None or until_ts is not None:
+        kinds = [k for k in kinds if k in _TS_COL]
+
+    conn = repo.get_conn()
+    try:
+        person_id = None
+        if person is not None:
+            row = conn.execute("SELECT id FROM persons WHERE name = ?", (person,)).fetchone()
+            if row is None:
+                return []
+            person_id = row["id"]
+        results: List[Dict[str, Any]] = []
+        for kind in kinds:
+            sql, params = _kind_query(kind, match, pairs, person_id, since_ts, until_ts, limit)
+            results.extend(dict(r) for r in conn.execute(sql, params))
+    finally:
+        conn.close()
+    for r in results:
+        if r["kind"] == "article":
+            r["snippet"] = _text_snippet(r["snippet"], query.split())
+    results.sort(key=lambda r: r["score"])
+    return results[:limit]
@@ -0,0 +1,93 @@
+"""Activity-level snapshots based on content-hash sets.
+
+Each person's current set of activity hashes lives in
+``person_activity_sets``. Recording a snapshot compares the new set with it
+using set operations, stores only the added/removed hashes in
+``snapshot_items`` and updates the current set, so the cost is linear in the
+set size and rows stay small. Textual diffs are rendered on demand.
+
+The collect stage snapshots every stored activity of the person on each run
+(``record_stored_snapshot``), so the history does not depend on which
+activities an article happens to show.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.db import repository as repo
+from src.utils import metrics
+
+
+def record_snapshot(db: "repo.Session", person_id: int, hashes: Iterable[str]) -> Optional[Dict[str, Set[str]]]:
+    """Record the person's current activity set within an open session.
+
+    Returns ``{"snapshot_id", "added", "removed"}``, or None when the set is
+    unchanged (no snapshot row is written).
+    """
+    conn = db.conn
+    current = set(hashes)
+    previous = {
+        r[0] for r in conn.execute("SELECT content_hash FROM person_activity_sets WHERE person_id = ?", (person_id,))
+    }
+    added = current - previous
+    removed = previous - current
+    if not added and not removed:
+        return None
+
+    cur = conn.execute(
+        "INSERT INTO snapshots (person_id, snapshot_date, added, removed) VALUES (?, date('now'), ?, ?)",
+        (person_id, len(added), len(removed)),
+    )
+    snapshot_id = cur.lastrowid
+    conn.executemany(
+        "INSERT INTO snapshot_items (snapshot_id, content_hash, change) VALUES (?, ?, ?)",
+        [(snapshot_id, h, 1) for h in added] + [(snapshot_id, h, -1) for h in removed],
+    )
+    conn.executemany(
+        "DELETE FROM person_activity_sets WHERE person_id = ? AND content_hash = ?",
+        [(person_id, h) for h in removed],
+    )
+    conn.executemany(
+        "INSERT INTO person_activity_sets (person_id, content_hash) VALUES (?, ?)",
+        [(person_id, h) for h in added],
+    )
+    metrics.inc("db_rows_written_total", 1 + len(added) + len(removed), table="snapshots")
+    return {"snapshot_id": snapshot_id, "added": added, "removed": removed}
+
+
+def record_stored_snapshot(db: "repo.Session", person_id: int) -> Optional[Dict[str, Set[str]]]:
+    """Snapshot the hashes of all activities stored for the person."""
+    rows = db.conn.execute(
+        "SELECT content_hash FROM activities WHERE person_id = ? AND content_hash IS NOT NULL", (person_id,)
+    )
+    return record_snapshot(db, person_id, (r[0] for r in rows))
+
+
+def snapshot_changes(snapshot_id: int) -> Dict[str, List[Dict[str, str]]]:
+    """Return the activities added and removed by a snapshot."""
+    conn = repo.get_conn()
+    try:
+        rows = conn.execute(
+            "SELECT si.change, a.title, a.content FROM snapshot_items si "
+            "JOIN snapshots s ON s.id = si.snapshot_id "
+            "LEFT JOIN activities a ON a.person_id = s.person_id AND a.content_hash = si.content_hash "
+            "WHERE si.snapshot_id = ? ORDER BY si.change DESC, a.published_ts DESC",
+            (snapshot_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+    out: Dict[str, List[Dict[str, str]]] = {"added": [], "removed": []}
+    for r in rows:
+        key = "added" if r["change"] > 0 else "removed"
+        out[key].append({"title": r["title"] or "(unknown activity)", "content": r["content"] or ""})
+    return out
+
+
+def render_diff(snapshot_id: int) -> List[str]:
+    """Render a snapshot as diff-style lines ("+ title" / "- title")."""
+    changes = snapshot_changes(snapshot_id)
+    lines = []
+    for sign, key in (("+", "added"), ("-", "removed")):
+        for a in changes[key]:
+            lines.append(f"{sign} {a['title']}")
+            if a["content"]:
+                lines.extend(f"{sign}   {ln}" for ln in a["content"].splitlines())
+    return lines
@@ -1,25 +1,33 @@
-"""Article generator: render markdown and html from person data and activities."""
 """Article generator: render markdown and html from person data and activities.
 
 This module attempts to use Jinja2 and markdown if available but falls back to
 minimal built-in formatting when they are not installed (so CI / quick-runs
 without full deps still work).
+
+`ArticleRenderer` compiles the Jinja template once and reuses a Markdown
+converter per thread; `render_many` renders a batch of articles, optionally
+spread over a process pool. The module-level functions use a shared default
+renderer.
 """
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, List, Dict, Optional, Tuple
 import html
+import threading
+
+from src.utils import metrics
 
 try:
-  from jinja2 import Template
+  from jinja2 import Environment
   _HAS_JINJA = True
 except Exception:
-  Template = None  # type: ignore
+  Environment = None  # type: ignore
   _HAS_JINJA = False
 
 try:
-  from markdown import markdown as _md_to_html
+  import markdown as _markdown
   _HAS_MARKDOWN = True
 except Exception:
-  _md_to_html = None  # type: ignore
+  _markdown = None  # type: ignore
   _HAS_MARKDOWN = False
 
 DEFAULT_TEMPLATE = """# {{ name }}
@@ -34,20 +42,87 @@ DEFAULT_TEMPLATE = """# {{ name }}
 """
 
 
+def _wrap_html(body: str) -> str:
+  return f"<html><head><meta charset=\"utf-8\"><meta name=\"viewport\" content=\"width=device-width,initial-scale=1\"><title>Article</title></head><body>{body}</body></html>"
+
+
+class ArticleRenderer:
+  """Reusable renderer: template compiled once, Markdown converter reused."""
+
+  def __init__(self, template: str = DEFAULT_TEMPLATE):
+    self.template_source = template
+    self._template = Environment().from_string(template) if _HAS_JINJA else None
+    # markdown.Markdown instances keep state and are not thread-safe
+    self._local = threading.local()
+
+  def render_markdown(self, name: str, summary: str, activities: List[Dict]) -> str:
+    if self._template is not None:
+      return self._template.render(name=name, summary=summary or "", activities=activities)
+
+    # Fallback: naive formatting
+    lines = [f"# {name}", "", summary or "", "", "## Recent activities"]
+    for a in activities:
+      title = a.get("title") or "(no title)"
+      published = a.get("published") or ""
+      content = a.get("content") or ""
+      lines.append(f"- **{title}** — {published}  \n  {content}")
+    return "\n".join(lines)
+
+  def render_html(self, markdown_text: str) -> str:
+    if _HAS_MARKDOWN:
+      converter = getattr(self._local, "converter", None)
+      if converter is None:
+        converter = self._local.converter = _markdown.Markdown()
+      body = converter.reset().convert(markdown_text)
+    else:
+      # Very small fallback: escape and convert newlines to <p>
+      escaped = html.escape(markdown_text)
+      paragraphs = [f"<p>{p.strip()}</p>" for p in escaped.split("\n\n") if p.strip()]
+      body = "\n".join(paragraphs)
+    return _wrap_html(body)
+
+  def render(self, name: str, summary: str, activities: List[Dict]) -> Tuple[str, str]:
+    """Return (markdown, html) for one person."""
+    md = self.render_markdown(name, summary, activities)
+    return md, self.render_html(md)
+
+  def render_many(self, items: Iterable[Dict[str, Any]], processes: Optional[int] = None, chunksize: int = 32) -> List[Tuple[str, str]]:
+    """Render many articles; items are dicts with name, summary and activities.
+
+    With `processes` > 1 the work is spread over a process pool (worth it for
+    thousands of pages); results keep the input order.
+    """
+    items = list(items)
+    if processes and processes > 1 and len(items) > chunksize:
+      with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(self.template_source,)) as pool:
+        return list(pool.map(_render_in_worker, items, chunksize=chunksize))
+    return [self.render(i.get("name", ""), i.get("summary") or "", i.get("activities") or []) for i in items]
+
+
+metrics.instrument(ArticleRenderer, names=("render_markdown", "render_html"), metric="render_seconds")
+
+_default_renderer: Optional[ArticleRenderer] = None
+
+
+def get_default_renderer() -> ArticleRenderer:
+  global _default_renderer
+  if _default_renderer is None:
+    _default_renderer = ArticleRenderer()
+  return _default_renderer
+
+
+def _init_worker(template: str) -> None:
+  global _default_renderer
+  _default_renderer = ArticleRenderer(template)
+
+
+def _render_in_worker(item: Dict[str, Any]) -> Tuple[str, str]:
+  return get_default_renderer().render(item.get("name", ""), item.get("summary") or "", item.get("activities") or [])
+
+
 def generate_article_markdown(name: str, summary: str, activities: List[Dict]) -> str:
   """Return markdown text for a person. Uses Jinja2 when available."""
-  if _HAS_JINJA and Template is not None:
-    tpl = Template(DEFAULT_TEMPLATE)
-    return tpl.render(name=name, summary=summary or "", activities=activities)
-
-  # Fallback: naive formatting
-  lines = [f"# {name}", "", summary or "", "", "## Recent activities"]
-  for a in activities:
-    title = a.get("title") or "(no title)"
-    published = a.get("published") or ""
-    content = a.get("content") or ""
-    lines.append(f"- **{title}** — {published}  \n  {content}")
-  return "\n".join(lines)
+  return get_default_renderer().render_markdown(name, summary, activities)
 
 
 def generate_article_markdown_and_log(name: str, summary: str, activities: List[Dict], person_id: Optional[int] = None, prompt: Optional[str] = None) -> str:
@@ -76,11 +151,4 @@ def generate_article_html(markdown_text: str) -> str:
   If the `markdown` package is available it will be used, otherwise a very
   small escape-and-wrap fallback is returned.
   """
-  if _HAS_MARKDOWN and _md_to_html is not None:
-    body = _md_to_html(markdown_text)
-  else:
-    # Very small fallback: escape and convert newlines to <p>
-    escaped = html.escape(markdown_text)
-    paragraphs = [f"<p>{p.strip()}</p>" for p in escaped.split("\n\n") if p.strip()]
-    body = "\n".join(paragraphs)
-  return f"<html><head><meta charset=\"utf-8\"><meta name=\"viewport\" content=\"width=device-width,initial-scale=1\"><title>Article</title></head><body>{body}</body></html>"
+  return get_default_renderer().render_html(markdown_text)
@@ -0,0 +1,181 @@
+"""Site index generated from the database.
+
+Persons with a published article are listed in name order on paginated
+pages (index.html, index-2.html, ...) and on per-initial pages
+(index-<group>.html, index-<group>-2.html, ...): Latin names by first letter,
+kana names by gojūon row (あ, か, さ, ...), kanji names under one 漢字 group
+since their reading is not known. A compact search-index.json lets the
+index pages filter the whole roster client-side.
+
+Everything is written through SiteWriter with kind "index" and its own
+manifest, so only pages whose content changed are rewritten and pages that
+no longer exist (e.g. a shorter last page) are removed. Pages do not show
+the total page count, so adding a person only touches the pages from its
+position onwards.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import unicodedata
+from pathlib import Path
+
+from jinja2 import Environment
+
+from src.db import repository as repo
+from src.generators.site_writer import SiteWriter, slugify
+
+PAGE_SIZE = 100
+SEARCH_INDEX = "search-index.json"
+INDEX_MANIFEST = Path("data") / "site_manifest.index.json"
+
+# gojūon rows: (group key, label, hiragana in the row)
+KANA_ROWS = (
+    ("a", "あ", "ぁあぃいぅうぇえぉおゔ"),
+    ("ka", "か", "かがきぎくぐけげこごゕゖ"),
+    ("sa", "さ", "さざしじすずせぜそぞ"),
+    ("ta", "た", "ただちぢっつづてでとど"),
+    ("na", "な", "なにぬねの"),
+    ("ha", "は", "はばぱひびぴふぶぷへべぺほぼぽ"),
+    ("ma", "ま", "まみむめも"),
+    ("ya", "や", "ゃやゅゆょよ"),
+    ("ra", "ら", "らりるれろ"),
+    ("wa", "わ", "ゎわゐゑをん"),
+)
+_KANA_GROUP = {c: (f"kana-{key}", label) for key, label, chars in KANA_ROWS for c in chars}
+_GROUP_ORDER = (
+    [f"latin-{c}" for c in "abcdefghijklmnopqrstuvwxyz"] + [f"kana-{key}" for key, _, _ in KANA_ROWS] + ["kanji", "other"]
+)
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>人物一覧{% if group %} — {{ group }}{% endif %}{% if page > 1 %} ({{ page }}){% endif %}</title></head>
+<body>
+<h1>人物一覧{% if group %} — {{ group }}{% endif %}</h1>
+<p><input type="search" id="q" placeholder="名前で検索" autocomplete="off"></p>
+<ul id="results" hidden></ul>
+<nav class="groups"><a href="index.html">すべて</a>{% for g in groups %} <a href="{{ g.href }}">{{ g.label }}</a>{% endfor %}</nav>
+<ul class="persons">
+{% for p in persons %}<li><a href="{{ p.page }}">{{ p.name }}</a>{% if p.updated %} <small>{{ p.updated }}</small>{% endif %}</li>
+{% endfor %}</ul>
+{% if pages > 1 %}<nav class="pages">{% if prev %}<a href="{{ prev }}" rel="prev">前へ</a> {% endif %}{{ page }}{% if next %} <a href="{{ next }}" rel="next">次へ</a>{% endif %}</nav>
+{% endif %}<script>
+(function () {
+  var q = document.getElementById("q"), out = document.getElementById("results"), items = null;
+  function norm(s) {
+    return s.normalize("NFKC").toLowerCase().replace(/[\\u30a1-\\u30f6]/g, function (c) {
+      return String.fromCharCode(c.charCodeAt(0) - 0x60);
+    });
+  }
+  function show() {
+    var term = norm(q.value.trim());
+    out.textContent = "";
+    out.hidden = !term;
+    if (!term || !items) return;
+    for (var i = 0, n = 0; i < items.length && n < 50; i++) {
+      if ((items[i][2] || items[i][0].toLowerCase()).indexOf(term) < 0) continue;
+      var li = document.createElement("li"), a = document.createElement("a");
+      a.href = items[i][1];
+      a.textContent = items[i][0];
+      li.appendChild(a);
+      out.appendChild(li);
+      n++;
+    }
+  }
+  q.addEventListener("input", function () {
+    if (items) return show();
+    fetch("{{ search_index }}").then(function (r) { return r.json(); }).then(function (d) { items = d.items; show(); });
+  });
+})();
+</script>
+</body></html>
+"""
+
+_template = None
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        _template = Environment(autoescape=True).from_string(TEMPLATE)
+    return _template
+
+
+def search_key(name: str) -> str:
+    """Normalized form matched by the client-side search (NFKC, lower case, katakana as hiragana)."""
+    text = unicodedata.normalize("NFKC", name).lower()
+    return "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in text)
+
+
+def initial_group(name: str) -> Tuple[str, str]:
+    """(group key, label) for the first character of `name`."""
+    key = search_key(name.strip())[:1]
+    if "a" <= key <= "z":
+        return f"latin-{key}", key.upper()
+    if key in _KANA_GROUP:
+        return _KANA_GROUP[key]
+    if key and unicodedata.name(key, "").startswith("CJK"):
+        return "kanji", "漢字"
+    return "other", "他"
+
+
+def _page_name(prefix: str, number: int) -> str:
+    return f"{prefix}.html" if number == 1 else f"{prefix}-{number}.html"
+
+
+def _render_listing(
+    prefix: str, persons: List[Dict[str, Any]], groups: List[Dict[str, str]], group_label: Optional[str], page_size: int
+) -> Dict[str, str]:
+    """Pages of one listing (all persons or one group): page name -> html."""
+    template = _get_template()
+    chunks = [persons[i : i + page_size] for i in range(0, len(persons), page_size)] or [[]]
+    out = {}
+    for number, chunk in enumerate(chunks, 1):
+        out[_page_name(prefix, number)] = template.render(
+            persons=chunk,
+            groups=groups,
+            group=group_label,
+            page=number,
+            pages=len(chunks),
+            prev=_page_name(prefix, number - 1) if number > 1 else None,
+            next=_page_name(prefix, number + 1) if number < len(chunks) else None,
+            search_index=SEARCH_INDEX,
+        )
+    return out
+
+
+def build_index(entries: List[Dict[str, Any]], page_size: int = PAGE_SIZE) -> Dict[str, str]:
+    """All index pages and the search index for `entries` (name, generated_at): file name -> content."""
+    persons = []
+    by_group: Dict[str, List[Dict[str, Any]]] = {}
+    labels: Dict[str, str] = {}
+    for e in sorted(entries, key=lambda e: (search_key(e["name"]), e["name"])):
+        key, label = initial_group(e["name"])
+        labels[key] = label
+        p = {"name": e["name"], "page": slugify(e["name"]) + ".html", "updated": (e.get("generated_at") or "")[:10]}
+        persons.append(p)
+        by_group.setdefault(key, []).append(p)
+
+    groups = [{"key": k, "label": labels[k], "href": f"index-{k}.html"} for k in _GROUP_ORDER if k in by_group]
+    files = _render_listing("index", persons, groups, None, page_size)
+    for g in groups:
+        files.update(_render_listing(f"index-{g['key']}", by_group[g["key"]], groups, g["label"], page_size))
+
+    items = []
+    for p in persons:
+        key = search_key(p["name"])
+        items.append([p["name"], p["page"]] + ([key] if key != p["name"].lower() else []))
+    files[SEARCH_INDEX] = json.dumps({"v": 1, "items": items}, ensure_ascii=False, separators=(",", ":"))
+    return files
+
+
+def generate_index(site_writer: Optional[SiteWriter] = None, page_size: int = PAGE_SIZE) -> Dict[str, int]:
+    """Write the index pages for persons whose article page exists in the site.
+
+    Returns counts of listed persons, index files, and files written / removed.
+    """
+    writer = site_writer or SiteWriter(manifest_path=INDEX_MANIFEST)
+    entries = [e for e in repo.list_index_entries() if (writer.site_dir / (slugify(e["name"]) + ".html")).exists()]
+    files = build_index(entries, page_size=page_size)
+    written = sum(writer.write_page(name, text, kind="index") for name, text in files.items())
+    removed = writer.prune(files, kind="index")
+    writer.save()
+    return {"persons": len(entries), "files": len(files), "written": written, "removed": len(removed)}
@@ -0,0 +1,96 @@
+"""Incremental, atomic writer for generated site pages.
+
+A manifest (page name -> content hash) is kept outside the published site so
+unchanged pages are neither rewritten nor re-uploaded. Changed pages are
+written to a temporary file in the same directory and renamed into place, so
+a crash never leaves a half-written page. Pages of persons dropped from the
+roster are removed with ``prune``.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.utils import metrics
+from src.utils.fileio import write_atomic
+
+DEFAULT_MANIFEST = Path("data") / "site_manifest.json"
+
+
+def slugify(name: str) -> str:
+    """Page file stem for a person's name."""
+    return "".join(c if c.isalnum() else "_" for c in name).strip("_")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SiteWriter:
+    def __init__(self, site_dir: str = "site", manifest_path: Optional[Path] = None):
+        self.site_dir = Path(site_dir)
+        self.manifest_path = Path(manifest_path) if manifest_path else DEFAULT_MANIFEST
+        self._lock = threading.Lock()
+        self._pages: Dict[str, Dict[str, str]] = {}
+        self._dirty = False
+        self.written = 0
+        self.skipped = 0
+        if self.manifest_path.exists():
+            try:
+                self._pages = json.loads(self.manifest_path.read_text(encoding="utf-8")).get("pages", {})
+            except (ValueError, OSError):
+                self._pages = {}
+
+    def write_page(self, name: str, text: str, kind: str = "person") -> bool:
+        """Write site/<name> if its content changed. Returns True if written."""
+        h = content_hash(text)
+        path = self.site_dir / name
+        with self._lock:
+            known = self._pages.get(name, {}).get("hash")
+        if known is None and path.exists():
+            # no manifest entry yet (first incremental run): compare with disk
+            try:
+                known = content_hash(path.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError):
+                known = None
+        if known == h and path.exists():
+            with self._lock:
+                if self._pages.get(name) != {"hash": h, "kind": kind}:
+                    self._pages[name] = {"hash": h, "kind": kind}
+                    self._dirty = True
+                self.skipped += 1
+            metrics.inc("site_pages_total", result="unchanged")
+            return False
+        write_atomic(path, text)
+        with self._lock:
+            self._pages[name] = {"hash": h, "kind": kind}
+            self._dirty = True
+            self.written += 1
+        metrics.inc("site_pages_total", result="written")
+        return True
+
+    def prune(self, keep: Iterable[str], kind: str = "person") -> List[str]:
+        """Delete tracked pages of `kind` that are not in `keep`."""
+        keep = set(keep)
+        removed = []
+        with self._lock:
+            for name, info in list(self._pages.items()):
+                if info.get("kind") != kind or name in keep:
+                    continue
+                try:
+                    (self.site_dir / name).unlink()
+                except FileNotFoundError:
+                    pass
+                del self._pages[name]
+                removed.append(name)
+                self._dirty = True
+        return removed
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({"pages": self._pages}, ensure_ascii=False, indent=1, sort_keys=True)
+            self._dirty = False
+        write_atomic(self.manifest_path, data)
@@ -1,14 +1,25 @@
 """Bootstrap and example runner for Press Project.
 
 Usage:
-    python src/main.py
+    python src/main.py [all|collect|render|index|compact|daemon] [--workers N] [--max-requests N] [--shard i/n]
+
+Stages: ``collect`` fetches and stores data, ``render`` rebuilds every page from
+activities already in SQLite (no network), ``index`` regenerates the index
+pages, and ``all`` (the default) does all three. ``daemon`` runs until stopped,
+refreshing each person's sources on adaptive per-type intervals.
 
 This script will initialize the DB schema. It includes an example_flow that
 is guarded by the SKIP_NETWORK environment variable to avoid network calls in CI.
+With ``--workers N`` (or PRESS_WORKERS) persons are processed concurrently by a
+thread pool; ``--max-requests`` caps the number of in-flight network requests
+across all workers; every collector shares one pooled HTTP client
+(src/collectors/http_client.py) that also applies per-host limits.
 """
 import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
 
 # Ensure project root is on sys.path so `from src...` imports work when running
 # `python src/main.py` directly.
@@ -16,29 +27,61 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.collectors import http_client
 from src.db import repository as repo
+from src.db import snapshot_store
 from src.generators.article_generator import (
-    generate_article_markdown_and_log,
+    generate_article_markdown,
     generate_article_html,
 )
-from src.utils.diff_util import compute_diff
+from src.generators.site_writer import SiteWriter, content_hash, slugify
+from src.utils import metrics
+from src.utils.sharding import in_shard, parse_shard
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+DEFAULT_MAX_REQUESTS = 8
+# Activities shown per article (the render stage reads the newest N from SQLite).
+ARTICLE_ACTIVITY_LIMIT = 50
+# Persons rendered per batch by the render stage.
+RENDER_BATCH = 500
+
+
+def read_persons(shard=None) -> list:
+    """Return the roster (or one shard of it) as a list; see iter_persons."""
+    return list(iter_persons(shard))
+
+
+class Roster:
+    """The roster (or one shard of it) as a re-iterable stream.
+
+    Every iteration re-reads the roster file through iter_persons, so the
+    pipeline never holds all persons in memory. `count` is the number of
+    persons seen by the last complete iteration.
+    """
 
-def slugify(name: str) -> str:
-    return "".join(c if c.isalnum() else "_" for c in name).strip("_")
+    def __init__(self, shard=None):
+        self.shard = shard
+        self.count: Optional[int] = None
 
+    def __iter__(self):
+        n = 0
+        for p in iter_persons(self.shard):
+            n += 1
+            yield p
+        self.count = n
 
-def read_persons() -> list:
-    """Attempt to read persons from data/persons.csv or data/persons.txt.
 
-    CSV format: name,rss,x_urls  (rss and x_urls are semicolon-separated lists)
+def iter_persons(shard=None):
+    """Stream persons from data/persons.csv or data/persons.txt.
+
+    CSV format: name,rss,x_urls[,aliases][,wikipedia]  (rss, x_urls and aliases are
+    semicolon-separated lists; wikipedia is the article title if it differs from name)
     TXT format: one name per line
-    If none found, return a small default list.
+    Rows are parsed one at a time; with `shard` = (i, n) only that shard's
+    persons are yielded. If no roster file exists, yield a small default list.
     """
-    persons = []
     csv_path = Path("data") / "persons.csv"
     txt_path = Path("data") / "persons.txt"
     if csv_path.exists():
@@ -48,179 +91,629 @@ def read_persons() -> list:
             rdr = csv.DictReader(f)
             for r in rdr:
                 name = r.get("name") or r.get("Name")
-                if not name:
+                if not name or not in_shard(name, shard):
                     continue
                 rss = (r.get("rss") or "")
                 x_urls = (r.get("x_urls") or "")
-                persons.append({"name": name.strip(), "rss": [u for u in rss.split(";") if u], "x_urls": [u for u in x_urls.split(";") if u]})
-        return persons
+                aliases = (r.get("aliases") or "")
+                yield {
+                    "name": name.strip(),
+                    "rss": [u for u in rss.split(";") if u],
+                    "x_urls": [u for u in x_urls.split(";") if u],
+                    "aliases": [a.strip() for a in aliases.split(";") if a.strip()],
+                    "wikipedia": (r.get("wikipedia") or "").strip() or None,
+                }
+        return
     if txt_path.exists():
-        for line in txt_path.read_text(encoding="utf-8").splitlines():
-            name = line.strip()
-            if name:
-                persons.append({"name": name, "rss": [], "x_urls": []})
-        return persons
+        with txt_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                name = line.strip()
+                if name and in_shard(name, shard):
+                    yield {"name": name, "rss": [], "x_urls": []}
+        return
 
     # fallback defaults
-    return [{"name": "Sample Politician", "rss": [], "x_urls": []}]
+    for p in [{"name": "Sample Politician", "rss": [], "x_urls": []}]:
+        if in_shard(p["name"], shard):
+            yield p
+
+
+# Source types collected per person (also the daemon's unit of scheduling).
+SOURCE_TYPES = ("wikipedia", "rss", "x_url")
+
+
+def collect_person(p: dict, skip_network: bool = False, feed_cache=None, matcher=None, wiki=None) -> int:
+    """Collect stage: fetch Wikipedia, feeds and X URLs and store them. Returns person_id."""
+    person_id, _ = collect_sources(
+        p, SOURCE_TYPES, skip_network=skip_network, feed_cache=feed_cache, matcher=matcher, wiki=wiki
+    )
+    return person_id
 
 
-def process_person(p: dict, skip_network: bool = False):
+def collect_sources(p: dict, sources=SOURCE_TYPES, skip_network: bool = False, feed_cache=None, matcher=None, wiki=None):
+    """Fetch and store the given source types for one person.
+
+    `wiki` is a run-wide WikipediaSummaries (batched lookups); without it the
+    person's summary is looked up on its own.
+    Returns (person_id, {source type: changed}) where changed means a new
+    Wikipedia summary or new activities from that source.
+    """
     name = p.get("name")
-    print(f"Processing: {name}")
+    print(f"Collecting: {name}")
 
-    # 1) Wikipedia summary
+    # 1) Wikipedia summary (the CSV "wikipedia" column overrides the title)
     summary = None
-    if not skip_network:
-        try:
-            from src.collectors.wikipedia_collector import collect_wikipedia
-
-            summary = collect_wikipedia(name)
-        except Exception as e:
-            print("Wikipedia fetch failed:", e)
-    # upsert person record
-    person_id = repo.upsert_person(name, wikipedia_summary=summary)
+    if not skip_network and "wikipedia" in sources:
+        with metrics.timer("stage_seconds", stage="wikipedia"):
+            summary = _fetch_wikipedia(p, wiki)
 
     # 2) Collect RSS activities
-    activities = []
-    if not skip_network and p.get("rss"):
-        try:
-            from src.collectors.rss_collector import parse_rss_feed
-
-            for feed in p.get("rss", []):
-                try:
-                    entries = parse_rss_feed(feed)
-                except Exception as e:
-                    print(f"Failed to parse feed {feed}:", e)
-                    continue
-                for e in entries:
-                    title = e.get("title") or ""
-                    summary_text = e.get("summary") or ""
-                    # naive relevance check
-                    if name.lower() in (title + " " + summary_text).lower():
-                        src_id = repo.insert_source(e.get("link") or feed, type_="rss")
-                        aid = repo.insert_activity(person_id, title, summary_text, source_id=src_id, published_at=e.get("published"))
-                        activities.append({"title": title, "content": summary_text, "published": e.get("published")})
-        except Exception as e:
-            print("RSS collection error:", e)
+    activities = {"rss": [], "x_url": []}
+    new_marks = {}
+    if not skip_network and "rss" in sources and p.get("rss"):
+        with metrics.timer("stage_seconds", stage="rss"):
+            activities["rss"], new_marks = _fetch_feed_activities(p, feed_cache, matcher)
 
     # 3) X/Twitter URL summarization
-    if not skip_network and p.get("x_urls"):
-        try:
-            from src.collectors.x_url_summarizer import summarize_url_with_gpt
-
-            for url in p.get("x_urls", []):
-                try:
-                    s = summarize_url_with_gpt(url)
-                except Exception as e:
-                    print("X URL summarizer failed:", e)
-                    s = None
-                if s:
-                    src_id = repo.insert_source(url, type_="x_url")
-                    repo.insert_activity(person_id, f"X post summary", s, source_id=src_id)
-                    activities.append({"title": "X post", "content": s, "published": ""})
-        except Exception as e:
-            print("X summarizer error:", e)
+    if not skip_network and "x_url" in sources and p.get("x_urls"):
+        with metrics.timer("stage_seconds", stage="x_url"):
+            activities["x_url"] = _fetch_x_activities(p)
+
+    # persist person, sources and new activities in one transaction; entries
+    # already stored on earlier runs are skipped by their content hash. A
+    # summary that was not fetched (or failed) keeps the stored one.
+    changed = {}
+    with metrics.timer("stage_seconds", stage="store"), repo.session() as db:
+        stored = db.get_person(name)
+        previous = stored["wikipedia_summary"] if stored else None
+        if summary is None:
+            summary = previous
+        changed["wikipedia"] = stored is None or summary != previous
+        person_id = db.upsert_person(name, wikipedia_summary=summary)
+        for source_type, rows in activities.items():
+            changed[source_type] = db.insert_activities(
+                {
+                    "person_id": person_id,
+                    "title": a["title"],
+                    "content": a["content"],
+                    "source_id": db.insert_source(a["source_url"], type_=source_type),
+                    "published_at": a["published"] or None,
+                    "published_ts": a.get("published_ts"),
+                    "link": a.get("link"),
+                }
+                for a in rows
+            )
+        if new_marks:
+            db.update_source_marks(person_id, new_marks)
+        # record which stored activities were added/removed since the last run
+        snapshot_store.record_stored_snapshot(db, person_id)
+    print(f"New activities: {changed['rss'] + changed['x_url']}")
+    return person_id, {k: bool(v) for k, v in changed.items() if k in sources}
+
+
+def _fetch_wikipedia(p: dict, wiki=None) -> Optional[str]:
+    name = p.get("name")
+    title = p.get("wikipedia") or name
+    try:
+        if wiki is not None:
+            return wiki.get(title)
+        from src.collectors.wikipedia_collector import collect_wikipedia
 
-    # 4) Generate article (use wrapper that also logs to llm_logs)
+        return collect_wikipedia(title)
+    except Exception as e:
+        print("Wikipedia fetch failed:", e)
+        return None
+
+
+def _fetch_feed_activities(p: dict, feed_cache=None, matcher=None):
+    """New feed entries mentioning the person: (activity rows, new high-water marks)."""
+    name = p.get("name")
+    rows, new_marks = [], {}
     try:
-        md = generate_article_markdown_and_log(
-            name, summary or "", activities, person_id=person_id, prompt="auto-article-template-v1"
-        )
+        if feed_cache is None:
+            from src.collectors.feed_cache import FeedCache
+
+            feed_cache = FeedCache()
+        if matcher is None:
+            from src.utils.name_matcher import NameMatcher
+
+            matcher = NameMatcher([p])
+        known_id = repo.get_person_id(name)
+        marks = repo.get_source_marks(known_id) if known_id is not None else {}
+        for feed in p.get("rss", []):
+            try:
+                matched = feed_cache.get_matched_entries(feed, matcher)
+            except Exception as e:
+                print(f"Failed to parse feed {feed}:", e)
+                continue
+            # only entries at or after this feed's high-water mark are new;
+            # undated entries are always considered (the hash dedups them)
+            mark = marks.get(feed)
+            for e, mentioned in matched:
+                ts = e.get("published_ts")
+                if ts is not None:
+                    new_marks[feed] = max(new_marks.get(feed, ts), ts)
+                    if mark is not None and ts < mark:
+                        continue
+                if name in mentioned:
+                    rows.append({
+                        "title": e.get("title") or "",
+                        "content": e.get("summary") or "",
+                        "published": e.get("published"),
+                        "published_ts": ts,
+                        "link": e.get("link"),
+                        "source_url": e.get("link") or feed,
+                    })
     except Exception as e:
-        logging.warning("Article generation/logging failed for %s: %s", name, e)
-        # fallback to plain generator (should not raise normally)
-        try:
-            # fallback: try basic generator
-            from src.generators.article_generator import generate_article_markdown
+        print("RSS collection error:", e)
+    return rows, new_marks
 
-            md = generate_article_markdown(name, summary or "", activities)
-        except Exception:
-            logging.exception("Article generation completely failed for %s", name)
-            md = f"# {name}\n\n{summary or ''}"
 
+def _fetch_x_activities(p: dict) -> list:
+    rows = []
+    try:
+        from src.collectors.x_url_summarizer import summarize_urls
+
+        # all of this person's URLs are summarized concurrently by the
+        # shared LLM scheduler
+        summaries = summarize_urls(p.get("x_urls", []))
+        for url, s in summaries.items():
+            if not s:
+                print("X URL summarizer failed:", url)
+                continue
+            rows.append({
+                "title": "X post summary",
+                "content": s,
+                "published": "",
+                # the link is the activity's identity; with the URL alone the
+                # first summary would be kept forever, so a changed summary of
+                # the page counts as a new activity
+                "link": f"{url}#{content_hash(s)[:16]}",
+                "source_url": url,
+            })
+    except Exception as e:
+        print("X summarizer error:", e)
+    return rows
+
+
+def _render_item(item: dict):
+    """Render (markdown, html) for one article input, never raising."""
+    name, summary, activities = item["name"], item.get("summary") or "", item.get("activities") or []
+    try:
+        md = generate_article_markdown(name, summary, activities)
+    except Exception:
+        logging.exception("Article generation completely failed for %s", name)
+        md = f"# {name}\n\n{summary}"
     try:
         html = generate_article_html(md)
     except Exception:
         logging.exception("HTML conversion failed for %s; using escaped markdown as body", name)
         html = f"<html><body><pre>{md}</pre></body></html>"
+    return md, html
 
-    # store article
-    conn = repo.get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO articles (person_id, title, markdown, html) VALUES (?, ?, ?, ?)",
-        (person_id, f"Article: {name}", md, html),
-    )
-    conn.commit()
-    conn.close()
 
-    # write to site
-    Path("site").mkdir(exist_ok=True)
-    out_html = Path("site") / (slugify(name) + ".html")
-    out_html.write_text(html, encoding="utf-8")
-    print("Wrote:", out_html)
+def publish_article(item: dict, md: str, html: str, site_writer) -> bool:
+    """Store a rendered article and write its page.
+
+    Unchanged markdown is neither logged nor stored again, and an unchanged
+    page is not rewritten. Returns True if the article changed.
+    """
+    name, person_id = item["name"], item["person_id"]
+    md_hash = content_hash(md)
+    with repo.session() as db:
+        article_changed = db.get_latest_article_hash(person_id) != md_hash
+        if article_changed:
+            article_id = db.insert_article(person_id, f"Article: {name}", md, html, content_hash=md_hash)
+            db.insert_llm_log(person_id, "article_generation", None, "auto-article-template-v1", md, article_id=article_id)
+
+    # write to site (skipped when the page content is unchanged)
+    page = slugify(name) + ".html"
+    if site_writer.write_page(page, html):
+        print("Wrote:", Path("site") / page)
+    return article_changed
+
+
+def render_person(name: str, site_writer=None) -> bool:
+    """Render stage for one person, built from activities stored in SQLite."""
+    items = repo.load_article_inputs([name], limit=ARTICLE_ACTIVITY_LIMIT)
+    if not items:
+        return False
+    writer = site_writer or SiteWriter()
+    md, html = _render_item(items[0])
+    changed = publish_article(items[0], md, html, writer)
+    if site_writer is None:
+        writer.save()
+    return changed
+
+
+def process_person(p: dict, skip_network: bool = False, feed_cache=None, matcher=None, site_writer=None, wiki=None):
+    """Collect and render one person."""
+    collect_person(p, skip_network=skip_network, feed_cache=feed_cache, matcher=matcher, wiki=wiki)
+    render_person(p.get("name"), site_writer=site_writer)
+
+
+def _run_safe(fn, p: dict, leases=None, **kwargs) -> bool:
+    """Run a per-person stage, reporting (not raising) a per-person failure.
+
+    With `leases`, a person leased by another worker is skipped, and the
+    lease is renewed while the work runs.
+    """
+    if leases is None:
+        return _run_one(fn, p, **kwargs)
+    with leases.hold(p.get("name")) as claimed:
+        if not claimed:
+            print(f"Skipping {p.get('name')}: leased by another worker")
+            return True
+        return _run_one(fn, p, **kwargs)
 
-    # 5) Snapshot diff: compute a simple diff against last snapshot
+
+def _run_one(fn, p: dict, **kwargs) -> bool:
     try:
-        conn = repo.get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT diff FROM snapshots WHERE person_id = ? ORDER BY snapshot_date DESC LIMIT 1", (person_id,))
-        row = cur.fetchone()
-        previous_concat = row["diff"] if row else ""
-        current_concat = "\n".join(a.get("title", "") + "\n" + a.get("content", "") for a in activities)
-        diffl = compute_diff(previous_concat or "", current_concat or "")
-        if diffl:
-            cur.execute("INSERT INTO snapshots (person_id, snapshot_date, diff) VALUES (?, date('now'), ?)", (person_id, "\n".join(diffl)))
-            conn.commit()
-        conn.close()
+        with metrics.timer("person_seconds", fn=getattr(fn, "__name__", "person")):
+            fn(p, **kwargs)
+        metrics.inc("persons_total", result="ok")
+        return True
     except Exception as e:
-        print("Snapshot step failed:", e)
+        metrics.inc("persons_total", result="failed")
+        print(f"Processing failed for {p.get('name')}:", e)
+        logging.debug("%s traceback", getattr(fn, "__name__", fn), exc_info=True)
+        return False
+
+
+def _run_pool(fn, persons, workers: int, **kwargs) -> int:
+    """Apply `fn` to every person (thread pool when workers > 1); returns failures.
+
+    `persons` may be any iterable; at most 2 * workers persons are in flight.
+    """
+    if workers <= 1:
+        return sum(0 if _run_safe(fn, p, **kwargs) else 1 for p in persons)
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="person") as pool:
+        pending = set()
+        for p in persons:
+            pending.add(pool.submit(_run_safe, fn, p, **kwargs))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                failures += sum(1 for fut in done if not fut.result())
+        failures += sum(1 for fut in as_completed(pending) if not fut.result())
+    return failures
+
+
+def _wiki_titles(persons) -> list:
+    return [p.get("wikipedia") or p.get("name") for p in persons]
+
+
+def _page_name(p: dict) -> str:
+    return slugify(p.get("name") or "") + ".html"
+
+
+def _collect_context(persons: Iterable[dict]) -> Tuple[dict, Set[str]]:
+    """Run-wide shared state, built in one streaming pass over the roster:
+    one FeedCache, one NameMatcher and batched Wikipedia lookups for
+    everyone, plus the page names to keep when pruning the site. Only names,
+    aliases and titles are kept, not the persons themselves."""
+    from src.collectors.feed_cache import FeedCache
+    from src.collectors.wikipedia_collector import WikipediaSummaries
+    from src.utils.name_matcher import NameMatcher
+
+    matcher, titles, pages = NameMatcher(), [], set()
+    for p in persons:
+        matcher.add(p.get("name") or "", p.get("aliases") or [])
+        titles.append(p.get("wikipedia") or p.get("name"))
+        pages.add(_page_name(p))
+    context = {"feed_cache": FeedCache(), "matcher": matcher.build(), "wiki": WikipediaSummaries(titles)}
+    return context, pages
+
+
+def _finish_site(writer, pages: Iterable[str], prune: bool = True) -> None:
+    if prune:
+        for page in writer.prune(pages):
+            print("Removed:", Path("site") / page)
+    writer.save()
+    print(f"Pages written: {writer.written}, unchanged: {writer.skipped}")
+
 
+def run_persons(persons: Iterable[dict], skip_network: bool = False, workers: int = 1, site_writer=None, leases=None) -> int:
+    """Collect and render every person, using a thread pool when workers > 1.
 
-def main():
+    A single FeedCache and NameMatcher are shared by the whole run so each feed
+    is fetched once and each entry is scanned for names once. Pages of persons
+    no longer in the roster are pruned and the site manifest is saved at the end.
+    Returns the number of persons that failed. With `leases` (see
+    src/db/leases.py) persons being processed by another worker are skipped.
+
+    `persons` is iterated twice (shared state, then the work), so pass a
+    list or a Roster rather than a one-shot iterator.
+    """
+    writer = site_writer or SiteWriter()
+    context, pages = _collect_context(persons)
+    failures = _run_pool(
+        process_person, persons, workers, skip_network=skip_network, site_writer=writer, leases=leases, **context
+    )
+    _finish_site(writer, pages)
+    return failures
+
+
+def collect_persons(persons: Iterable[dict], skip_network: bool = False, workers: int = 1, leases=None) -> int:
+    """Collect stage only: fetch and store, no rendering. Returns failures.
+
+    Like run_persons, iterates `persons` twice.
+    """
+    context, _ = _collect_context(persons)
+    return _run_pool(collect_person, persons, workers, skip_network=skip_network, leases=leases, **context)
+
+
+def render_persons(persons: Iterable[dict], site_writer=None, processes: Optional[int] = None, prune: bool = True) -> int:
+    """Render stage only: rebuild every page from SQLite without network access.
+
+    Persons are streamed and rendered in batches of RENDER_BATCH (each
+    optionally on a process pool). Pass prune=False when `persons` is only
+    part of the roster. Returns the number of pages whose article changed.
+    """
+    writer = site_writer or SiteWriter()
+    pages, changed, batch = set(), 0, []
+    for p in persons:
+        pages.add(_page_name(p))
+        batch.append(p.get("name"))
+        if len(batch) >= RENDER_BATCH:
+            changed += _render_batch(batch, writer, processes)
+            batch = []
+    if batch:
+        changed += _render_batch(batch, writer, processes)
+    _finish_site(writer, pages, prune=prune)
+    return changed
+
+
+def _render_batch(names: List[str], writer, processes: Optional[int]) -> int:
+    from src.generators.article_generator import get_default_renderer
+
+    items = repo.load_article_inputs(names, limit=ARTICLE_ACTIVITY_LIMIT)
+    try:
+        with metrics.timer("stage_seconds", stage="render"):
+            rendered = get_default_renderer().render_many(items, processes=processes)
+    except Exception:
+        logging.exception("Batch rendering failed; rendering one by one")
+        rendered = [_render_item(item) for item in items]
+    changed = 0
+    for item, (md, html) in zip(items, rendered):
+        try:
+            with metrics.timer("stage_seconds", stage="publish"):
+                changed += publish_article(item, md, html, writer)
+        except Exception as e:
+            print(f"Rendering failed for {item['name']}:", e)
+    return changed
+
+
+def refresh_sources(tasks: list, skip_network: bool = False, workers: int = 1, matcher=None, feed_cache=None) -> dict:
+    """Daemon refresh batch: collect the due (person, source type) items.
+
+    Items are grouped per person so each person is stored in one transaction;
+    feeds shared by several persons are fetched once per batch (conditional
+    GET against the stored validators). Returns {(name, source type): changed}.
+    """
+    from src.collectors.feed_cache import FeedCache
+    from src.collectors.wikipedia_collector import WikipediaSummaries
+
+    groups = {}
+    for p, source in tasks:
+        groups.setdefault(p["name"], {"name": p["name"], "person": p, "sources": []})["sources"].append(source)
+    results = {}
+    wiki = WikipediaSummaries(_wiki_titles(p for p, source in tasks if source == "wikipedia"))
+
+    def collect_group(group, feed_cache):
+        _, changed = collect_sources(
+            group["person"], group["sources"], skip_network=skip_network,
+            feed_cache=feed_cache, matcher=matcher, wiki=wiki,
+        )
+        results.update({(group["name"], source): c for source, c in changed.items()})
+
+    _run_pool(collect_group, list(groups.values()), workers, feed_cache=feed_cache or FeedCache())
+    return results
+
+
+def run_daemon(
+    persons: Iterable[dict],
+    skip_network: bool = False,
+    workers: int = 1,
+    site_writer=None,
+    processes: Optional[int] = None,
+    max_cycles: Optional[int] = None,
+    index: bool = True,
+):
+    """Daemon mode: refresh sources on adaptive per-type intervals and
+    re-render only persons whose data changed (see src/daemon.py). With
+    `index`, the index pages are refreshed after each re-render.
+
+    `persons` must be re-iterable (normally a Roster): it is streamed once to
+    build the matcher and page list, once to schedule, and once per batch to
+    look up the due persons.
+    """
+    import signal
+
+    from src.daemon import RefreshDaemon
+    from src.utils.name_matcher import NameMatcher
+
+    writer = site_writer or SiteWriter()
+    matcher, pages = NameMatcher(), set()
+    for p in persons:
+        matcher.add(p.get("name") or "", p.get("aliases") or [])
+        pages.add(_page_name(p))
+    matcher.build()
+
+    def render(names):
+        render_persons(daemon.find(names).values(), site_writer=writer, processes=processes, prune=False)
+        if index:
+            generate_index()
+
+    daemon = RefreshDaemon(
+        persons,
+        refresh=lambda tasks: refresh_sources(tasks, skip_network=skip_network, workers=workers, matcher=matcher),
+        render=render,
+    )
+    _finish_site(writer, pages)
+    try:
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    except ValueError:
+        pass  # not the main thread
+    try:
+        daemon.run(max_cycles=max_cycles)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.save()
+        print("Daemon stopped:", daemon.stats)
+    return daemon
+
+
+def _bootstrap(max_requests: int = DEFAULT_MAX_REQUESTS) -> None:
     print("Bootstrapping DB and directories...")
     Path("data").mkdir(exist_ok=True)
     Path("site").mkdir(exist_ok=True)
     repo.init_db(schema_path="src/db/schema.sql")
+    http_client.configure(max_in_flight=max_requests, pool_maxsize=max(max_requests, 16))
+
+
+def main(
+    workers: int = 1,
+    max_requests: int = DEFAULT_MAX_REQUESTS,
+    stage: str = "all",
+    processes: Optional[int] = None,
+    keep_articles: int = repo.DEFAULT_KEEP_ARTICLES,
+    max_cycles: Optional[int] = None,
+    shard: Optional[str] = None,
+    lease_ttl: Optional[float] = None,
+    metrics_dir: Optional[str] = None,
+):
+    """Run one pipeline stage: collect, render, index, or all (collect + render + index).
+
+    ``compact`` is maintenance: prune old article versions and VACUUM the DB.
+    ``daemon`` keeps running and refreshes sources as they become due.
+
+    With ``shard="i/n"`` only that shard of the roster is processed, persons
+    are leased so concurrent workers never handle the same person, and the
+    shard keeps its own site manifest so it only prunes its own pages.
+
+    With ``metrics_dir`` stage timings and counters are collected (see
+    src/utils/metrics.py) and written there as JSON and Prometheus text.
+    """
+    if metrics_dir:
+        metrics.enable()
+    try:
+        with metrics.timer("run_seconds", stage=stage):
+            _run_stage(stage, workers, max_requests, processes, keep_articles, max_cycles, shard, lease_ttl)
+    finally:
+        if metrics_dir:
+            print("Metrics:", metrics.write_report(metrics_dir, extra={"stage": stage, "shard": shard}))
+            metrics.disable()
+
+
+def _run_stage(stage, workers, max_requests, processes, keep_articles, max_cycles, shard, lease_ttl) -> None:
+    shard = parse_shard(shard)
+    _bootstrap(max_requests)
+    if stage == "compact":
+        print("Compacted:", repo.compact(keep_articles=keep_articles))
+        return
+    if stage == "index":
+        generate_index()
+        print("Done")
+        return
 
-    persons = read_persons()
+    persons = Roster(shard)
     skip_network = bool(os.getenv("SKIP_NETWORK"))
-    for p in persons:
-        process_person(p, skip_network=skip_network)
+    writer, leases = SiteWriter(), None
+    if shard is not None:
+        from src.db.leases import DEFAULT_TTL, Leases
+
+        print(f"Shard {shard[0]}/{shard[1]}")
+        writer = SiteWriter(manifest_path=Path("data") / f"site_manifest.{shard[0]}-{shard[1]}.json")
+        leases = Leases(ttl=lease_ttl or DEFAULT_TTL)
+    if stage == "daemon":
+        run_daemon(
+            persons, skip_network=skip_network, workers=workers, site_writer=writer,
+            processes=processes, max_cycles=max_cycles, index=shard is None or shard[0] == 0,
+        )
+        return
+    if stage == "collect":
+        failures = collect_persons(persons, skip_network=skip_network, workers=workers, leases=leases)
+    elif stage == "render":
+        failures = 0
+        print(f"Articles changed: {render_persons(persons, site_writer=writer, processes=processes)}")
+    else:
+        failures = run_persons(persons, skip_network=skip_network, workers=workers, site_writer=writer, leases=leases)
+    if failures:
+        print(f"{failures} of {persons.count} persons failed")
+    if not skip_network and stage != "render":
+        from src.collectors.llm_cache import get_default_cache
+
+        print("LLM cache:", get_default_cache().stats())
+    if stage == "all" and (shard is None or shard[0] == 0):
+        generate_index()
 
     print("Done")
 
 
-import csv
-from jinja2 import Template
+def generate_index(site_writer=None) -> dict:
+    """Regenerate the paginated index pages and search index from the DB
+    (see src/generators/index_generator.py)."""
+    from src.generators import index_generator
+
+    with metrics.timer("stage_seconds", stage="index"):
+        stats = index_generator.generate_index(site_writer=site_writer)
+    print(f"Index: {stats['persons']} persons, {stats['written']} of {stats['files']} files written, {stats['removed']} removed")
+    return stats
 
-def generate_index():
-    with open("data/persons.csv", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        persons = list(reader)
 
-    template = Template("""
-    <html><body>
-    <h1>人物一覧</h1>
-    <ul>
-    {% for p in persons %}
-      <li><a href="{{p['person_id']}}.html">{{p['name']}}</a></li>
-    {% endfor %}
-    </ul>
-    </body></html>
-    """)
-    html = template.render(persons=persons)
+def _parse_args(argv=None):
+    import argparse
 
-    with open("site/index.html", "w", encoding="utf-8") as f:
-        f.write(html)
+    parser = argparse.ArgumentParser(description="Collect data and generate the Press Project site.")
+    parser.add_argument(
+        "stage",
+        nargs="?",
+        default="all",
+        choices=["all", "collect", "render", "index", "compact", "daemon"],
+        help="pipeline stage to run (default: all)",
+    )
+    parser.add_argument("--index-only", action="store_true", help="same as the index stage")
+    parser.add_argument("--processes", type=int, default=None, help="render stage: process pool size")
+    parser.add_argument(
+        "--shard",
+        default=os.getenv("PRESS_SHARD"),
+        help="process only shard i of n (\"i/n\", 0-based) of the roster, with per-person leases",
+    )
+    parser.add_argument("--lease-ttl", type=float, default=None, help="seconds before a crashed worker's lease expires")
+    parser.add_argument(
+        "--metrics-dir",
+        default=os.getenv("PRESS_METRICS_DIR"),
+        help="write per-run metrics (JSON + Prometheus text) to this directory",
+    )
+    parser.add_argument("--max-cycles", type=int, default=None, help="daemon stage: stop after N refresh batches")
+    parser.add_argument(
+        "--keep",
+        type=int,
+        default=repo.DEFAULT_KEEP_ARTICLES,
+        help="compact stage: article versions kept per person",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("PRESS_WORKERS", "1")),
+        help="number of persons processed concurrently (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=DEFAULT_MAX_REQUESTS,
+        help="cap on in-flight network requests across all workers",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    import sys
-    # allow generating only the index without running the full main flow
-    if "--index-only" in sys.argv:
-        generate_index()
-    else:
-        main()
-        generate_index()
+    args = _parse_args()
+    # --index-only is kept as an alias of the index stage
+    main(
+        workers=args.workers, max_requests=args.max_requests, stage="index" if args.index_only else args.stage,
+        processes=args.processes, keep_articles=args.keep, max_cycles=args.max_cycles, shard=args.shard, lease_ttl=args.lease_ttl,
+        metrics_dir=args.metrics_dir,
+    )
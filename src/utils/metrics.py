@@ -0,0 +1,222 @@
+"""Pipeline metrics: counters, timers and latency histograms.
+
+Metrics are off by default. While disabled, ``timer`` returns a shared no-op
+context manager, ``inc``/``observe`` return after one flag check, and classes
+or modules registered with ``instrument`` are left untouched; ``enable()``
+wraps their public methods with timers and ``disable()`` restores them, so a
+disabled run executes the original code.
+
+``write_report(dir)`` writes a per-run JSON report (run-<timestamp>.json)
+and a Prometheus text-format file (press.prom, e.g. for node_exporter's
+textfile collector).
+"""
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import functools
+import json
+import threading
+import time
+from pathlib import Path
+
+from src.utils.fileio import write_atomic
+
+# Latency buckets in seconds (upper bounds, Prometheus style).
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROM_FILE = "press.prom"
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_NULL = nullcontext()
+_enabled = False
+_lock = threading.Lock()
+_counters: Dict[Key, float] = {}
+_histograms: Dict[Key, Dict[str, Any]] = {}
+_started_at: Optional[float] = None
+# (owner, attribute names or None for all public callables, metric name, label)
+_instrumented: List[Tuple[Any, Optional[Iterable[str]], str, str]] = []
+_originals: List[Tuple[Any, str, Any]] = []
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = {"count": 0, "sum": 0.0, "min": seconds, "max": seconds, "buckets": [0] * len(BUCKETS)}
+        h["count"] += 1
+        h["sum"] += seconds
+        h["min"] = min(h["min"], seconds)
+        h["max"] = max(h["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h["buckets"][i] += 1
+                break
+
+
+@contextmanager
+def _timing(name: str, labels: Dict[str, Any]):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timer(name: str, **labels):
+    """Context manager recording the block's duration in histogram `name`."""
+    if not _enabled:
+        return _NULL
+    return _timing(name, labels)
+
+
+def _wrap(fn, metric: str, label: str, op: str):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observe(metric, time.perf_counter() - start, **{label: op})
+
+    return wrapper
+
+
+def instrument(owner, names: Optional[Iterable[str]] = None, metric: str = "call_seconds", label: str = "op"):
+    """Register a class or module whose public functions are timed while
+    metrics are enabled (as histogram `metric`, labelled by function name).
+    Usable as a class decorator."""
+    _instrumented.append((owner, list(names) if names is not None else None, metric, label))
+    if _enabled:
+        _patch(owner, names, metric, label)
+    return owner
+
+
+def _patch(owner, names, metric, label) -> None:
+    if names is None:
+        names = [
+            n for n, v in vars(owner).items()
+            if not n.startswith("_") and callable(v) and not isinstance(v, type)
+            and getattr(v, "__module__", None) == getattr(owner, "__module__", getattr(owner, "__name__", None))
+        ]
+    for n in names:
+        fn = getattr(owner, n)
+        _originals.append((owner, n, vars(owner)[n]))
+        setattr(owner, n, _wrap(fn, metric, label, n))
+
+
+def enable() -> None:
+    """Start collecting (clears earlier values) and instrument registered code."""
+    global _enabled, _started_at
+    with _lock:
+        if _enabled:
+            return
+        _counters.clear()
+        _histograms.clear()
+        _started_at = time.time()
+        _enabled = True
+    for owner, names, metric, label in _instrumented:
+        _patch(owner, names, metric, label)
+
+
+def disable() -> None:
+    global _enabled
+    with _lock:
+        _enabled = False
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Current values as plain data (the JSON report body)."""
+    with _lock:
+        counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(_counters.items())]
+        histograms = []
+        for (n, l), h in sorted(_histograms.items()):
+            histograms.append({
+                "name": n, "labels": dict(l), "count": h["count"], "sum": round(h["sum"], 6),
+                "mean": round(h["sum"] / h["count"], 6), "min": round(h["min"], 6), "max": round(h["max"], 6),
+                "p50": _quantile(h, 0.5), "p95": _quantile(h, 0.95),
+            })
+    return {"started_at": _started_at, "finished_at": time.time(), "counters": counters, "histograms": histograms}
+
+
+def _quantile(h: Dict[str, Any], q: float) -> float:
+    """Bucket upper bound containing the q-quantile (capped at the observed max)."""
+    target = q * h["count"]
+    seen = 0
+    for bound, n in zip(BUCKETS, h["buckets"]):
+        seen += n
+        if seen >= target:
+            return min(bound, round(h["max"], 6))
+    return round(h["max"], 6)
+
+
+def _prom_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def prometheus_text(prefix: str = "press_") -> str:
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, dict(v, buckets=list(v["buckets"]))) for k, v in _histograms.items())
+    typed = set()
+    for (name, labels), value in counters:
+        metric = prefix + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_prom_labels(dict(labels))} {value}")
+    for (name, labels), h in histograms:
+        metric = prefix + name
+        labels = dict(labels)
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h["buckets"]):
+            cumulative += n
+            lines.append(f"{metric}_bucket{_prom_labels(labels, ('le', repr(bound)))} {cumulative}")
+        lines.append(f"{metric}_bucket{_prom_labels(labels, ('le', '+Inf'))} {h['count']}")
+        lines.append(f"{metric}_sum{_prom_labels(labels)} {h['sum']}")
+        lines.append(f"{metric}_count{_prom_labels(labels)} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(directory, extra: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    """Write run-<timestamp>.json and press.prom to `directory`. Returns the JSON path."""
+    if not _enabled:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    report = snapshot()
+    if extra:
+        report.update(extra)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(report["started_at"] or time.time()))
+    path = directory / f"run-{stamp}.json"
+    write_atomic(path, json.dumps(report, ensure_ascii=False, indent=1))
+    write_atomic(directory / PROM_FILE, prometheus_text())
+    return path
@@ -0,0 +1,127 @@
+"""Multi-person name matcher built on an Aho-Corasick automaton.
+
+The matcher is built once per run from every person's name and aliases. One
+linear scan over an entry's normalized text returns every person mentioned, so
+relevance checks no longer cost one substring search per person per entry.
+
+Normalization (applied to both names and text):
+- NFKC, which folds full-width/half-width forms (including half-width kana)
+- Latin diacritics stripped ("Shinzō" -> "shinzo"), case folded
+- katakana folded to hiragana, whitespace collapsed to single spaces
+Names written in Japanese script also match with the space removed
+("安倍 晋三" matches "安倍晋三").
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_WS_RE = re.compile(r"\s+")
+
+
+def _is_latin_word_char(c: str) -> bool:
+    return c.isascii() and c.isalnum()
+
+
+def _has_japanese(text: str) -> bool:
+    return any(
+        "\u3040" <= c <= "\u30ff" or "\u3400" <= c <= "\u9fff" or "\uf900" <= c <= "\ufaff"
+        for c in text
+    )
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for name matching (see module docstring)."""
+    if not text:
+        return ""
+    t = unicodedata.normalize("NFKC", text)
+    out = []
+    for c in unicodedata.normalize("NFD", t):
+        # drop combining marks on Latin letters only; Japanese voicing marks stay
+        if unicodedata.combining(c) and out and out[-1] < "\u0250":
+            continue
+        out.append(c)
+    t = unicodedata.normalize("NFC", "".join(out)).casefold()
+    t = "".join(chr(ord(c) - 0x60) if "\u30a1" <= c <= "\u30f6" else c for c in t)
+    return _WS_RE.sub(" ", t).strip()
+
+
+class NameMatcher:
+    def __init__(self, persons: Optional[Iterable[dict]] = None):
+        self._patterns: Dict[str, Set[str]] = {}
+        self._goto: List[Dict[str, int]] = []
+        self._fail: List[int] = []
+        self._out: List[List[Tuple[str, str]]] = []
+        self._built = False
+        for p in persons or []:
+            self.add(p.get("name") or "", p.get("aliases") or [])
+
+    def add(self, name: str, aliases: Iterable[str] = ()) -> None:
+        """Register `name` (plus aliases) as patterns resolving to `name`."""
+        if not name:
+            return
+        for variant in [name, *aliases]:
+            key = normalize_text(variant)
+            if not key:
+                continue
+            self._patterns.setdefault(key, set()).add(name)
+            if _has_japanese(key) and " " in key:
+                self._patterns.setdefault(key.replace(" ", ""), set()).add(name)
+        self._built = False
+
+    def build(self) -> "NameMatcher":
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[str, str]]] = [[]]
+        for pattern, names in self._patterns.items():
+            node = 0
+            for c in pattern:
+                nxt = goto[node].get(c)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][c] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].extend((pattern, n) for n in names)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for c, nxt in goto[node].items():
+                f = fail[node]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(c, 0) if goto[f].get(c) != nxt else 0
+                out[nxt].extend(out[fail[nxt]])
+                queue.append(nxt)
+
+        self._goto, self._fail, self._out = goto, fail, out
+        self._built = True
+        return self
+
+    def find(self, text: str) -> Set[str]:
+        """Return the names of every person mentioned in `text`."""
+        if not self._built:
+            self.build()
+        t = normalize_text(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        node = 0
+        for i, c in enumerate(t):
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            for pattern, name in out[node]:
+                if name in found:
+                    continue
+                start = i - len(pattern) + 1
+                # Latin names must not match inside a longer word ("Abe" in "Abel")
+                if _is_latin_word_char(pattern[0]) and start > 0 and _is_latin_word_char(t[start - 1]):
+                    continue
+                if _is_latin_word_char(pattern[-1]) and i + 1 < len(t) and _is_latin_word_char(t[i + 1]):
+                    continue
+                found.add(name)
+        return found
+
+    def match_entry(self, entry: dict) -> Set[str]:
+        """Return persons mentioned in a feed entry's title or summary."""
+        return self.find((entry.get("title") or "") + " " + (entry.get("summary") or ""))
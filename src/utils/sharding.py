@@ -0,0 +1,32 @@
+"""Deterministic sharding of the person roster.
+
+A person belongs to shard ``sha1(name) mod n``, so every worker started with
+``--shard i/n`` agrees on the split without coordination, and a person stays
+in the same shard as the roster grows.
+"""
+import hashlib
+from typing import Optional, Tuple
+
+Shard = Tuple[int, int]
+
+
+def parse_shard(spec: Optional[str]) -> Optional[Shard]:
+    """Parse "i/n" (0 <= i < n) into (i, n); empty means no sharding."""
+    if not spec:
+        return None
+    try:
+        index, count = (int(x) for x in spec.split("/", 1))
+    except ValueError:
+        raise ValueError(f"shard must look like i/n, got {spec!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"shard index must be in 0..{count - 1}, got {spec!r}")
+    return index, count
+
+
+def shard_of(name: str, count: int) -> int:
+    digest = hashlib.sha1(name.strip().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def in_shard(name: str, shard: Optional[Shard]) -> bool:
+    return shard is None or shard_of(name, shard[1]) == shard[0]
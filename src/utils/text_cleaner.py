@@ -1,10 +1,277 @@
-"""Small utilities to clean HTML/text pulled from feeds/pages."""
+"""Small utilities to clean HTML/text pulled from feeds/pages.
+
+``clean_text`` is the ingest normalization applied to feed entries before
+they are matched, stored, indexed or sent to the LLM: markup is stripped in
+one linear scan (entities unescaped, script/style dropped, block tags as
+breaks; the old ``<script.*?>.*?</script>`` regex backtracked badly on large
+inputs), then NFKC, whitespace collapsing and a length cap.
+``IngestNormalizer`` applies it to batches of entries with an LRU cache keyed
+by a hash of the raw text, so a feed shared by many persons, or re-read from
+the feed cache, is only cleaned once.
+"""
+import hashlib
+import html
 import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils import metrics
+
+# Longest stored feed summary, in characters (after cleaning).
+MAX_TEXT_CHARS = 2000
+MAX_TITLE_CHARS = 300
+DEFAULT_CACHE_SIZE = 4096
+_WS_RE = re.compile(r"\s+")
+_INLINE_WS_RE = re.compile(r"[^\S\n]+")
+_BLOCK_TAGS = frozenset(
+    "address article aside blockquote br dd div dl dt figcaption figure footer h1 h2 h3 h4 h5 h6 "
+    "header hr li main nav ol p pre section table td th tr ul".split()
+)
+
+_SKIP_TAGS = frozenset(["script", "style", "noscript", "template"])
+# A start or end tag; quoted attribute values may contain ">". The branches
+# start with distinct characters, so a failed match cannot backtrack
+# exponentially, and a failed match ends the scan (see _iter_text).
+_TAG_RE = re.compile(r"""<(/?)([a-zA-Z][a-zA-Z0-9:-]*)[^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*>""")
+_SKIP_END_RE = {tag: re.compile("</" + tag, re.I) for tag in _SKIP_TAGS}
+
+
+def _iter_text(html: str) -> Iterable[str]:
+    """Text pieces of `html` in one left-to-right pass ("\n" for block tags).
+
+    Every step advances past what it examined, so the scan is linear in the
+    input even for unclosed tags or comments, which drop the rest of the text.
+    """
+    pos, n = 0, len(html)
+    while pos < n:
+        lt = html.find("<", pos)
+        if lt < 0:
+            yield html[pos:]
+            return
+        if lt > pos:
+            yield html[pos:lt]
+        nxt = html[lt + 1 : lt + 2]
+        if html.startswith("<!--", lt):
+            end = html.find("-->", lt + 4)
+            if end < 0:
+                return
+            pos = end + 3
+        elif nxt in ("!", "?"):
+            end = html.find(">", lt)
+            if end < 0:
+                return
+            pos = end + 1
+        elif nxt.isascii() and (nxt.isalpha() or nxt == "/"):
+            m = _TAG_RE.match(html, lt)
+            if m is None:
+                return
+            pos = m.end()
+            tag = m.group(2).lower()
+            if tag in _SKIP_TAGS and not m.group(1):
+                end = _SKIP_END_RE[tag].search(html, pos)
+                close = html.find(">", end.end()) if end else -1
+                if close < 0:
+                    return
+                pos = close + 1
+            elif tag in _BLOCK_TAGS:
+                yield "\n"
+        else:
+            # a bare "<" (e.g. "5 < 6") is text
+            yield "<"
+            pos = lt + 1
+
+
+def strip_html(text: str, max_chars: Optional[int] = None) -> str:
+    """Visible text of an HTML fragment, entities unescaped (plain text is returned as is).
+
+    Script/style content and comments are dropped, block-level tags become
+    line breaks and inline tags are removed. With `max_chars`, the scan stops
+    once that much non-blank text was found.
+    """
+    if "<" not in text and "&" not in text:
+        return text
+    parts, size = [], 0
+    for piece in _iter_text(text):
+        parts.append(piece)
+        if max_chars is not None:
+            size += len(piece.strip())
+            if size >= max_chars:
+                break
+    return html.unescape("".join(parts))
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[: max_chars - 1]
+    space = cut.rfind(" ", max_chars * 4 // 5)
+    return (cut[:space] if space > 0 else cut).rstrip() + "…"
+
+
+def clean_text(text: Optional[str], max_chars: Optional[int] = MAX_TEXT_CHARS, nfkc: bool = True, single_line: bool = True) -> str:
+    """Ingest normalization: strip markup, unescape, NFKC, collapse whitespace, cap length.
+
+    With single_line=False, paragraph breaks are kept as newlines.
+    """
+    if not text:
+        return ""
+    t = strip_html(text, max_chars)
+    if nfkc:
+        t = unicodedata.normalize("NFKC", t)
+    if single_line:
+        t = _WS_RE.sub(" ", t).strip()
+    else:
+        t = "\n".join(ln for ln in (_INLINE_WS_RE.sub(" ", ln).strip() for ln in t.splitlines()) if ln)
+    return _truncate(t, max_chars) if max_chars else t
 
 
 def clean_html_to_text(html: str) -> str:
     """Very small HTML to text cleaner for feed/content."""
-    text = re.sub(r"<script.*?>.*?</script>", "", html, flags=re.S | re.I)
-    text = re.sub(r"<[^>]+>", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return clean_text(html, max_chars=None, nfkc=False)
+
+
+class IngestNormalizer:
+    """Batch text normalizer for feed entries with an LRU cache.
+
+    Summaries get the full clean_text treatment. Titles are only stripped of
+    markup and extra whitespace (no NFKC), since they are part of an
+    activity's identity hash; titles that had markup, entities or line
+    breaks still hash differently from their raw form.
+
+    Cleaning is not idempotent (unescaping "&amp;lt;" twice loses text), so
+    normalized entries are marked with ``"normalized": True`` and passed
+    through unchanged by later calls.
+    """
+
+    def __init__(self, max_chars: int = MAX_TEXT_CHARS, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.max_chars = max_chars
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "chars_in": 0, "chars_out": 0}
+
+    def _clean(self, text: Optional[str], title: bool) -> str:
+        if not text:
+            return ""
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16, person=b"title" if title else b"").digest()
+        with self._lock:
+            cleaned = self._cache.get(key)
+            if cleaned is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+        if cleaned is not None:
+            metrics.inc("ingest_cache_total", result="hit")
+            return cleaned
+        if title:
+            cleaned = clean_text(text, max_chars=MAX_TITLE_CHARS, nfkc=False)
+        else:
+            cleaned = clean_text(text, max_chars=self.max_chars)
+        with self._lock:
+            self._cache[key] = cleaned
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.stats["misses"] += 1
+            self.stats["chars_in"] += len(text)
+            self.stats["chars_out"] += len(cleaned)
+        metrics.inc("ingest_cache_total", result="miss")
+        metrics.inc("ingest_chars_total", len(text), kind="in")
+        metrics.inc("ingest_chars_total", len(cleaned), kind="out")
+        return cleaned
+
+    def clean_many(self, texts: Iterable[Optional[str]]) -> List[str]:
+        return [self._clean(t, False) for t in texts]
+
+    def normalize_entries(self, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of feed entries with ``title`` and ``summary`` normalized.
+
+        Entries already marked as normalized are copied as they are.
+        """
+        out = []
+        for e in entries:
+            e = dict(e)
+            if not e.get("normalized"):
+                if e.get("title"):
+                    e["title"] = self._clean(e["title"], True)
+                e["summary"] = self._clean(e.get("summary"), False)
+                e["normalized"] = True
+            out.append(e)
+        return out
+
+
+_default_normalizer: Optional[IngestNormalizer] = None
+_default_lock = threading.Lock()
+
+
+def get_default_normalizer() -> IngestNormalizer:
+    global _default_normalizer
+    with _default_lock:
+        if _default_normalizer is None:
+            _default_normalizer = IngestNormalizer()
+        return _default_normalizer
+
+
+class _StreamingTextExtractor(HTMLParser):
+    """Collect visible text incrementally, skipping script/style/noscript.
+
+    Text nodes are separated by newlines at tag boundaries, matching
+    BeautifulSoup's ``get_text(separator="\\n")`` even when a node is split
+    across fed chunks. ``done`` turns True once ``max_chars`` of
+    non-blank text has been collected, so callers can stop feeding input.
+    """
+
+    SKIP_TAGS = frozenset(["script", "style", "noscript"])
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.size = 0
+        self.done = False
+        self._skip_depth = 0
+
+    def _break(self):
+        if self.parts and self.parts[-1] != "\n":
+            self.parts.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        self._break()
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._break()
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth or self.done:
+            return
+        self.parts.append(data)
+        self.size += len(data.strip())
+        if self.size >= self.max_chars:
+            self.done = True
+
+
+def join_text_lines(text: str, max_chars: int) -> str:
+    """Drop blank lines, strip the rest and join them with blank lines."""
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    return "\n\n".join(lines)[:max_chars]
+
+
+def extract_text_streaming(chunks: Iterable[str], max_chars: int = 30000) -> str:
+    """Extract visible text from HTML delivered in chunks.
+
+    Parsing stops as soon as enough text has been collected, so the rest of a
+    large document is never read.
+    """
+    parser = _StreamingTextExtractor(max_chars)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return join_text_lines("".join(parser.parts), max_chars)
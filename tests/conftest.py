@@ -0,0 +1,52 @@
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from src.db import repository as repo
+
+SCHEMA = str(Path(__file__).resolve().parents[1] / "src" / "db" / "schema.sql")
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Point the repository at a fresh database under tmp_path and chdir there."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(repo, "DB_PATH", tmp_path / "data" / "database.sqlite3")
+    repo.init_db(schema_path=SCHEMA)
+    return tmp_path
+
+
+@pytest.fixture
+def http_server():
+    """Start local HTTP servers: ``http_server(handler_class)`` returns the
+    base URL of a server running `handler_class`; all are stopped afterwards."""
+    servers = []
+
+    def start(handler) -> str:
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+        return f"http://127.0.0.1:{srv.server_address[1]}"
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+class _StaticFeeds:
+    """FeedCache stand-in serving the same entries for every feed URL."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get_matched_entries(self, url, matcher):
+        return [(e, matcher.match_entry(e)) for e in self.entries]
+
+
+@pytest.fixture
+def static_feeds():
+    """``static_feeds(entries)`` returns a FeedCache stand-in for `entries`."""
+    return _StaticFeeds
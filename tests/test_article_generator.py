@@ -0,0 +1,34 @@
+from src.generators.article_generator import ArticleRenderer, generate_article_html, generate_article_markdown
+
+
+def _items(n):
+    return [
+        {"name": f"P{i}", "summary": "bio", "activities": [{"title": "t", "content": f"c{i}", "published": "d"}]}
+        for i in range(n)
+    ]
+
+
+def test_renderer_matches_module_functions():
+    item = _items(1)[0]
+    md, html = ArticleRenderer().render(item["name"], item["summary"], item["activities"])
+    assert md == generate_article_markdown(item["name"], item["summary"], item["activities"])
+    assert html == generate_article_html(md)
+
+
+def test_reused_converter_does_not_leak_state():
+    renderer = ArticleRenderer()
+    # reference definitions are converter state that reset() must clear
+    first = renderer.render_html("# Intro\n\nSee [docs][ref].\n\n[ref]: https://example.com/docs")
+    assert 'href="https://example.com/docs"' in first
+    later = "# A\n\nUnresolved [docs][ref]."
+    once, twice = renderer.render_html(later), renderer.render_html(later)
+    assert once == twice == ArticleRenderer().render_html(later)
+    assert "example.com" not in once
+
+
+def test_render_many_keeps_order_with_process_pool():
+    items = _items(40)
+    serial = ArticleRenderer().render_many(items)
+    pooled = ArticleRenderer().render_many(items, processes=2, chunksize=8)
+    assert pooled == serial
+    assert "c39" in serial[-1][0]
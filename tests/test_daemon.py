@@ -0,0 +1,87 @@
+from src import main
+from src.daemon import RefreshDaemon
+from src.db import repository as repo
+
+INTERVALS = {"wikipedia": (100, 50, 1000), "rss": (10, 2, 100)}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_intervals_adapt_and_only_changed_persons_render():
+    persons = [{"name": "Busy", "rss": ["feed"]}, {"name": "Quiet", "rss": ["feed"]}]
+    batches, rendered = [], []
+
+    def refresh(tasks):
+        batches.append(sorted((p["name"], s) for p, s in tasks))
+        return {(p["name"], s): p["name"] == "Busy" and s == "rss" for p, s in tasks}
+
+    clock = _Clock()
+    d = RefreshDaemon(persons, refresh, rendered.append, intervals=INTERVALS, jitter=0, persist=False, clock=clock)
+    assert d.run_once() == 4
+    assert rendered == [["Busy"]]
+    assert (d.interval("Busy", "rss"), d.interval("Quiet", "rss"), d.interval("Busy", "wikipedia")) == (5, 15, 150)
+
+    # nothing is refetched before it is due
+    assert d.run_once(now=4) == 0
+    clock.now = 5
+    assert d.run_once() == 1 and batches[-1] == [("Busy", "rss")]
+    for _ in range(5):
+        clock.now = d.next_due()
+        d.run_once()
+    assert d.interval("Busy", "rss") == 2
+    assert d.interval("Quiet", "rss") > 15
+
+
+def test_failed_refresh_keeps_interval():
+    d = RefreshDaemon([{"name": "X"}], lambda tasks: {}, lambda names: None, intervals=INTERVALS, jitter=0, persist=False, clock=lambda: 0)
+    d.run_once()
+    assert d.interval("X", "wikipedia") == 100 and d.stats["failed"] == 1
+
+
+def test_persons_dropped_from_roster_are_unscheduled():
+    persons = [{"name": "Stays"}, {"name": "Leaves"}]
+    d = RefreshDaemon(persons, lambda tasks: {(p["name"], s): False for p, s in tasks}, lambda names: None,
+                      intervals=INTERVALS, jitter=0, persist=False, clock=lambda: 0)
+    del persons[1]
+    assert d.run_once() == 2
+    assert d.interval("Stays", "wikipedia") == 150 and d.stats["failed"] == 0
+    assert d.run_once(now=1000) == 1
+
+
+def test_run_daemon_streams_the_roster(tmp_db):
+    (tmp_db / "data" / "persons.txt").write_text("Ann Roster\nBob Roster\n", encoding="utf-8")
+    d = main.run_daemon(main.Roster(), skip_network=True, max_cycles=1, index=False)
+    assert d.stats["rendered"] == 2
+    assert sorted(p.name for p in (tmp_db / "site").glob("*.html")) == ["Ann_Roster.html", "Bob_Roster.html"]
+
+
+def test_daemon_with_pipeline_persists_schedule(tmp_db, monkeypatch, static_feeds):
+    monkeypatch.setattr(
+        "src.collectors.wikipedia_collector.collect_wikipedia_batch", lambda titles, **kw: {t: "bio" for t in titles}
+    )
+    feeds = static_feeds([{"title": "Taro Yamada speaks", "link": "https://n.example/1", "published_ts": 1000}])
+    persons = [{"name": "Taro Yamada", "rss": ["https://n.example/feed"]}, {"name": "Hanako Sato"}]
+    rendered = []
+
+    def refresh(tasks):
+        return main.refresh_sources(tasks, feed_cache=feeds)
+
+    d = RefreshDaemon(persons, refresh, rendered.append, intervals=INTERVALS, jitter=0, clock=lambda: 0)
+    d.run_once()
+    assert rendered == [["Hanako Sato", "Taro Yamada"]]
+    assert d.interval("Taro Yamada", "rss") == 5
+
+    # second pass: feed unchanged, so the person is not re-rendered
+    d.run_once(now=1000)
+    assert rendered == [["Hanako Sato", "Taro Yamada"]]
+    assert repo.get_conn().execute("SELECT COUNT(*) FROM activities").fetchone()[0] == 1
+
+    restarted = RefreshDaemon(persons, refresh, rendered.append, intervals=INTERVALS, clock=lambda: 1000)
+    assert restarted.interval("Taro Yamada", "rss") == 7.5
+    assert restarted.interval("Hanako Sato", "wikipedia") == 75
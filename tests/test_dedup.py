@@ -0,0 +1,78 @@
+from src.db import dedup
+from src.db import repository as repo
+
+TITLE = "Prime Minister announces new economic package worth 17 trillion yen"
+BODY = (
+    "The prime minister on Thursday unveiled an economic package aimed at easing the burden of rising prices "
+    "on households, including tax cuts and payouts to low-income families."
+)
+
+
+def _activity(pid, title, content, link):
+    return {"person_id": pid, "title": title, "content": content, "link": link}
+
+
+def test_signature_similarity():
+    a = dedup.signature(TITLE, BODY)
+    assert dedup.similarity(a, dedup.signature(TITLE + " - News Site", BODY + " Read more.")) >= dedup.THRESHOLD
+    assert dedup.similarity(a, dedup.signature("Governor wins third term", "Voters backed her record on child care.")) < 0.3
+    assert dedup.signature("Short", "") is None
+    assert len(dedup.band_keys(a)) == dedup.BANDS
+
+
+def test_near_duplicates_collapse_in_recent_activities(tmp_db):
+    with repo.session() as s:
+        pid = s.upsert_person("Prime Minister")
+        other = s.upsert_person("Finance Minister")
+        s.insert_activities([
+            _activity(pid, TITLE, BODY, "https://a.example/1"),
+            _activity(pid, "Unrelated speech on education reform", "Schools will get more teachers next year.", "https://a.example/2"),
+            # the same story from another feed, in the same batch and in a later one
+            _activity(pid, TITLE + " - Wire", BODY + " (Wire)", "https://b.example/9"),
+        ])
+        s.insert_activities([_activity(other, "PM announces new economic package worth 17 trillion yen", BODY, "https://c.example/3")])
+        assert s.insert_activity(pid, "Economic package: " + TITLE, BODY, link="https://d.example/4") > 0
+
+    titles = [a["title"] for a in repo.list_recent_activities(pid)]
+    assert sorted(titles) == sorted([TITLE, "Unrelated speech on education reform"])
+    # clusters span persons, but each person keeps its own representative
+    assert [a["title"] for a in repo.list_recent_activities(other)] == ["PM announces new economic package worth 17 trillion yen"]
+
+    conn = repo.get_conn()
+    clusters = {r[0] for r in conn.execute("SELECT COALESCE(cluster_id, id) FROM activities WHERE title LIKE '%package%'")}
+    assert clusters == {1}
+    conn.close()
+
+
+def test_compact_backfills_unfingerprinted_rows(tmp_db):
+    with repo.session() as s:
+        pid = s.upsert_person("Legacy")
+        s.insert_activities([_activity(pid, TITLE, BODY, "l1"), _activity(pid, TITLE + "!", BODY, "l2")])
+        s.conn.execute("UPDATE activities SET minhash = NULL, cluster_id = NULL")
+        s.conn.execute("DELETE FROM activity_bands")
+    assert len(repo.list_recent_activities(pid)) == 2
+    assert repo.compact(vacuum=False)["activities_clustered"] == 2
+    assert len(repo.list_recent_activities(pid)) == 1
+    assert repo.compact(vacuum=False)["activities_clustered"] == 0
+
+
+def test_hot_band_returns_newest_candidates(tmp_db, monkeypatch):
+    monkeypatch.setattr(dedup, "MAX_CANDIDATES", 2)
+    with repo.session() as s:
+        pid = s.upsert_person("Prime Minister")
+        s.insert_activities([_activity(pid, TITLE, BODY, f"https://a.example/{i}") for i in range(5)])
+        keys = dedup.band_keys(dedup.signature(TITLE, BODY))
+        assert sorted(dedup._candidates(s.conn, 0, keys)) == [4, 5]
+
+
+def test_lookups_use_indexes(tmp_db):
+    conn = repo.get_conn()
+    plans = [
+        " ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        for sql, params in (
+            ("SELECT activity_id FROM activity_bands WHERE band = ? ORDER BY activity_id DESC LIMIT 10", (1,)),
+            ("SELECT id FROM activities WHERE minhash IS NULL AND id > ? ORDER BY id", (0,)),
+        )
+    ]
+    conn.close()
+    assert all("SCAN" not in p and "TEMP B-TREE" not in p for p in plans), plans
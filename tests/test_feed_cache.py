@@ -0,0 +1,76 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.collectors.feed_cache import FeedCache
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>News</title>
+<item><title>Abe visits Osaka</title><link>https://news.example/1</link>
+<pubDate>Mon, 06 Sep 2021 10:00:00 GMT</pubDate><description>Shinzo Abe spoke.</description></item>
+<item><title>Escaping &amp;lt;b&amp;gt; in titles</title><link>https://news.example/2</link>
+<description>AT&amp;amp;T &amp;lt;i&amp;gt;</description></item>
+</channel></rss>"""
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    hits = 0
+    full = 0
+    fail = False
+
+    def do_GET(self):
+        type(self).hits += 1
+        if self.fail:
+            self.send_response(503)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        type(self).full += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(RSS)))
+        self.end_headers()
+        self.wfile.write(RSS)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feed_url(http_server):
+    _FeedHandler.hits = _FeedHandler.full = 0
+    _FeedHandler.fail = False
+    return http_server(_FeedHandler) + "/feed"
+
+
+def test_feed_fetched_once_per_run_and_revalidated(tmp_db, feed_url):
+    cache = FeedCache()
+    for _ in range(5):
+        entries = cache.get_entries(feed_url)
+    assert _FeedHandler.hits == 1
+    assert entries[0]["title"] == "Abe visits Osaka"
+    assert cache.stats == {"fetched": 1, "not_modified": 0, "shared": 4}
+
+    # next run: conditional GET answered with 304, entries come from the DB
+    next_run = FeedCache()
+    assert next_run.get_entries(feed_url) == entries
+    assert _FeedHandler.hits == 2 and _FeedHandler.full == 1
+    assert next_run.stats["not_modified"] == 1
+
+    # stored entries are not cleaned again, so titles (and activity hashes) stay stable
+    assert FeedCache().get_entries(feed_url) == entries
+
+
+def test_error_response_keeps_stored_entries(tmp_db, feed_url):
+    entries = FeedCache().get_entries(feed_url)
+    _FeedHandler.fail = True
+    assert FeedCache().get_entries(feed_url) == []
+    _FeedHandler.fail = False
+    # the 503 did not overwrite the entries stored under the still-valid ETag
+    assert FeedCache().get_entries(feed_url) == entries
+    assert _FeedHandler.full == 1
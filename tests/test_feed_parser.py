@@ -0,0 +1,102 @@
+from email.utils import formatdate
+
+from src.collectors import feed_parser
+from src.collectors.feed_parser import _iter_feedparser, iter_entries, parse_entries
+
+RSS = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>News</title>
+<item><title>Tom &amp; Jerry</title><link> https://news.example/1 </link>
+<pubDate>Mon, 06 Sep 2021 10:00:00 +0900</pubDate><description>Plain text.</description></item>
+<item><title><![CDATA[Second]]></title><guid>https://news.example/2</guid>
+<dc:date>2021-09-05T10:00:00Z</dc:date>
+<description><![CDATA[<p>Hi <script>bad()</script><a href="/rel">link</a></p>]]></description></item>
+<item><title>Third</title><link>https://news.example/3</link><content:encoded>Full body</content:encoded></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title>First</title><link rel="self" href="https://x.example/s"/><link href="https://x.example/a"/>
+<updated>2021-09-06T10:00:00Z</updated><content type="html">&lt;p&gt;body&lt;/p&gt;</content></entry>
+<entry><title>Second</title><link rel="alternate" type="text/html" href="https://x.example/b"/>
+<published>2021-09-05T10:00:00Z</published><summary>sum</summary></entry>
+</feed>"""
+
+RDF = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>c</title></channel>
+<item><title>One</title><link>https://r.example/1</link><description>d1</description>
+<dc:date>2021-09-06T10:00:00+09:00</dc:date></item>
+</rdf:RDF>"""
+
+
+def _feed(n, start=1700000000, step=-60):
+    items = "".join(
+        f"<item><title>Item {i}</title><link>https://n.example/{i}</link>"
+        f"<pubDate>{formatdate(start + i * step, usegmt=True)}</pubDate>"
+        f"<description>text {i}</description></item>"
+        for i in range(n)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'.encode()
+
+
+ENTITIES = ("AT&amp;T 5 &lt; 6", "Tom &amp; Jerry", "a &lt;b&gt; c", "&amp;amp;", "caf&#233;", "<![CDATA[AT&T 5 < 6]]>")
+
+ENTITY_RSS = (
+    '<?xml version="1.0"?><rss version="2.0"><channel>'
+    + "".join(f"<item><title>{v}</title><link>https://e.example/{i}</link><description>{v}</description></item>"
+              for i, v in enumerate(ENTITIES))
+    + "</channel></rss>"
+).encode()
+
+ENTITY_ATOM = (
+    '<feed xmlns="http://www.w3.org/2005/Atom">'
+    + "".join(f'<entry><title>{v}</title><link href="https://e.example/{i}"/><summary type="{t}">{v}</summary></entry>'
+              for i, v in enumerate(ENTITIES[:-1]) for t in ("text", "html"))
+    + "</feed>"
+).encode()
+
+
+def test_fast_path_matches_feedparser():
+    for doc in (RSS, ATOM, RDF, ENTITY_RSS, ENTITY_ATOM):
+        fast = parse_entries(doc, base_url="https://news.example/feed")
+        slow = list(_iter_feedparser(doc, "https://news.example/feed", "application/xml"))
+        assert fast == slow
+
+
+def test_fast_path_values():
+    first, second, third = parse_entries(RSS, base_url="https://news.example/feed")
+    assert first["title"] == "Tom & Jerry" and first["link"] == "https://news.example/1"
+    assert first["published_ts"] == 1630890000
+    assert second["link"] == "https://news.example/2" and second["published"] is None
+    assert "script" not in second["summary"] and 'href="https://news.example/rel"' in second["summary"]
+    assert third["summary"] == "Full body" and third["published_ts"] is None
+
+
+def test_malformed_and_unusual_feeds_fall_back(monkeypatch):
+    calls = []
+    real = feed_parser._iter_feedparser
+    monkeypatch.setattr(feed_parser, "_iter_feedparser", lambda *a: calls.append(a) or real(*a))
+
+    broken = RSS.replace(b"</channel></rss>", b"<item><title>Fourth</title>")  # truncated
+    entries = parse_entries(broken)
+    assert [e["title"] for e in entries] == ["Tom & Jerry", "Second", "Third", "Fourth"]
+    assert len(calls) == 1
+
+    atom03 = b'<feed version="0.3" xmlns="http://purl.org/atom/ns#"><entry><title>Old</title></entry></feed>'
+    assert [e["title"] for e in parse_entries(atom03)] == ["Old"]
+    assert len(calls) == 2
+
+
+def test_limit_and_since_stop_early():
+    doc = _feed(100)
+    assert [e["title"] for e in parse_entries(doc, limit=3)] == ["Item 0", "Item 1", "Item 2"]
+
+    # newest first: everything older than item 4 is skipped and parsing stops
+    since = 1700000000 - 4 * 60
+    assert len(parse_entries(doc, since=since)) == 5
+
+    gen = iter_entries(doc, limit=1)
+    assert next(gen)["title"] == "Item 0"
+    assert next(gen, None) is None
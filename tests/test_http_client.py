@@ -0,0 +1,55 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.collectors.http_client import HttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.05)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with cls.lock:
+            cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(http_server):
+    return http_server(_Handler)
+
+
+def test_fetch_many_respects_per_host_concurrency(server):
+    _Handler.peak = 0
+    client = HttpClient(per_host_concurrency=2, per_host_rps=None)
+    urls = [f"{server}/page/{i}" for i in range(8)]
+    results = client.fetch_many(urls, workers=8)
+    client.close()
+    assert [r.text for r in results.values()] == [f"/page/{i}" for i in range(8)]
+    assert _Handler.peak <= 2
+
+
+def test_per_host_rate_limit_spaces_requests(server):
+    client = HttpClient(per_host_rps=20.0)
+    start = time.monotonic()
+    for i in range(5):
+        client.get(f"{server}/{i}")
+    client.close()
+    # 5 requests at 20 rps need at least 4 intervals of 50ms
+    assert time.monotonic() - start >= 0.2
@@ -0,0 +1,61 @@
+import json
+
+from src.db import repository as repo
+from src.generators import index_generator
+from src.generators.index_generator import SEARCH_INDEX, build_index, initial_group, search_key
+
+
+def _publish(tmp_db, names):
+    for name in names:
+        pid = repo.upsert_person(name)
+        repo.insert_article(pid, f"Article: {name}", "md", "<p>html</p>")
+        page = tmp_db / "site" / (name.replace(" ", "_") + ".html")
+        page.parent.mkdir(exist_ok=True)
+        page.write_text("page", encoding="utf-8")
+
+
+def test_initial_groups():
+    assert initial_group("abe shinzo") == ("latin-a", "A")
+    assert initial_group("アベ") == ("kana-a", "あ")
+    assert initial_group("ガンバ") == ("kana-ka", "か")
+    assert initial_group("安倍晋三") == ("kanji", "漢字")
+    assert initial_group("1st") == ("other", "他")
+    assert search_key("ＡＢＥ アベ") == "abe あべ"
+
+
+def test_build_index_paginates_and_links_slugs():
+    entries = [{"name": f"Person {i:03d}", "generated_at": "2024-01-02 03:04:05"} for i in range(5)]
+    entries.append({"name": "キシダ", "generated_at": None})
+    files = build_index(entries, page_size=2)
+    assert {"index.html", "index-2.html", "index-3.html", "index-latin-p.html", "index-latin-p-3.html",
+            "index-kana-ka.html", SEARCH_INDEX} <= set(files)
+    assert "index-4.html" not in files
+    assert 'href="Person_000.html"' in files["index.html"] and "2024-01-02" in files["index.html"]
+    assert 'href="index-2.html" rel="next"' in files["index.html"]
+    assert 'href="キシダ.html"' in files["index-3.html"]
+
+    items = json.loads(files[SEARCH_INDEX])["items"]
+    assert items[0] == ["Person 000", "Person_000.html"]
+    assert items[-1] == ["キシダ", "キシダ.html", "きしだ"]
+
+
+def test_generate_index_only_rewrites_changed_shards(tmp_db):
+    _publish(tmp_db, ["Alpha One", "Alpha Two", "Beta"])
+    repo.upsert_person("No Article")
+
+    stats = index_generator.generate_index(page_size=2)
+    assert stats["persons"] == 3 and stats["written"] == stats["files"]
+    assert "No Article" not in (tmp_db / "site" / "index.html").read_text(encoding="utf-8")
+
+    # a new person sorted last only changes the last page, its group and the search index
+    _publish(tmp_db, ["Beta Two"])
+    stats = index_generator.generate_index(page_size=2)
+    assert (stats["written"], stats["removed"]) == (3, 0)
+
+    # persons whose page is gone are dropped, and so are index pages left empty
+    (tmp_db / "site" / "Beta.html").unlink()
+    (tmp_db / "site" / "Beta_Two.html").unlink()
+    stats = index_generator.generate_index(page_size=2)
+    assert stats["removed"] == 2
+    assert not (tmp_db / "site" / "index-2.html").exists()
+    assert not (tmp_db / "site" / "index-latin-b.html").exists()
@@ -0,0 +1,41 @@
+from src.collectors import x_url_summarizer
+from src.collectors.llm_cache import LLMCache
+
+
+class FakeLLM:
+    """Local stand-in for the OpenAI chat call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, system, user, model="fake", max_tokens=512):
+        self.calls += 1
+        return f"summary #{self.calls}"
+
+
+def test_unchanged_page_is_served_from_cache(tmp_db, monkeypatch):
+    page = {"text": "Abe said something."}
+    monkeypatch.setattr(x_url_summarizer, "_fetch_page_text", lambda url, timeout=10: page["text"])
+    llm = FakeLLM()
+    cache = LLMCache()
+
+    first = x_url_summarizer.summarize_url_with_gpt("https://x.com/a/1", cache=cache, client=llm)
+    second = x_url_summarizer.summarize_url_with_gpt("https://x.com/a/1", cache=cache, client=llm)
+    assert first == second and llm.calls == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+    page["text"] = "Abe said something else."
+    x_url_summarizer.summarize_url_with_gpt("https://x.com/a/1", cache=cache, client=llm)
+    assert llm.calls == 2
+
+
+def test_ttl_and_size_bound(tmp_db):
+    now = [1000.0]
+    cache = LLMCache(ttl_seconds=60, max_entries=2, clock=lambda: now[0])
+    for i in range(3):
+        now[0] += 1
+        cache.put(f"k{i}", None, "m", f"v{i}")
+    assert cache.get("k0") is None  # evicted as least recently used
+    assert cache.get("k2") == "v2"
+    now[0] += 120
+    assert cache.get("k2") is None  # expired
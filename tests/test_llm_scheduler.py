@@ -0,0 +1,46 @@
+import threading
+import time
+
+from src.collectors.llm_scheduler import LLMScheduler, estimate_tokens, truncate_to_tokens
+
+
+def test_token_estimate_and_truncation():
+    assert estimate_tokens("a" * 400) == 101
+    assert estimate_tokens("安倍晋三") == 5
+    cut = truncate_to_tokens("安" * 100, 20)
+    assert estimate_tokens(cut) <= 20 and cut
+    assert truncate_to_tokens("short", 100) == "short"
+
+
+def test_failing_job_backs_off_without_blocking_others():
+    attempts = {"bad": 0}
+    lock = threading.Lock()
+
+    def call(system, user, model=None, max_tokens=0):
+        if user == "bad":
+            with lock:
+                attempts["bad"] += 1
+            return None
+        return f"ok:{user}"
+
+    sched = LLMScheduler(call=call, max_workers=1, rpm=6000, tpm=10**7, base_delay=0.3)
+    start = time.monotonic()
+    bad = sched.submit("sys", "bad", model="m", retries=3)
+    good = [sched.submit("sys", str(i), model="m") for i in range(5)]
+    # with a single worker the good jobs still finish while "bad" is backing off
+    assert [f.result(timeout=2) for f in good] == [f"ok:{i}" for i in range(5)]
+    assert time.monotonic() - start < 0.3
+    assert bad.result(timeout=5) is None
+    assert attempts["bad"] == 3
+    sched.shutdown()
+
+
+def test_requests_per_minute_budget():
+    sched = LLMScheduler(call=lambda *a, **k: "x", max_workers=4, rpm=120, tpm=10**7)
+    sched._requests.level = 1  # start with a nearly empty bucket
+    start = time.monotonic()
+    futures = [sched.submit("s", "u", model="m") for _ in range(3)]
+    [f.result(timeout=5) for f in futures]
+    # 2 requests beyond the first need 0.5s each at 120 rpm
+    assert time.monotonic() - start >= 0.9
+    sched.shutdown()
@@ -0,0 +1,124 @@
+from src import main
+from src.collectors.feed_cache import FeedCache
+from src.db import repository as repo
+
+
+def test_run_persons_concurrently(tmp_db):
+    persons = [{"name": f"Person {i}", "rss": [], "x_urls": []} for i in range(12)]
+    failures = main.run_persons(persons, skip_network=True, workers=4)
+    assert failures == 0
+    conn = repo.get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM persons").fetchone()[0] == 12
+    assert conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] == 12
+    conn.close()
+    assert len(list((tmp_db / "site").glob("*.html"))) == 12
+
+
+def test_roster_is_streamed_on_every_pass(tmp_db, monkeypatch):
+    (tmp_db / "data" / "persons.txt").write_text("Ann Roster\nBob Roster\n", encoding="utf-8")
+    reads = []
+    real = main.iter_persons
+    monkeypatch.setattr(main, "iter_persons", lambda shard=None: reads.append(shard) or real(shard))
+    roster = main.Roster()
+    assert main.run_persons(roster, skip_network=True) == 0
+    # one pass for the shared state and prune set, one for the work
+    assert len(reads) == 2 and roster.count == 2
+    assert main.render_persons(roster) == 0
+    assert sorted(p.name for p in (tmp_db / "site").glob("*.html")) == ["Ann_Roster.html", "Bob_Roster.html"]
+
+
+def test_run_persons_reports_failures(tmp_db, monkeypatch):
+    def boom(p, **kwargs):
+        if p["name"] == "Bad":
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(main, "process_person", boom)
+    persons = [{"name": "Good"}, {"name": "Bad"}, {"name": "Also Good"}]
+    assert main.run_persons(persons, workers=2) == 1
+    assert main.run_persons(persons, workers=1) == 1
+
+
+def test_repeated_runs_do_not_duplicate_activities(tmp_db, monkeypatch, static_feeds):
+    monkeypatch.setattr("src.collectors.wikipedia_collector.collect_wikipedia", lambda name: "bio")
+    entry = {"title": "Taro Yamada speaks", "link": "https://n.example/1", "published": "d1", "published_ts": 1000, "summary": ""}
+    feeds = static_feeds([entry])
+    person = {"name": "Taro Yamada", "rss": ["https://n.example/feed"], "x_urls": []}
+    main.process_person(person, feed_cache=feeds)
+    main.process_person(person, feed_cache=feeds)
+
+    # an entry older than the high-water mark is not collected again
+    feeds.entries.append(dict(entry, link="https://n.example/0", published_ts=10))
+    feeds.entries.append(dict(entry, link="https://n.example/2", published_ts=2000))
+    main.process_person(person, feed_cache=feeds)
+
+    conn = repo.get_conn()
+    links = [r[0] for r in conn.execute("SELECT s.url FROM activities a JOIN sources s ON s.id = a.source_id ORDER BY a.id")]
+    mark = conn.execute("SELECT high_water FROM source_marks").fetchone()[0]
+    # one snapshot per run that stored something new, taken from the DB
+    snapshots = conn.execute("SELECT added, removed FROM snapshots ORDER BY id").fetchall()
+    conn.close()
+    assert links == ["https://n.example/1", "https://n.example/2"]
+    assert mark == 2000
+    assert [tuple(r) for r in snapshots] == [(1, 0), (1, 0)]
+
+
+def test_shared_feed_cache_without_matcher_matches_each_person(tmp_db, monkeypatch):
+    monkeypatch.setattr("src.collectors.wikipedia_collector.collect_wikipedia", lambda name: "bio")
+    rss = (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>N</title>'
+        "<item><title>Koike and Abe meet</title><link>https://n.example/m</link></item>"
+        "</channel></rss>"
+    )
+    cache = FeedCache(conditional=False)
+    for name in ("Abe", "Koike"):
+        main.collect_person({"name": name, "rss": [rss], "x_urls": []}, feed_cache=cache)
+    for name in ("Abe", "Koike"):
+        assert [a["title"] for a in repo.list_recent_activities(repo.get_person_id(name))] == ["Koike and Abe meet"]
+
+
+def test_changed_x_summary_is_stored(tmp_db, monkeypatch):
+    summaries = {"https://x.example/1": "First summary"}
+    monkeypatch.setattr("src.collectors.x_url_summarizer.summarize_urls", lambda urls: dict(summaries))
+    monkeypatch.setattr("src.collectors.wikipedia_collector.collect_wikipedia", lambda name: "bio")
+    person = {"name": "Xena Poster", "rss": [], "x_urls": list(summaries)}
+    main.process_person(person)
+    main.process_person(person)
+    summaries["https://x.example/1"] = "Updated summary"
+    main.process_person(person)
+
+    conn = repo.get_conn()
+    contents = [r[0] for r in conn.execute("SELECT content FROM activities ORDER BY id")]
+    conn.close()
+    assert contents == ["First summary", "Updated summary"]
+
+
+def test_unchanged_rerun_skips_writes_and_prunes_dropped_pages(tmp_db):
+    persons = [{"name": "Ann Example"}, {"name": "Bob Example"}]
+    writer = main.SiteWriter()
+    main.run_persons(persons, skip_network=True, site_writer=writer)
+    assert writer.written == 2
+
+    writer = main.SiteWriter()
+    main.run_persons(persons, skip_network=True, site_writer=writer)
+    assert (writer.written, writer.skipped) == (0, 2)
+    conn = repo.get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] == 2
+    conn.close()
+
+    main.run_persons(persons[:1], skip_network=True)
+    assert (tmp_db / "site" / "Ann_Example.html").exists()
+    assert not (tmp_db / "site" / "Bob_Example.html").exists()
+
+
+def test_render_stage_rebuilds_pages_from_db(tmp_db):
+    persons = [{"name": "Cara Example"}, {"name": "Dan Example"}]
+    assert main.collect_persons(persons, skip_network=True) == 0
+    assert not list(tmp_db.glob("site/*.html"))
+
+    with repo.session() as db:
+        pid = db.get_person_id("Cara Example")
+        db.insert_activity(pid, "Stored speech", "from the DB")
+
+    assert main.render_persons(persons) == 2
+    assert "Stored speech" in (tmp_db / "site" / "Cara_Example.html").read_text(encoding="utf-8")
+    assert main.render_persons(persons) == 0
@@ -0,0 +1,42 @@
+import json
+
+from src.db import repository as repo
+from src.utils import metrics
+
+
+def test_disabled_metrics_leave_code_untouched():
+    original = repo.Session.upsert_person
+    assert metrics.timer("x") is metrics.timer("y")  # shared no-op
+    metrics.inc("ignored")
+    assert not metrics.enabled() and repo.Session.upsert_person is original
+
+
+def test_enabled_metrics_record_and_export(tmp_db):
+    original = repo.Session.upsert_person
+    metrics.enable()
+    try:
+        assert repo.Session.upsert_person is not original
+        repo.upsert_person("Metric Person")
+        with repo.session() as s:
+            s.insert_activities([{"person_id": 1, "title": "t", "content": "c"}])
+        with metrics.timer("stage_seconds", stage="render"):
+            pass
+        metrics.inc("http_bytes_total", 2048, host="example.com")
+        path = metrics.write_report(tmp_db / "metrics", extra={"stage": "test"})
+    finally:
+        metrics.disable()
+    assert repo.Session.upsert_person is original
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["stage"] == "test"
+    hists = {(h["name"], tuple(h["labels"].values())): h for h in report["histograms"]}
+    assert hists[("db_call_seconds", ("upsert_person",))]["count"] == 1
+    assert hists[("stage_seconds", ("render",))]["count"] == 1
+    counters = {(c["name"], tuple(c["labels"].values())): c["value"] for c in report["counters"]}
+    assert counters[("db_rows_written_total", ("activities",))] == 1
+    assert counters[("http_bytes_total", ("example.com",))] == 2048
+
+    prom = (tmp_db / "metrics" / metrics.PROM_FILE).read_text(encoding="utf-8")
+    assert 'press_http_bytes_total{host="example.com"} 2048' in prom
+    assert 'press_db_call_seconds_count{op="upsert_person"} 1' in prom
+    assert '_bucket{op="upsert_person",le="+Inf"} 1' in prom
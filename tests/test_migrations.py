@@ -0,0 +1,81 @@
+import sqlite3
+
+from src.db import migrations
+from src.db import repository as repo
+from src.generators.site_writer import content_hash
+
+LEGACY_SCHEMA = """
+CREATE TABLE persons (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
+    wikipedia_summary TEXT, metadata TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE activities (id INTEGER PRIMARY KEY AUTOINCREMENT, person_id INTEGER NOT NULL, title TEXT,
+    content TEXT, source_id INTEGER, published_at DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE sources (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL UNIQUE, type TEXT,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, person_id INTEGER, title TEXT,
+    markdown TEXT, html TEXT, generated_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+"""
+
+
+def test_parse_published():
+    assert migrations.parse_published("Mon, 06 Sep 2021 10:00:00 GMT") == 1630922400
+    assert migrations.parse_published("2021-09-06T19:00:00+09:00") == 1630922400
+    assert migrations.parse_published("2021-09-06T10:00:00Z") == 1630922400
+    assert migrations.parse_published("yesterday") is None
+
+
+def test_legacy_database_is_upgraded_and_backfilled(tmp_path, monkeypatch):
+    db_path = tmp_path / "data" / "database.sqlite3"
+    db_path.parent.mkdir()
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO persons (name) VALUES ('Old Person')")
+    conn.executemany(
+        "INSERT INTO activities (person_id, title, published_at) VALUES (1, ?, ?)",
+        [("older", "Sun, 05 Sep 2021 10:00:00 GMT"), ("newer", "2021-09-06T10:00:00Z"), ("undated", None)],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(repo, "DB_PATH", db_path)
+    repo.init_db(schema_path="src/db/schema.sql")
+    repo.init_db(schema_path="src/db/schema.sql")  # idempotent
+
+    conn = repo.get_conn()
+    assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    ts = dict(conn.execute("SELECT title, published_ts FROM activities").fetchall())
+    assert ts["older"] == 1630836000 and ts["newer"] == 1630922400 and ts["undated"] > ts["newer"]
+    plan = " ".join(
+        r[3] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT title FROM activities WHERE person_id = 1 ORDER BY published_ts DESC, id DESC LIMIT 5"
+        )
+    )
+    assert "idx_activities_person_published" in plan and "TEMP B-TREE" not in plan
+    conn.close()
+    assert [a["title"] for a in repo.list_recent_activities(1)] == ["undated", "newer", "older"]
+
+
+def test_legacy_activities_get_content_hashes(tmp_path, monkeypatch):
+    db_path = tmp_path / "data" / "database.sqlite3"
+    db_path.parent.mkdir()
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO persons (name) VALUES ('Old Person')")
+    conn.execute("INSERT INTO sources (url, type) VALUES ('https://n.example/1', 'rss'), ('https://x.example/1', 'x_url')")
+    # older versions stored the same feed item again on every run
+    conn.executemany(
+        "INSERT INTO activities (person_id, title, content, source_id, published_at) VALUES (1, ?, ?, ?, ?)",
+        [("Item", "body", 1, "d1"), ("Item", "body", 1, "d1"), ("X post summary", "A summary", 2, None)],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(repo, "DB_PATH", db_path)
+    repo.init_db(schema_path="src/db/schema.sql")
+    with repo.session() as s:
+        added = s.insert_activities([
+            {"person_id": 1, "title": "Item", "content": "body", "published_at": "d1", "link": "https://n.example/1"},
+            {"person_id": 1, "title": "X post summary", "content": "A summary",
+             "link": "https://x.example/1#" + content_hash("A summary")[:16]},
+        ])
+    assert added == 0
@@ -0,0 +1,25 @@
+from src.utils.name_matcher import NameMatcher, normalize_text
+
+
+def test_normalize_folds_width_diacritics_and_kana():
+    assert normalize_text("Shinzō  ABE") == "shinzo abe"
+    assert normalize_text("ｱﾍﾞ") == normalize_text("アベ") == "あべ"
+    assert normalize_text("ＡＢＥ") == "abe"
+
+
+def test_single_pass_returns_every_mentioned_person():
+    matcher = NameMatcher([
+        {"name": "Shinzō Abe", "aliases": ["安倍 晋三"]},
+        {"name": "Yuriko Koike"},
+        {"name": "Taro Yamada"},
+    ]).build()
+    text = "Talks between SHINZO ABE and Yuriko Koike; 安倍晋三氏も出席"
+    assert matcher.find(text) == {"Shinzō Abe", "Yuriko Koike"}
+    assert matcher.match_entry({"title": "Nothing here", "summary": "Taro Yamadas"}) == set()
+    assert matcher.match_entry({"title": "Taro Yamada", "summary": None}) == {"Taro Yamada"}
+
+
+def test_overlapping_patterns():
+    matcher = NameMatcher([{"name": "Ken"}, {"name": "Kentaro Sato", "aliases": ["sato"]}])
+    assert matcher.find("kentaro sato said") == {"Kentaro Sato"}
+    assert matcher.find("Ken and Sato") == {"Ken", "Kentaro Sato"}
@@ -7,3 +7,66 @@ def test_init_and_upsert(tmp_path):
     repo.init_db(schema_path="src/db/schema.sql")
     pid = repo.upsert_person("Test Person", wikipedia_summary="summary")
     assert isinstance(pid, int) and pid > 0
+
+
+def test_session_batches_in_one_transaction(tmp_db):
+    with repo.session() as s:
+        pid = s.upsert_person("Batch Person")
+        src = s.insert_source("https://example.com/a", type_="rss")
+        assert s.insert_source("https://example.com/a") == src
+        n = s.insert_activities(
+            {"person_id": pid, "title": f"t{i}", "content": "c", "source_id": src} for i in range(50)
+        )
+    assert n == 50
+    conn = repo.get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM activities WHERE person_id = ?", (pid,)).fetchone()[0] == 50
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_session_rolls_back_on_error(tmp_db):
+    try:
+        with repo.session() as s:
+            s.upsert_person("Rolled Back")
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    conn = repo.get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM persons WHERE name = 'Rolled Back'").fetchone()[0] == 0
+    conn.close()
+
+
+def test_large_text_is_compressed_and_read_back(tmp_db):
+    md = "# Heading\n\n" + "本文の段落。" * 200
+    with repo.session() as s:
+        pid = s.upsert_person("Compressed")
+        aid = s.insert_article(pid, "Article", md, "<p>short</p>")
+        s.insert_llm_log(pid, "article_generation", None, "template-v1", md, article_id=aid)
+        s.insert_llm_log(pid, "x_summary", "https://example.com", "template-v1", "summary " * 100)
+    conn = repo.get_conn()
+    stored = conn.execute("SELECT typeof(markdown), typeof(html) FROM articles").fetchone()
+    assert tuple(stored) == ("blob", "text")
+    assert conn.execute("SELECT COUNT(*) FROM llm_prompts").fetchone()[0] == 1
+    conn.close()
+
+    assert repo.get_latest_article(pid)["markdown"] == md
+    logs = repo.list_llm_logs(person_id=pid)
+    assert [l["prompt"] for l in logs] == ["template-v1", "template-v1"]
+    assert logs[1]["response"] == md and logs[0]["response"] == "summary " * 100
+
+
+def test_compact_keeps_latest_versions_and_converts_legacy_rows(tmp_db):
+    with repo.session() as s:
+        pid = s.upsert_person("Many Versions")
+        ids = [s.insert_article(pid, "A", f"v{i} " + "x" * 300, "<p/>") for i in range(4)]
+        s.insert_llm_log(pid, "article_generation", None, "p", None, article_id=ids[0])
+        # a row written before compression / prompt dedup
+        s.conn.execute("INSERT INTO llm_logs (source, prompt, response) VALUES ('x_summary', 'old prompt', ?)", ("y" * 500,))
+    stats = repo.compact(keep_articles=2)
+    assert stats["articles_deleted"] == 2 and stats["rows_compressed"] == 2
+    conn = repo.get_conn()
+    assert [r[0] for r in conn.execute("SELECT id FROM articles ORDER BY id")] == ids[2:]
+    assert conn.execute("SELECT COUNT(*) FROM llm_logs WHERE prompt IS NOT NULL").fetchone()[0] == 0
+    assert conn.execute("SELECT article_id FROM llm_logs WHERE source = 'article_generation'").fetchone()[0] is None
+    conn.close()
+    assert repo.list_llm_logs(source="x_summary")[0]["prompt"] == "old prompt"
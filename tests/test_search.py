@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from src.db import repository as repo
+from src.db import search
+
+
+def _seed():
+    with repo.session() as s:
+        a = s.upsert_person("山田太郎", wikipedia_summary="日本の政治家。財務大臣を務めた。")
+        b = s.upsert_person("Jane Doe", wikipedia_summary="American economist.")
+        s.insert_activities([
+            {"person_id": a, "title": "記者会見", "content": "消費税の引き上げについて発言した", "published_ts": 1_700_000_000},
+            {"person_id": a, "title": "国会答弁", "content": "防衛予算について説明", "published_ts": 1_710_000_000},
+            {"person_id": b, "title": "Interview", "content": "Jane talked about inflation targets", "published_ts": 1_710_000_000},
+        ])
+        s.insert_article(b, "Article: Jane Doe", "old inflation article", "<p/>")
+        s.insert_article(b, "Article: Jane Doe", "new article about interest rates", "<p/>")
+
+
+def test_search_activities_articles_and_persons(tmp_db):
+    _seed()
+    hits = search.search("消費税")
+    assert [(h["kind"], h["person"]) for h in hits] == [("activity", "山田太郎")]
+    assert "[消費税]" in hits[0]["snippet"]
+
+    assert {h["kind"] for h in search.search("財務大臣")} == {"person"}
+    # only the latest article per person is indexed
+    assert [h["kind"] for h in search.search("inflation")] == ["activity"]
+    assert [h["kind"] for h in search.search("interest rates")] == ["article"]
+
+
+def test_search_filters_and_short_terms(tmp_db):
+    _seed()
+    assert search.search("について", person="Jane Doe") == []
+    assert len(search.search("について", person="山田太郎")) == 2
+    recent = search.search("について", since=date(2024, 1, 1))
+    assert [h["title"] for h in recent] == ["国会答弁"]
+    assert [h["title"] for h in search.search("について", until=1_705_000_000)] == ["記者会見"]
+    # two-character terms use the bigram index, alone or with longer terms
+    assert [h["title"] for h in search.search("防衛", kinds=["activity"])] == ["国会答弁"]
+    assert [h["title"] for h in search.search("について 防衛")] == ["国会答弁"]
+    assert [h["kind"] for h in search.search("ec", person="Jane Doe")] == ["person"]
+    with pytest.raises(ValueError):
+        search.search("防衛 の")
+
+
+def test_search_index_follows_updates(tmp_db):
+    _seed()
+    repo.upsert_person("Jane Doe", wikipedia_summary="British novelist.")
+    assert search.search("economist") == []
+    assert [h["person"] for h in search.search("novelist")] == ["Jane Doe"]
+
+
+def test_short_terms_and_articles_use_indexes(tmp_db):
+    _seed()
+    # the contentless article index stores no text; snippets come from the article
+    hits = search.search("rates")
+    assert hits[0]["snippet"] == "new article about interest [rates]"
+    assert [h["kind"] for h in search.search("ra", kinds=["article"])] == ["article"]
+
+    conn = repo.get_conn()
+    for kind in search.KINDS:
+        sql, params = search._kind_query(kind, None, "64x65", None, None, None, 10)
+        plan = " ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        assert "VIRTUAL TABLE INDEX" in plan and "SCAN a" not in plan and "SCAN p" not in plan, plan
+    assert conn.execute("SELECT body FROM articles_fts").fetchone()[0] is None
+    conn.close()
@@ -0,0 +1,56 @@
+import time
+
+from src import main
+from src.db.leases import Leases
+from src.utils.sharding import parse_shard, shard_of
+
+import pytest
+
+
+def test_shards_partition_roster(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    names = [f"Person {i}" for i in range(40)]
+    (tmp_path / "data" / "persons.txt").write_text("\n".join(names), encoding="utf-8")
+    shards = [[p["name"] for p in main.iter_persons((i, 3))] for i in range(3)]
+    assert sorted(sum(shards, [])) == sorted(names)
+    assert all(shards)
+    assert shard_of("Person 7", 3) == shard_of("Person 7", 3)
+    assert parse_shard("2/3") == (2, 3) and parse_shard("") is None
+    with pytest.raises(ValueError):
+        parse_shard("3/3")
+
+
+def test_leases_block_other_workers_until_expiry(tmp_db):
+    now = [100.0]
+    a = Leases(owner="a", ttl=60, clock=lambda: now[0])
+    b = Leases(owner="b", ttl=60, clock=lambda: now[0])
+    assert a.claim("Taro")
+    assert not b.claim("Taro")
+    assert a.claim("Taro")  # renewing its own lease
+    now[0] = 200.0  # a crashed; its lease expired
+    assert b.claim("Taro") and b.held() == ["Taro"]
+    b.release("Taro")
+    assert a.claim("Taro")
+
+
+def test_run_skips_persons_leased_elsewhere(tmp_db):
+    Leases(owner="other").claim("Busy Example")
+    persons = [{"name": "Busy Example"}, {"name": "Free Example"}]
+    mine = Leases(owner="me")
+    assert main.collect_persons(persons, skip_network=True, workers=2, leases=mine) == 0
+    conn = main.repo.get_conn()
+    assert [r[0] for r in conn.execute("SELECT name FROM persons")] == ["Free Example"]
+    assert [r[0] for r in conn.execute("SELECT owner FROM leases")] == ["other"]
+    conn.close()
+
+
+def test_held_lease_is_renewed_during_long_work(tmp_db):
+    a, b = Leases(owner="a", ttl=0.3), Leases(owner="b", ttl=0.3)
+    with a.hold("Slow") as claimed:
+        assert claimed
+        time.sleep(0.6)  # twice the TTL
+        assert not b.claim("Slow")
+        with b.hold("Slow") as other:
+            assert not other
+    assert a.held() == [] and b.claim("Slow")
@@ -0,0 +1,38 @@
+from src.db import repository as repo
+from src.db import snapshot_store
+
+
+def _add(s, pid, titles):
+    s.insert_activities({"person_id": pid, "title": t, "content": f"{t} body"} for t in titles)
+    return [a["content_hash"] for a in s.list_recent_activities(pid, 50)]
+
+
+def test_snapshot_records_only_set_changes(tmp_db):
+    with repo.session() as s:
+        pid = s.upsert_person("Snap Person")
+        first = snapshot_store.record_snapshot(s, pid, _add(s, pid, ["a", "b"]))
+        assert first and len(first["added"]) == 2 and not first["removed"]
+        # same set again: nothing recorded
+        assert snapshot_store.record_snapshot(s, pid, _add(s, pid, [])) is None
+        hashes = _add(s, pid, ["c"])
+        dropped = next(a["content_hash"] for a in s.list_recent_activities(pid, 50) if a["title"] == "a")
+        second = snapshot_store.record_snapshot(s, pid, [h for h in hashes if h != dropped])
+
+    assert len(second["added"]) == 1 and second["removed"] == {dropped}
+    assert snapshot_store.render_diff(second["snapshot_id"]) == ["+ c", "+   c body", "- a", "-   a body"]
+    conn = repo.get_conn()
+    counts = conn.execute("SELECT added, removed FROM snapshots ORDER BY id").fetchall()
+    assert [tuple(r) for r in counts] == [(2, 0), (1, 1)]
+    assert conn.execute("SELECT COUNT(*) FROM person_activity_sets WHERE person_id = ?", (pid,)).fetchone()[0] == 2
+    conn.close()
+
+
+def test_stored_snapshot_covers_all_activities(tmp_db):
+    with repo.session() as s:
+        pid = s.upsert_person("Busy Person")
+        # more than one article's worth, plus a near-duplicate that articles hide
+        s.insert_activities({"person_id": pid, "title": f"t{i}", "content": "", "link": f"l{i}"} for i in range(60))
+        s.insert_activities([{"person_id": pid, "title": "t0", "content": "", "link": "l0-mirror"}])
+        first = snapshot_store.record_stored_snapshot(s, pid)
+        assert len(first["added"]) == 61 and not first["removed"]
+        assert snapshot_store.record_stored_snapshot(s, pid) is None
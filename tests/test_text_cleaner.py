@@ -0,0 +1,50 @@
+import time
+
+from src.utils.text_cleaner import IngestNormalizer, clean_html_to_text, clean_text, strip_html
+
+
+def test_clean_text_strips_unescapes_and_normalizes():
+    html = (
+        '<p>Hi&nbsp;<b>there</b></p><script>if (a < b) x();</script><!-- note -->'
+        '<p>ＡＢＣ　１２３ &amp; <a title="a>b" href="/x">more</a></p> 5 < 6'
+    )
+    assert clean_text(html) == "Hi there ABC 123 & more 5 < 6"
+    assert clean_text("<p>one</p><p>two  words</p>", single_line=False) == "one\ntwo words"
+    assert clean_html_to_text("<div>x<SCRIPT>bad</Script > y</div>") == "x y"
+    assert strip_html("plain text") == "plain text"
+
+
+def test_clean_text_caps_length_at_a_word_boundary():
+    text = clean_text("word " * 1000, max_chars=100)
+    assert len(text) <= 100 and text.endswith("word…")
+
+
+def test_pathological_markup_is_linear():
+    start = time.perf_counter()
+    for bad in ("<a " * 100000, "<script" * 50000, "<!--" * 100000, '<a title="' * 100000, "<script>" + "x" * 500000):
+        assert clean_text(bad) == ""
+    assert time.perf_counter() - start < 5
+
+
+def test_normalizer_batches_and_caches_by_content():
+    normalizer = IngestNormalizer(cache_size=2)
+    entries = [
+        {"title": "Ｔｉｔｌｅ <b>one</b>", "summary": "<p>Ｓｕｍ</p>", "link": "l1"},
+        {"title": "Two", "summary": "<p>Ｓｕｍ</p>", "link": "l2"},
+    ]
+    out = normalizer.normalize_entries(entries)
+    # titles keep their characters (they are part of the activity hash)
+    assert out[0] == {"title": "Ｔｉｔｌｅ one", "summary": "Sum", "link": "l1", "normalized": True}
+    assert out[1]["summary"] == "Sum" and entries[0]["summary"] == "<p>Ｓｕｍ</p>"
+    assert normalizer.stats["hits"] == 1
+
+    assert normalizer.clean_many(["<i>a</i>", "<i>b</i>", "<p>Ｓｕｍ</p>"]) == ["a", "b", "Sum"]
+    assert normalizer.stats["hits"] == 1  # evicted by the size-2 LRU
+
+
+def test_normalize_entries_is_idempotent():
+    normalizer = IngestNormalizer()
+    entries = [{"title": "escape &amp;lt;b&amp;gt;\nline", "summary": "AT&amp;amp;T &lt;i&gt;x&lt;/i&gt;"}]
+    once = normalizer.normalize_entries(entries)
+    assert once[0]["title"] == "escape &lt;b&gt; line"
+    assert normalizer.normalize_entries(once) == once
@@ -0,0 +1,93 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.collectors import wikipedia_collector as wc
+
+# lang -> title -> (revid, extract); "redirects" maps alias -> title
+WIKI = {
+    "ja": {"pages": {"山田太郎": (10, "山田太郎は日本の政治家。")}, "redirects": {"山田 太郎": "山田太郎"}},
+    "en": {"pages": {"Jane Doe": (20, "Jane Doe is an economist.")}, "redirects": {}},
+}
+
+
+class _WikiHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        lang = parts.path.strip("/").split("/")[0]
+        q = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        type(self).requests.append((lang, q["prop"], q["titles"].split("|")))
+        wiki = WIKI[lang]
+        redirects, pages = [], []
+        for title in q["titles"].split("|"):
+            target = wiki["redirects"].get(title)
+            if target:
+                redirects.append({"from": title, "to": target})
+                title = target
+            if title not in wiki["pages"]:
+                pages.append({"title": title, "missing": True})
+                continue
+            revid, extract = wiki["pages"][title]
+            page = {"title": title, "lastrevid": revid}
+            if q["prop"] == "extracts":
+                page["extract"] = extract
+            pages.append(page)
+        body = json.dumps({"query": {"redirects": redirects, "pages": pages}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_base(http_server):
+    _WikiHandler.requests = []
+    return http_server(_WikiHandler) + "/{lang}/api.php"
+
+
+def test_batch_lookup_with_redirects_language_fallback_and_cache(tmp_path, api_base, monkeypatch):
+    now = [1000.0]
+    cache = wc.WikipediaCache(tmp_path / "wiki.json", ttl=60, clock=lambda: now[0])
+    titles = ["山田 太郎", "Jane Doe", "Nobody"] + [f"Extra {i}" for i in range(60)]
+    result = wc.collect_wikipedia_batch(titles, cache=cache, api_base=api_base)
+    assert result["山田 太郎"] == "山田太郎は日本の政治家。"
+    assert result["Jane Doe"] == "Jane Doe is an economist."
+    assert result["Nobody"] is None
+    # 63 titles: two info batches per language, extracts only for found pages;
+    # en is only asked about the 62 titles ja does not have
+    assert [(lang, prop, len(t)) for lang, prop, t in _WikiHandler.requests] == [
+        ("ja", "info", 50), ("ja", "info", 13), ("ja", "extracts", 1),
+        ("en", "info", 50), ("en", "info", 12), ("en", "extracts", 1),
+    ]
+
+    # within the TTL: no requests at all, even from a fresh cache object
+    _WikiHandler.requests = []
+    cache = wc.WikipediaCache(tmp_path / "wiki.json", ttl=60, clock=lambda: now[0])
+    assert wc.collect_wikipedia_batch(titles, cache=cache, api_base=api_base) == result
+    assert _WikiHandler.requests == []
+
+    # expired but same revision: revalidated, extracts not refetched
+    now[0] += 120
+    assert wc.collect_wikipedia_batch(["Jane Doe"], cache=cache, api_base=api_base)["Jane Doe"] == result["Jane Doe"]
+    assert [prop for _, prop, _ in _WikiHandler.requests] == ["info", "info"]
+
+
+def test_failed_request_falls_back_to_cached_summary(tmp_path, api_base, monkeypatch):
+    now = [0.0]
+    cache = wc.WikipediaCache(tmp_path / "wiki.json", ttl=10, clock=lambda: now[0])
+    wc.collect_wikipedia_batch(["Jane Doe"], cache=cache, api_base=api_base)
+    now[0] = 100.0
+
+    def down(*args, **kwargs):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(wc, "_query", down)
+    assert wc.collect_wikipedia_batch(["Jane Doe"], cache=cache)["Jane Doe"] == "Jane Doe is an economist."
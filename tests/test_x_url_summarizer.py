@@ -27,3 +27,53 @@ def test_summarize_url_with_gpt(monkeypatch, mock_openai):
     summary = x_url_summarizer.summarize_url_with_gpt("https://example.com")
     assert summary is not None
     assert "dummy summary" in summary.lower()
+
+
+PAGE = (
+    "<html><head><title>Post</title><style>p {color: red}</style>"
+    "<script>var x = '<p>not text</p>';</script></head>"
+    "<body><noscript>enable js</noscript><p>Abe &amp; Koike met</p>\n"
+    "<div>  second   line </div><p>三行目</p></body></html>"
+)
+
+
+def test_streaming_extraction_matches_soup():
+    from src.utils.text_cleaner import extract_text_streaming
+
+    chunks = [PAGE[i:i + 7] for i in range(0, len(PAGE), 7)]
+    assert extract_text_streaming(chunks) == x_url_summarizer._extract_text_soup(PAGE)
+    assert extract_text_streaming([PAGE]) == "Post\n\nAbe & Koike met\n\nsecond   line\n\n三行目"
+
+
+class FakeStreamResp:
+    status_code = 200
+    headers = {"Content-Type": "text/html"}
+    encoding = "ISO-8859-1"
+
+    def __init__(self, body):
+        self.body = body
+        self.read = 0
+
+    def iter_content(self, size):
+        while self.read < len(self.body):
+            chunk = self.body[self.read:self.read + size]
+            self.read += len(chunk)
+            yield chunk
+
+    def close(self):
+        pass
+
+
+def test_fetch_stops_early_and_sniffs_meta_charset(monkeypatch):
+    body = ('<meta charset="utf-8"><p>安倍晋三</p>' + "<p>filler text</p>" * 200000).encode("utf-8")
+    resp = FakeStreamResp(body)
+
+    class Client:
+        def get(self, url, **kwargs):
+            return resp
+
+    monkeypatch.setattr(x_url_summarizer, "get_client", lambda: Client())
+    text = x_url_summarizer._fetch_page_text("https://x.com/a")
+    assert text.startswith("安倍晋三")
+    assert len(text) <= x_url_summarizer.MAX_PAGE_CHARS
+    assert resp.read < len(body) // 10